@@ -7,3 +7,23 @@ class Agent:
     def __init__(self, interface):
         # Point to the controlling interface
         self.interface = interface
+
+        # Observation of the game, made on the first call of observe()
+        self.encoder = None
+
+    def observe(self, action=None):
+        """
+        The game state as one-hot planes; see Observation.
+
+        :param action: The action processed since the last call, so that only what it changed is encoded again;
+                       None to encode everything
+        :return: C x H x W NumPy array, updated in place by later calls
+        """
+        game = self.interface.game
+
+        if self.encoder is None:
+            # Only observing needs NumPy, so an agent that never observes runs without it
+            import Observation as Ob
+            self.encoder = Ob.ObservationEncoder(game.grid.size_x, game.grid.size_y)
+
+        return self.encoder.update(game, action)
@@ -0,0 +1,170 @@
+"""
+    Observation encoder: the game state as a NumPy array, for learning agents.
+
+    An observation is a C x H x W array (channels, rows, columns) of one-hot planes:
+     - one plane per token class (TOKEN_CHANNELS): 1 where a tile holds that token, so the robot's position is the
+       ROBOT_TOKEN plane
+     - one plane per stack slot & item colour (MAX_CARRY x items): all 1 if that slot holds that colour, from the
+       bottom of the stack up
+
+    The array is allocated once and kept up to date: after an action, only the tiles the action could have touched
+    (the robot's old & new tiles & the action's target) are compared with their last known content, and only the
+    stack slots that changed are refilled, so there is no Python loop over the grid. reset() encodes everything,
+    e.g. for a new game.
+
+    BatchEncoder fills one N x C x H x W array for N games, each encoder writing into its own slice. Games smaller
+    than the batch's H x W leave the extra rows & columns at zero.
+
+    Needs NumPy, and the RobotCleanerGame folder on the import path, like the game's own scripts.
+"""
+import Constants as Co
+import numpy as np
+
+TOKEN_CHANNELS = [Co.EMPTY_TILE, Co.BLOCKED_TILE, Co.ROBOT_TOKEN] + sorted(Co.SET_OF_ITEMS) + \
+                 sorted(Co.SET_OF_BINS) + sorted(Co.SET_OF_MESS)
+ITEM_CHANNELS = sorted(Co.SET_OF_ITEMS)
+
+# Token : channel index, and item : offset of its planes within each stack slot
+TOKEN_INDEX = {token: channel for channel, token in enumerate(TOKEN_CHANNELS)}
+ITEM_INDEX = {item: offset for offset, item in enumerate(ITEM_CHANNELS)}
+
+STACK_OFFSET = len(TOKEN_CHANNELS)
+CHANNELS = STACK_OFFSET + Co.MAX_CARRY * len(ITEM_CHANNELS)
+
+DEFAULT_DTYPE = np.float32
+
+
+class ObservationEncoder:
+    def __init__(self, size_x: int, size_y: int, out: np.ndarray = None, dtype=DEFAULT_DTYPE) -> None:
+        """
+        :param size_x: Horizontal size of Grid
+        :param size_y: Vertical size of Grid
+        :param out: C x H x W array to write into, H >= size_y & W >= size_x (e.g. a slice of a batch); None to
+                    allocate one
+        :param dtype: NumPy dtype of an allocated array
+        """
+        self.size_x = size_x
+        self.size_y = size_y
+        self.buffer = out if out is not None else np.zeros((CHANNELS, size_y, size_x), dtype=dtype)
+
+        # Last known content of each tile, [y][x] as in Grid, and the stack; None until reset()
+        self.contents = None
+        self.stack = None
+        self.robot = None
+
+    def reset(self, game) -> np.ndarray:
+        """
+        Encode a game in full.
+
+        :param game: Game object
+        :return: The observation array
+        """
+        self.buffer.fill(0)
+        self.contents = [[tile.get_content() for tile in row] for row in game.grid.grid]
+
+        for y, row in enumerate(self.contents):
+            self.buffer[[TOKEN_INDEX[content] for content in row], y, range(len(row))] = 1
+
+        self.stack = []
+        self.set_stack(game.robot.stack)
+        self.robot = game.robot.coords
+
+        return self.buffer
+
+    def set_tile(self, coords: (int, int), content: str) -> None:
+        x, y = coords
+        old = self.contents[y][x]
+
+        if content != old:
+            self.buffer[TOKEN_INDEX[old], y, x] = 0
+            self.buffer[TOKEN_INDEX[content], y, x] = 1
+            self.contents[y][x] = content
+
+    @staticmethod
+    def get_stack_channel(slot: int, item: str) -> int:
+        return STACK_OFFSET + slot * len(ITEM_CHANNELS) + ITEM_INDEX[item]
+
+    def set_stack(self, stack: [str]) -> None:
+        if stack == self.stack:
+            return
+
+        # Only the slots that changed; usually just the top one
+        for slot in range(max(len(stack), len(self.stack))):
+            old = self.stack[slot] if slot < len(self.stack) else None
+            new = stack[slot] if slot < len(stack) else None
+            if old == new:
+                continue
+            if old is not None:
+                self.buffer[self.get_stack_channel(slot, old)] = 0
+            if new is not None:
+                self.buffer[self.get_stack_channel(slot, new), :self.size_y, :self.size_x] = 1
+
+        self.stack = list(stack)
+
+    def update(self, game, action=None) -> np.ndarray:
+        """
+        Bring the observation up to date after an action.
+
+        :param game: Game object, as after the action
+        :param action: The action just processed; None if unknown, which encodes the game in full
+        :return: The observation array
+        """
+        if self.contents is None or action is None:
+            return self.reset(game)
+
+        touched = {self.robot, game.robot.coords}
+        if (coords := getattr(action, "coords", None)) is not None:
+            touched.add(coords)
+
+        for x, y in touched:
+            self.set_tile((x, y), game.grid.grid[y][x].get_content())
+
+        self.set_stack(game.robot.stack)
+        self.robot = game.robot.coords
+
+        return self.buffer
+
+
+class BatchEncoder:
+    """
+        Observations of many games in one N x C x H x W array, e.g. for a batched model.
+    """
+
+    def __init__(self, games: list, dtype=DEFAULT_DTYPE) -> None:
+        """
+        :param games: Game objects; the batch is as big as the biggest grid
+        :param dtype: NumPy dtype
+        """
+        height = max(game.grid.size_y for game in games)
+        width = max(game.grid.size_x for game in games)
+
+        self.buffer = np.zeros((len(games), CHANNELS, height, width), dtype=dtype)
+        self.encoders = [ObservationEncoder(game.grid.size_x, game.grid.size_y, self.buffer[i])
+                         for i, game in enumerate(games)]
+
+        for encoder, game in zip(self.encoders, games):
+            encoder.reset(game)
+
+    def update(self, games: list, actions: list) -> np.ndarray:
+        """
+        :param games: Game objects, in the order given when the batch was made
+        :param actions: The action each game just processed; None to encode that game in full (e.g. a new game of
+                        the same size)
+        :return: The batch array
+        """
+        for encoder, game, action in zip(self.encoders, games, actions):
+            encoder.update(game, action)
+
+        return self.buffer
+
+
+def encode(game, dtype=DEFAULT_DTYPE) -> np.ndarray:
+    """
+    :param game: Game object
+    :return: A new observation array
+    """
+    return ObservationEncoder(game.grid.size_x, game.grid.size_y, dtype=dtype).reset(game)
+
+
+if __name__ == "__main__":
+    pass
@@ -8,7 +8,6 @@
     actions could increase with future functionality; thus the concept is hopefully future-proof.
 """
 import Constants as Co
-import PyGameConstants as PCo
 
 
 class Feedback:
@@ -101,6 +100,9 @@ class GoToMenu(PyGameAction):
     """
 
     def execute(self) -> Feedback:
+        # Imported here so that the headless core never loads the PyGame modules
+        import PyGameConstants as PCo
+
         self.interface.state[PCo.CURRENT_SCREEN] = PCo.MENU_SCREEN
         return Feedback()
 
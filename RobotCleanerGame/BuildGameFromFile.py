@@ -4,8 +4,11 @@
 
 """
 from Constants import SET_PIECES_FOLDER
+import Constants as Co
 import Game as Gm
 import Interface as In
+import os
+import Trace as Tr
 
 # Set this value to false; toggle it with toggle_allow_solve() below
 allow_export_solve = False
@@ -13,6 +16,9 @@ allow_export_solve = False
 FILE_NAME = "game.rcgg"
 SOLVE_FILE = "solve.rcgs"
 
+# A pack holds many game files in one file: each is headed by its tag in brackets, and followed by a blank line
+PACK_SUFFIX = ".rcgk"
+
 
 def read_file_to_buffer(folder_path: str) -> [str]:
     """
@@ -88,6 +94,73 @@ def build_game_from_file(folder: str, game_tag: (str | None) = None, interface=N
     return game
 
 
+def build_buffer_from_game(game: Gm.Game) -> [str]:
+    """
+    The reverse of build_game_from_buffer: lay out a game's grid in the game file format.
+
+    :param game: RobotCleanerGame.Game object
+    :return: Buffer as list of strings
+    """
+    buffer = [f"{game.grid.size_x},{game.grid.size_y},{game.robot.coords[0]},{game.robot.coords[1]}"]
+
+    for y, row in enumerate(game.grid.grid):
+        for x, tile in enumerate(row):
+            if not (tile.is_empty() or tile.get_content() == Co.ROBOT_TOKEN):
+                buffer.append(f"{tile.get_content()}({x},{y})")
+
+    return buffer
+
+
+def export_game_file(folder_path: str, game: Gm.Game) -> None:
+    """
+    Write a game to a game file in the given folder, creating the folder if need be.
+
+    :param folder_path: Folder path
+    :param game: RobotCleanerGame.Game object
+    """
+    if not os.path.exists(folder_path):
+        os.makedirs(folder_path)
+
+    with open(os.path.join(folder_path, FILE_NAME), "w") as file:
+        file.write("\n".join(build_buffer_from_game(game)) + "\n")
+
+
+def format_pack_entry(tag: str, buffer: [str]) -> str:
+    """
+    :param tag: Game tag
+    :param buffer: Game file lines
+    :return: Pack entry, ending with its blank line
+    """
+    return f"[{tag}]\n" + "\n".join(buffer) + "\n\n"
+
+
+def read_pack(path: str):
+    """
+    Read a pack one entry at a time, so that packs of any size can be streamed.
+
+    :param path: Pack file path
+    :return: Generator of (tag, buffer)
+    """
+    tag = None
+    buffer = []
+
+    with open(path, "r") as file:
+        for line in file:
+            line = line.replace("\r", "").replace("\n", "")
+
+            if line.startswith("[") and line.endswith("]"):
+                tag = line[1:-1]
+                buffer = []
+            elif line:
+                buffer.append(line)
+            elif tag is not None:
+                yield tag, buffer
+                tag = None
+
+    if tag is not None:
+        yield tag, buffer
+
+
 def toggle_allow_solve():
     # Force the calling of this method
     global allow_export_solve
@@ -102,16 +175,17 @@ def export_solve(game_tag, history):
 
     print(f"Exporting solve to: {solve_file_path}")
 
-    data = ""
+    lines = []
 
     for a in history:
         try:
-            data = (data + a.__class__.__name__ + str(a.coords) + "\n").replace(" ", "")
+            lines.append(Tr.format_solve_line(a.__class__.__name__, a.coords) + "\n")
         except AttributeError:
             pass
 
-        with open(solve_file_path, "w") as file:
-            file.write(data)
+    # Build once, write once
+    with open(solve_file_path, "w") as file:
+        file.write("".join(lines))
 
 
 if __name__ == "__main__":
@@ -121,5 +195,6 @@ if __name__ == "__main__":
     g = build_game_from_file(SET_PIECES_FOLDER + tag + "/")
     g.interface = In.Interface(g)
     g.tag = tag
+    g.interface.start_trace(SET_PIECES_FOLDER + tag + "/" + Tr.TRACE_FILE)
 
     g.interface.start()
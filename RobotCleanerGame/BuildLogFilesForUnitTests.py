@@ -1,30 +1,32 @@
-from BuildGameFromFile import build_game_from_file
+from BuildGameFromFile import build_game_from_file, SOLVE_FILE
 from Constants import SET_PIECES_FOLDER
 from InterfaceFromFile import InterfaceFromFile
-import sys
+import os
 
 TESTCASE_LOG_FOLDER = "../UnitTesting/BaseLogs/"
 LOG_FILE_SUFFIX = ".log"
 
-TESTCASES = ["Tutorial_1", "Tutorial_2", "Tutorial_3", "Tutorial_4", "Tutorial_5"]
 
+def find_solved_set_pieces(folder: str = SET_PIECES_FOLDER) -> [str]:
+    """
+    Every set piece that has a solve file, and so can be replayed.
 
-def export_logs():
-    stdout_origin = sys.stdout
-
-    for game_tag in TESTCASES:
-        log_file = TESTCASE_LOG_FOLDER + game_tag + LOG_FILE_SUFFIX
+    :param folder: Set pieces folder
+    :return: Sorted list of game tags
+    """
+    return sorted([tag for tag in os.listdir(folder) if os.path.isfile(folder + tag + "/" + SOLVE_FILE)])
 
-        sys.stdout = open(log_file, "w")
 
-        g = build_game_from_file(SET_PIECES_FOLDER + game_tag)
-        g.interface = InterfaceFromFile(g, SET_PIECES_FOLDER + game_tag)
-
-        g.interface.start()
+def export_logs():
+    # The same cases RunUnitTests replays
+    for game_tag in find_solved_set_pieces():
+        log_file = TESTCASE_LOG_FOLDER + game_tag + LOG_FILE_SUFFIX
 
-        sys.stdout.close()
+        with open(log_file, "w") as file:
+            g = build_game_from_file(SET_PIECES_FOLDER + game_tag)
+            g.interface = InterfaceFromFile(g, SET_PIECES_FOLDER + game_tag, output=file)
 
-    sys.stdout = stdout_origin
+            g.interface.start()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,78 @@
+"""
+
+    Buffered console output for the console Interface.
+
+    Each frame (grid & stack) is built as one string and written with a single write, rather than with a print()
+    per line or per item. In repaint mode, the frame is kept at the top of the terminal and only the lines that
+    changed since the previous frame are rewritten, using ANSI cursor movement; whatever is printed after the frame
+    (the action list, feedback) is cleared on the next frame. This keeps terminal I/O small when watching a large
+    map over a slow connection.
+
+    Repaint mode needs an ANSI terminal at least as wide as the grid: wrapped lines would throw the cursor
+    positions off. It is off by default, so logs & captured output are unchanged.
+
+"""
+import sys
+
+CLEAR_SCREEN = "\x1b[H\x1b[2J"
+CLEAR_TO_END_OF_LINE = "\x1b[K"
+CLEAR_TO_END_OF_SCREEN = "\x1b[J"
+
+
+def move_cursor(row: int) -> str:
+    # Rows start at 1
+    return f"\x1b[{row};1H"
+
+
+class ConsoleRenderer:
+    def __init__(self, output=None, repaint: bool = False) -> None:
+        """
+        :param output: Writer, e.g. a StringIO; None writes to sys.stdout
+        :param repaint: Repaint only changed lines, with ANSI cursor movement
+        """
+        self.output = output
+        self.repaint = repaint
+        self.previous = None  # Lines of the previous frame; None draws the next frame in full
+
+    def get_stream(self):
+        # Looked up on every write, as print() does, so that redirecting sys.stdout still works
+        return self.output if self.output is not None else sys.stdout
+
+    def write(self, text: str) -> None:
+        stream = self.get_stream()
+        stream.write(text)
+        stream.flush()
+
+    def render(self, frame: str) -> None:
+        """
+        Write a frame.
+
+        :param frame: The whole frame, as written in full when not repainting
+        """
+        if not self.repaint:
+            self.write(frame)
+            return
+
+        lines = frame.split("\n")
+
+        if self.previous is None:
+            out = [CLEAR_SCREEN, frame]
+        else:
+            out = []
+            for row, line in enumerate(lines):
+                if row >= len(self.previous) or line != self.previous[row]:
+                    out += [move_cursor(row + 1), line, CLEAR_TO_END_OF_LINE]
+
+        # Park the cursor under the frame, clearing the output that followed the previous frame
+        out += [move_cursor(len(lines)), CLEAR_TO_END_OF_SCREEN]
+        self.previous = lines
+
+        self.write("".join(out))
+
+    def reset(self) -> None:
+        # Draw the next frame in full, e.g. after the terminal was cleared
+        self.previous = None
+
+
+if __name__ == "__main__":
+    pass
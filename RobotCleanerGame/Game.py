@@ -151,9 +151,10 @@ class Game:
             return False
 
         # Now check the grid; this is slower
+        cleared_content = {Co.BLOCKED_TILE, Co.EMPTY_TILE, Co.ROBOT_TOKEN} | Co.SET_OF_BINS
         for j in self.grid.grid:
             for i in j:
-                if not (i.get_content() in {Co.BLOCKED_TILE, Co.EMPTY_TILE, Co.ROBOT_TOKEN} | Co.SET_OF_BINS):
+                if not (i.get_content() in cleared_content):
                     return False
 
         # If we get here then the grid is cleared
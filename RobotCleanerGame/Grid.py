@@ -101,13 +101,7 @@ class Grid:
             self.grid.append(row)
 
     def __str__(self) -> str:
-        out = ""
-        for j in self.grid:
-            for i in j:
-                out = out + i.get_content()
-            out = out + "\n"
-
-        return out
+        return "".join("".join(tile.get_content() for tile in row) + "\n" for row in self.grid)
 
     def get_tile(self, coordinates: (int, int)) -> Tile:
         """
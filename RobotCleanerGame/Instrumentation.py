@@ -0,0 +1,139 @@
+"""
+
+    Optional timers & counters for the Interface control loop.
+
+    Set Interface.instrumentation to an Instrumentation object and Interface.start() & start_headless() time each
+    phase of every loop pass (see PHASES) and each Action type processed. With it left as None, the loops check a
+    local flag instead: no clock is read, nothing is recorded and no key is built, so there is no cost when it is
+    disabled.
+
+    Timings use time.perf_counter_ns(). The last `window` samples of each key are kept for rolling percentiles;
+    counts & totals cover the whole run. Results can be exported as JSON or CSV, or received as they happen through
+    a callback.
+
+"""
+from collections import deque
+import csv
+import json
+import math
+import time
+
+PHASE_BEGIN_OF_LOOP = "event_begin_of_loop"
+PHASE_DISPLAY_STATE = "display_state"
+PHASE_LISTEN_FOR_ACTION = "listen_for_action"
+PHASE_PROCESS_ACTION = "process_action"
+PHASE_IS_GRID_CLEARED = "is_grid_cleared"
+
+PHASES = [PHASE_BEGIN_OF_LOOP, PHASE_DISPLAY_STATE, PHASE_LISTEN_FOR_ACTION, PHASE_PROCESS_ACTION,
+          PHASE_IS_GRID_CLEARED]
+
+ACTION_PREFIX = "action:"
+
+COUNTER_LOOPS = "loops"
+COUNTER_SKIPPED = "skipped"  # Passes where listen_for_action returned None
+
+DEFAULT_WINDOW = 1000
+PERCENTILES = [50, 90, 99]
+
+NS_PER_MS = 1_000_000
+
+
+def now_ns() -> int:
+    return time.perf_counter_ns()
+
+
+class Instrumentation:
+    def __init__(self, window: int = DEFAULT_WINDOW, callback=None) -> None:
+        """
+        :param window: Number of recent samples kept per key for percentiles
+        :param callback: Optional callable(key, duration_ns), called for every sample
+        """
+        self.window = window
+        self.callback = callback
+
+        self.samples: {str: deque} = {}
+        self.counts: {str: int} = {}
+        self.totals: {str: int} = {}
+        self.maxima: {str: int} = {}
+        self.counters: {str: int} = {}
+
+    def record(self, key: str, duration_ns: int) -> None:
+        """
+        Record one timing sample.
+
+        :param key: Phase or action key
+        :param duration_ns: Duration in nanoseconds
+        """
+        try:
+            self.samples[key].append(duration_ns)
+            self.counts[key] += 1
+            self.totals[key] += duration_ns
+            if duration_ns > self.maxima[key]:
+                self.maxima[key] = duration_ns
+        except KeyError:
+            self.samples[key] = deque([duration_ns], maxlen=self.window)
+            self.counts[key] = 1
+            self.totals[key] = duration_ns
+            self.maxima[key] = duration_ns
+
+        if self.callback is not None:
+            self.callback(key, duration_ns)
+
+    def count(self, counter: str, n: int = 1) -> None:
+        self.counters[counter] = self.counters.get(counter, 0) + n
+
+    def percentile(self, key: str, p: float) -> float:
+        """
+        Nearest-rank percentile over the rolling window.
+
+        :param key: Phase or action key
+        :param p: Percentile, 0-100
+        :return: Duration in nanoseconds
+        """
+        ordered = sorted(self.samples[key])
+        rank = max(0, min(len(ordered), math.ceil(p / 100 * len(ordered))) - 1)
+        return ordered[rank]
+
+    def summary(self) -> {str: dict}:
+        """
+        :return: {key: {count, total_ms, mean_ms, p50_ms, p90_ms, p99_ms, max_ms}}
+        """
+        out = {}
+        for key in self.samples:
+            row = {
+                "count": self.counts[key],
+                "total_ms": self.totals[key] / NS_PER_MS,
+                "mean_ms": self.totals[key] / self.counts[key] / NS_PER_MS,
+            }
+            for p in PERCENTILES:
+                row[f"p{p}_ms"] = self.percentile(key, p) / NS_PER_MS
+            row["max_ms"] = self.maxima[key] / NS_PER_MS
+            out[key] = row
+
+        return out
+
+    def export_json(self, path: str) -> None:
+        with open(path, "w") as file:
+            json.dump({"timings": self.summary(), "counters": self.counters}, file, indent=2)
+
+    def export_csv(self, path: str) -> None:
+        fields = ["key", "count", "total_ms", "mean_ms"] + [f"p{p}_ms" for p in PERCENTILES] + ["max_ms"]
+
+        with open(path, "w", newline="") as file:
+            writer = csv.DictWriter(file, fieldnames=fields)
+            writer.writeheader()
+            for key, row in self.summary().items():
+                writer.writerow({"key": key} | row)
+            for counter, n in self.counters.items():
+                writer.writerow({"key": counter, "count": n})
+
+    def reset(self) -> None:
+        self.samples = {}
+        self.counts = {}
+        self.totals = {}
+        self.maxima = {}
+        self.counters = {}
+
+
+if __name__ == "__main__":
+    pass
@@ -6,75 +6,132 @@
 
 import Actions as Ac
 import BuildGameFromFile as Bd
+import ConsoleRenderer as Cr
+import Instrumentation as Im
 import Profile as Pr
+import ProfileDatabase as Db
 import string
+import time
+import Trace as Tr
 
 EXPORT_SOLVE = "export solve"
 
+# Render cadence for start_headless(); any positive number means every N steps
+RENDER_NEVER = 0
+RENDER_AT_END = -1
+
+# Actions which can't clear the grid, so start_headless() doesn't check for it after them
+ACTIONS_NOT_CLEARING = {Ac.Move.__name__, Ac.Refresh.__name__, Ac.Quit.__name__}
+
 
 class Interface:
-    def __init__(self, game=None, profile_name: (str | None) = None) -> None:
+    def __init__(self, game=None, profile_name: (str | None) = None, use_database: bool = False,
+                 output=None) -> None:
+        """
+        :param game: Game object
+        :param profile_name: Player profile to load, if any
+        :param use_database: Keep the profile in the shared SQLite database rather than its own .rcgp file
+        :param output: Writer for console output, e.g. a StringIO; None prints to sys.stdout
+        """
         self.game = game
+        self.output = output
+
+        # Frames are written in one go; set console.repaint to only redraw changed lines on an ANSI terminal
+        self.console = Cr.ConsoleRenderer(output)
 
         if profile_name is None:
             self.profile = None
         else:
-            self.profile = Pr.Profile(profile_name)
+            # Saves happen in the background so that completing a game never stalls the control loop
+            if use_database:
+                self.profile = Db.DatabaseProfile(profile_name, write_behind=True)
+            else:
+                self.profile = Pr.Profile(profile_name, write_behind=True)
             self.profile.load()
 
-    def display_state(self) -> None:
+        # Optional binary trace, written as actions are processed; see start_trace()
+        self.trace = None
+
+        # Optional timers around each phase of the control loop; see Instrumentation.py
+        self.instrumentation: (Im.Instrumentation | None) = None
+
+        # Set by start_headless(): user feedback is not written
+        self.headless = False
+
+    def start_trace(self, path: str, with_score: bool = True, with_hash: bool = True) -> None:
+        """
+        Record every action processed from now on into a binary trace file; see Trace.py
+
+        :param path: Trace file path
+        :param with_score: Store each action's score delta
+        :param with_hash: Store the state hash after each action
+        """
+        self.stop_trace()
+        self.trace = Tr.TraceWriter(path, with_score, with_hash)
+
+    def stop_trace(self) -> None:
+        if self.trace is not None:
+            self.trace.close()
+            self.trace = None
+
+    def build_frame(self) -> str:
+        """
+        :return: Grid & stack as one string, as display_state() writes it
+        """
+        lines = []
+
         if self.game.grid:
-            print(self.game.grid)
+            lines.append(str(self.game.grid))
         else:
-            print(f"Grid not initialised")
+            lines.append("Grid not initialised")
 
         if self.game.robot:
             if self.game.robot.stack:
-                print(f"Stack > ", end="")
-                max_idx = len(self.game.robot.stack) - 1
-                for index, item in enumerate(self.game.robot.stack):
-                    if index == max_idx:
-                        end = "\n"
-                    else:
-                        end = ", "
-                    print(f"{item}", end=end)
+                lines.append("Stack > " + ", ".join(str(item) for item in self.game.robot.stack))
             else:
-                print(f"Stack > empty")
-            print("")
+                lines.append("Stack > empty")
+            lines.append("")
         else:
-            print(f"Robot not initialised")
+            lines.append("Robot not initialised")
+
+        return "\n".join(lines) + "\n"
+
+    def display_state(self) -> None:
+        self.console.render(self.build_frame())
 
     def listen_for_action(self):
         # Child Interfaces may return None to skip a pass in their control loop
         lookup = {}
 
-        print(f"Please select an action:")
+        lines = ["Please select an action:"]
         for count, act in enumerate(self.game.get_possible_actions()):
             disp_count = count + 1
 
-            print(f"{disp_count} : ", end="")
             match act.__class__.__name__:
                 case Ac.Drop.__name__:
-                    print(f"drop to {act.coords}")
+                    lines.append(f"{disp_count} : drop to {act.coords}")
                 case Ac.Move.__name__:
-                    print(f"move to {act.coords}")
+                    lines.append(f"{disp_count} : move to {act.coords}")
                 case Ac.PickUp.__name__:
-                    print(f"pick-up from {act.coords}")
+                    lines.append(f"{disp_count} : pick-up from {act.coords}")
                 case Ac.Sweep.__name__:
-                    print(f"sweep {act.coords}")
+                    lines.append(f"{disp_count} : sweep {act.coords}")
                 case _:
                     raise ValueError(f"Interface.action_list_feedback: {act.__class__.__name__} not matched")
 
             lookup[disp_count] = act
 
         # Refresh command
-        print(f"R : Refresh")
+        lines.append(f"R : Refresh")
         lookup["r"] = Ac.Refresh(self)
 
         # Quit command
-        print(f"Q : Quit")
+        lines.append(f"Q : Quit")
         lookup["q"] = Ac.Quit(self)
 
+        # One write for the whole list
+        self.console.write("\n".join(lines) + "\n")
+
         while True:
             selected = request_input("\nSelect action: ")
 
@@ -86,11 +143,12 @@ class Interface:
                 return None
 
             # If we get to here, loop back with message
-            print("Value not accepted, please try again.\n")
+            print("Value not accepted, please try again.\n", file=self.output)
 
     def give_user_feedback(self, feedback: str) -> None:
         # Might need to be an instance class with inheritance
-        print(feedback)
+        if not self.headless:
+            print(feedback, file=self.output)
 
     def process_action(self, action) -> bool:
         # Boolean return determines whether the action is a stopper or not; False = stop
@@ -100,7 +158,13 @@ class Interface:
             self.game.history.append(action)
 
         if action:
+            old_score = self.game.score if self.game is not None else 0
+
             feedback = action.execute()
+
+            if self.trace is not None and self.game is not None:
+                self.trace.record_action(action, self.game.score - old_score, self.game)
+
             if feedback.message:
                 self.give_user_feedback(feedback.message)
 
@@ -122,37 +186,169 @@ class Interface:
         # This method isn't static as it may be used for more complex functionality via inheritance
         self.give_user_feedback(f"\nQuitting game.")
 
+    def close(self) -> None:
+        """
+        Release what the interface holds for the session: the trace file & the profile's writer.
+        """
+        self.stop_trace()
+        if self.profile:
+            self.profile.close()
+
     def start(self) -> None:
         """
         The control loop.
 
         User input is defined into Actions; those Actions are then processed.
 
+        Each phase, and each Action type processed, is timed by self.instrumentation if it is set.
+
         """
         go = True
 
+        # Decided once per run; with no instrumentation, no clock is read & no key is built
+        im = self.instrumentation
+        timed = im is not None
+        clock = Im.now_ns
+
         # One-off events at the start, e.g. title screen
         self.event_start()
 
         while go:
+            if timed:
+                im.count(Im.COUNTER_LOOPS)
+                t0 = clock()
+
             # Stuff that happens at the start of a loop pass, but isn't strictly related to display of the state
             self.event_begin_of_loop()
+            if timed:
+                t1 = clock()
 
             # Display the current game state to user
             self.display_state()
+            if timed:
+                t2 = clock()
 
             # Listen for action from user; skip this pass if Action is None
-            if (action := self.listen_for_action()) is None:
+            action = self.listen_for_action()
+            if timed:
+                t3 = clock()
+                im.record(Im.PHASE_BEGIN_OF_LOOP, t1 - t0)
+                im.record(Im.PHASE_DISPLAY_STATE, t2 - t1)
+                im.record(Im.PHASE_LISTEN_FOR_ACTION, t3 - t2)
+                if action is None:
+                    im.count(Im.COUNTER_SKIPPED)
+
+            if action is None:
                 continue
 
             # If processing the action returns False,this stops the current While loop
             go = self.process_action(action)
+            if timed:
+                t4 = clock()
+                im.record(Im.PHASE_PROCESS_ACTION, t4 - t3)
+                im.record(Im.ACTION_PREFIX + action.__class__.__name__, t4 - t3)
+
+            if self.game is not None:
+                cleared = self.game.is_grid_cleared()
+                if timed:
+                    im.record(Im.PHASE_IS_GRID_CLEARED, clock() - t4)
+                if cleared:
+                    self.event_grid_cleared()
+        else:
+            # This catches 'go' turning to False, which should be a Quit action
+            self.close()
+            self.event_quit()
+
+    def start_headless(self, render_every: int = RENDER_NEVER) -> dict:
+        """
+        The control loop for replays & agents, where nobody watches every step: the same actions are processed, but
+        the state is only displayed at the given cadence, feedback is not written, and the grid is only checked for
+        being cleared after actions that could clear it (and once before the first, for a level which starts
+        cleared). A one-line summary is written at the end.
+
+        listen_for_action() must not need the console, as InterfaceFromFile's doesn't. Phases are timed by
+        self.instrumentation as in start().
+
+        :param render_every: Display the state every N steps; RENDER_AT_END for the final state only; RENDER_NEVER
+        :return: Summary: tag, steps, score, cleared, seconds
+        """
+        steps = 0
+        cleared = False
 
+        # As in start(): with no instrumentation, no clock is read & no key is built
+        im = self.instrumentation
+        timed = im is not None
+        clock = Im.now_ns
+
+        self.headless = True
+        start = time.perf_counter()
+
+        try:
+            # Checked once up front, as a level already cleared, or a replay of only Moves, is never checked after
             if self.game is not None and self.game.is_grid_cleared():
+                cleared = True
                 self.event_grid_cleared()
-        else:
-            # This catches 'go' turning to False, which should be a Quit action
+
+            while True:
+                if timed:
+                    im.count(Im.COUNTER_LOOPS)
+                    t0 = clock()
+
+                action = self.listen_for_action()
+                if timed:
+                    t1 = clock()
+                    im.record(Im.PHASE_LISTEN_FOR_ACTION, t1 - t0)
+                    if action is None:
+                        im.count(Im.COUNTER_SKIPPED)
+
+                if action is None:
+                    continue
+
+                go = self.process_action(action)
+                if timed:
+                    t2 = clock()
+                    im.record(Im.PHASE_PROCESS_ACTION, t2 - t1)
+                    im.record(Im.ACTION_PREFIX + action.__class__.__name__, t2 - t1)
+
+                if not go:
+                    # Quit isn't a step
+                    break
+
+                steps += 1
+
+                if render_every > 0 and steps % render_every == 0:
+                    self.display_state()
+                    if timed:
+                        im.record(Im.PHASE_DISPLAY_STATE, clock() - t2)
+
+                if (not cleared and self.game is not None
+                        and action.__class__.__name__ not in ACTIONS_NOT_CLEARING):
+                    if timed:
+                        t3 = clock()
+                    cleared = self.game.is_grid_cleared()
+                    if timed:
+                        im.record(Im.PHASE_IS_GRID_CLEARED, clock() - t3)
+                    if cleared:
+                        self.event_grid_cleared()
+
             self.event_quit()
+        finally:
+            # Also if an action raised, so that the trace & the profile's saves are still written
+            self.headless = False
+            self.close()
+
+        seconds = time.perf_counter() - start
+
+        if render_every == RENDER_AT_END and self.game is not None:
+            self.display_state()
+
+        summary = {"tag": self.game.tag if self.game is not None else None, "steps": steps,
+                   "score": self.game.score if self.game is not None else None, "cleared": cleared,
+                   "seconds": seconds}
+        self.console.write(f"{summary['tag']}: {steps} steps, score {summary['score']}, cleared: {cleared} "
+                           f"({seconds * 1000:.1f} ms)\n")
+
+        return summary
 
 
 def request_input(prompt: str, convert_to_int=True, convert_to_lowercase=True) -> str:
@@ -10,8 +10,8 @@ import Interface as In
 
 
 class InterfaceFromFile(In.Interface):
-    def __init__(self, game, folder_path) -> None:
-        super().__init__(game)
+    def __init__(self, game, folder_path, output=None) -> None:
+        super().__init__(game, output=output)
         self.__actionList: [Action] = []
         solve_path = folder_path + "/" + SOLVE_FILE
         with open(solve_path, "r") as file:
@@ -47,7 +47,7 @@ class InterfaceFromFile(In.Interface):
         try:
             return self.__actionList.pop(0)
         except IndexError:
-            print("End of Action list from file.")
+            self.give_user_feedback("End of Action list from file.")
             return Quit(self)
 
 
@@ -0,0 +1,222 @@
+"""
+
+    Level fingerprints: a hash that is the same for levels which only differ by a rotation, a reflection or a swap
+    of item colours, since those play exactly alike.
+
+    A level (grid & robot start) is canonicalised as follows:
+     - it is laid out under each of the 8 symmetries of the square (rotations & reflections; a transposed
+       non-square grid swaps its sizes)
+     - in each, colours are relabelled in order of first appearance, r/R first, then g/G, then b/B, so an item
+       colour & its bin change together; the universal bin, messes & blocked tiles are left alone
+     - the smallest of the 8 byte strings (sizes, robot tile, cells) is the canonical form
+    and the fingerprint is a BLAKE2b digest of it.
+
+    dedupe() streams a folder of set pieces or a pack (see BuildGameFromFile.read_pack) through a Bloom filter,
+    whose memory is fixed up front by the number of levels expected & the false positive rate allowed, so corpora
+    of any size can be checked. A false positive counts a unique level as a duplicate, at the given rate.
+
+    Usage, from the RobotCleanerGame folder:
+        python LevelFingerprint.py corpus.rcgk --output unique.rcgk
+        python LevelFingerprint.py ../GameFiles/SetPieces/
+
+"""
+import argparse
+import BuildGameFromFile as Bd
+from functools import lru_cache
+import hashlib
+import LevelGenerator as Lg
+import math
+from operator import itemgetter
+import os
+import time
+
+DIGEST_SIZE = 16
+
+DEFAULT_CAPACITY = 1_000_000
+DEFAULT_ERROR_RATE = 1e-6
+
+# (item, bin) pairs, in the order of the canonical labels
+COLOURS = [(ord("r"), ord("R")), (ord("g"), ord("G")), (ord("b"), ord("B"))]
+
+
+@lru_cache(maxsize=None)
+def get_symmetries(size_x: int, size_y: int) -> [(int, int, [int], itemgetter)]:
+    """
+    The 8 symmetries of a grid size.
+
+    :return: List of (new horizontal size, new vertical size, source tile index of each new tile index, getter of
+             the new cells from the old)
+    """
+    w, h = size_x, size_y
+    moves = [
+        (w, h, lambda x, y: (x, y)),
+        (h, w, lambda x, y: (h - 1 - y, x)),          # Quarter turn clockwise
+        (w, h, lambda x, y: (w - 1 - x, h - 1 - y)),  # Half turn
+        (h, w, lambda x, y: (y, w - 1 - x)),          # Quarter turn anticlockwise
+        (w, h, lambda x, y: (w - 1 - x, y)),          # Mirror left to right
+        (w, h, lambda x, y: (x, h - 1 - y)),          # Mirror top to bottom
+        (h, w, lambda x, y: (y, x)),                  # Transpose
+        (h, w, lambda x, y: (h - 1 - y, w - 1 - x)),  # Anti-transpose
+    ]
+
+    symmetries = []
+    for new_w, new_h, move in moves:
+        source = [0] * (w * h)
+        for y in range(h):
+            for x in range(w):
+                new_x, new_y = move(x, y)
+                source[new_y * new_w + new_x] = y * w + x
+        # itemgetter() of one index returns the cell itself, not a tuple; a slice keeps a 1x1 grid a sequence
+        getter = itemgetter(*source) if len(source) > 1 else itemgetter(slice(0, len(source)))
+        symmetries.append((new_w, new_h, source, getter))
+
+    return symmetries
+
+
+def relabel_colours(cells: bytes) -> bytes:
+    # Colours in order of first appearance become r, g & b in turn
+    def first(colour: (int, int)) -> int:
+        found = [i for i in (cells.find(colour[0]), cells.find(colour[1])) if i >= 0]
+        return min(found) if found else len(cells)
+
+    order = sorted(COLOURS, key=first)
+    table = bytearray(range(256))
+    for (item, bin_), (new_item, new_bin) in zip(order, COLOURS):
+        table[item] = new_item
+        table[bin_] = new_bin
+
+    return cells.translate(table)
+
+
+def canonical_form(size_x: int, size_y: int, robot: int, cells: bytes) -> bytes:
+    """
+    :param size_x: Horizontal size of Grid
+    :param size_y: Vertical size of Grid
+    :param robot: Robot tile index
+    :param cells: One token character per tile, as in Solver.Level
+    :return: The same bytes for every level equivalent to this one
+    """
+    forms = []
+    for new_w, new_h, source, getter in get_symmetries(size_x, size_y):
+        moved = relabel_colours(bytes(getter(cells)))
+        forms.append(new_w.to_bytes(2, "little") + new_h.to_bytes(2, "little") +
+                     source.index(robot).to_bytes(4, "little") + moved)
+
+    return min(forms)
+
+
+def fingerprint(size_x: int, size_y: int, robot: int, cells: bytes) -> bytes:
+    return hashlib.blake2b(canonical_form(size_x, size_y, robot, cells), digest_size=DIGEST_SIZE).digest()
+
+
+def fingerprint_buffer(buffer: [str]) -> bytes:
+    """
+    :param buffer: Game file lines
+    :return: Fingerprint, DIGEST_SIZE bytes
+    """
+    return fingerprint(*Lg.parse_layout(buffer))
+
+
+def fingerprint_game(game) -> bytes:
+    """
+    :param game: Game object; the grid & robot as they are now, ignoring its stack
+    :return: Fingerprint, DIGEST_SIZE bytes
+    """
+    return fingerprint_buffer(Bd.build_buffer_from_game(game))
+
+
+class BloomFilter:
+    """
+        Set of fingerprints in fixed memory, with a chance of false positives but none of false negatives.
+    """
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY, error_rate: float = DEFAULT_ERROR_RATE) -> None:
+        """
+        :param capacity: Number of fingerprints expected
+        :param error_rate: Chance of a false positive once capacity fingerprints were added
+        """
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def add(self, digest: bytes) -> bool:
+        """
+        :param digest: Fingerprint
+        :return: True if the fingerprint was not (as far as the filter can tell) added before
+        """
+        # Double hashing: bit i is h1 + i * h2, from two halves of the digest
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:16], "little") | 1
+        is_new = False
+
+        for i in range(self.hashes):
+            bit = (h1 + i * h2) % self.bits
+            mask = 1 << (bit & 7)
+            if not self.array[bit >> 3] & mask:
+                self.array[bit >> 3] |= mask
+                is_new = True
+
+        self.count += is_new
+        return is_new
+
+    def get_error_rate(self) -> float:
+        # Chance that the next unique fingerprint is taken for a duplicate
+        return (1 - math.exp(-self.hashes * self.count / self.bits)) ** self.hashes
+
+
+def read_levels(path: str):
+    """
+    :param path: Pack file, or folder of set piece folders
+    :return: Generator of (tag, game file lines)
+    """
+    if os.path.isfile(path):
+        yield from Bd.read_pack(path)
+        return
+
+    for tag in sorted(os.listdir(path)):
+        if os.path.isfile(os.path.join(path, tag, Bd.FILE_NAME)):
+            yield tag, Bd.read_file_to_buffer(os.path.join(path, tag))
+
+
+def dedupe(path: str, output=None, capacity: int = DEFAULT_CAPACITY,
+           error_rate: float = DEFAULT_ERROR_RATE) -> dict:
+    """
+    Stream levels through a Bloom filter, keeping the first of each set of equivalent levels.
+
+    :param path: Pack file, or folder of set piece folders
+    :param output: Writer for a pack of the unique levels; None to only count them
+    :param capacity: Number of levels expected
+    :param error_rate: False positive rate allowed at capacity
+    :return: {levels, unique, duplicates, error_rate (estimated at the end), seconds}
+    """
+    seen = BloomFilter(capacity, error_rate)
+    levels = 0
+
+    start = time.perf_counter()
+
+    for tag, buffer in read_levels(path):
+        levels += 1
+        if seen.add(fingerprint_buffer(buffer)) and output is not None:
+            output.write(Bd.format_pack_entry(tag, buffer))
+
+    return {"levels": levels, "unique": seen.count, "duplicates": levels - seen.count,
+            "error_rate": seen.get_error_rate(), "seconds": time.perf_counter() - start}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count (and drop) RobotCleanerGame levels that play alike")
+    parser.add_argument("path", help=f"pack file ({Bd.PACK_SUFFIX}) or folder of set pieces")
+    parser.add_argument("--output", default=None, help="pack file to write the unique levels to")
+    parser.add_argument("--capacity", type=int, default=DEFAULT_CAPACITY, help="number of levels expected")
+    parser.add_argument("--error-rate", type=float, default=DEFAULT_ERROR_RATE, help="false positive rate allowed")
+    args = parser.parse_args()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            report = dedupe(args.path, file, args.capacity, args.error_rate)
+    else:
+        report = dedupe(args.path, None, args.capacity, args.error_rate)
+
+    print(f"{report['levels']:,} level(s), {report['unique']:,} unique, {report['duplicates']:,} duplicate(s) in "
+          f"{report['seconds']:.2f} s; false positive rate {report['error_rate']:.1e}")
@@ -0,0 +1,261 @@
+"""
+
+    Procedural level generator: random levels in the game file format, checked to be clearable.
+
+    A level is drawn from a seed, a size, a density of blocked tiles and counts of items, bins & messes. Item
+    colours are random; the bins cover every colour used (the universal bin stands in when there are fewer bins
+    than colours). Each level is checked with Solver.Level.check_reachable(), a flood fill that takes microseconds,
+    or, with --verify solver, solved outright within a node limit, through the SolverCache unless with --no-cache;
+    a layout that fails is drawn again.
+
+    Level i of a run is drawn from its own seed "<seed>:<i>", so a corpus is the same whatever the number of
+    workers. Levels are made in a process pool, in chunks, and streamed to disk in order as the chunks complete:
+     - to a pack file (ending in .rcgk; see BuildGameFromFile.read_pack), one entry per level (by default
+       GameFiles/Generated/generated.rcgk), or
+     - to a folder, as set piece folders holding game.rcgg, as in SetPieces
+
+    Usage, from the RobotCleanerGame folder:
+        python LevelGenerator.py --count 100000 --size 12 12 --items 6 --bins 3 --mess 4
+        python LevelGenerator.py --count 20 --verify solver --output ../GameFiles/Generated/
+
+"""
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+from multiprocessing import Pool
+import os
+import random
+import Solver as So
+import SolverCache as Sc
+import sys
+import time
+
+VERIFY_REACHABLE = "reachable"
+VERIFY_SOLVER = "solver"
+
+DEFAULT_MAX_ATTEMPTS = 100
+DEFAULT_CHUNK_SIZE = 500
+DEFAULT_SOLVER_NODES = 100_000
+
+TAG_PREFIX = "Generated"
+
+# Default home of generated packs; ignored by git, as corpora can be large
+GENERATED_FOLDER_PATH = "../GameFiles/Generated/"
+
+ITEM_TO_OWN_BIN = {"r": "R", "g": "G", "b": "B"}
+
+
+def get_tag(seed: int, index: int) -> str:
+    return f"{TAG_PREFIX}_{seed}_{index}"
+
+
+def draw_layout(rng: random.Random, size_x: int, size_y: int, blocked: float, items: int, bins: int,
+                messes: int) -> (tuple | None):
+    """
+    Draw one layout, without checking it.
+
+    :return: (robot tile index: int, cells: bytearray, one token character per tile, as in Solver.Level); None if the
+             tokens don't fit on the open tiles
+    """
+    size = size_x * size_y
+    robot = rng.randrange(size)
+
+    cells = bytearray(So.EMPTY for _ in range(size))
+    open_tiles = []
+    for index in range(size):
+        if index != robot and rng.random() < blocked:
+            cells[index] = So.BLOCKED
+        elif index != robot:
+            open_tiles.append(index)
+
+    if items + bins + messes > len(open_tiles):
+        return None
+
+    item_tokens = [rng.choice(sorted(Co.SET_OF_ITEMS)) for _ in range(items)]
+
+    # One own bin per colour used, or the universal bin if there aren't enough; any spare bins are random
+    bin_tokens = sorted({ITEM_TO_OWN_BIN[item] for item in item_tokens})
+    if len(bin_tokens) > bins:
+        bin_tokens = bin_tokens[:max(0, bins - 1)] + [Co.UNIVERSAL_BIN] * min(1, bins)
+    bin_tokens += [rng.choice(sorted(Co.SET_OF_BINS)) for _ in range(bins - len(bin_tokens))]
+
+    tokens = item_tokens + bin_tokens + ["m"] * messes
+    for index, token in zip(rng.sample(open_tiles, len(tokens)), tokens):
+        cells[index] = ord(token)
+
+    return robot, cells
+
+
+def format_layout(size_x: int, size_y: int, robot: int, cells: bytes) -> [str]:
+    """
+    :return: Game file lines; see BuildGameFromFile.build_game_from_buffer()
+    """
+    buffer = [f"{size_x},{size_y},{robot % size_x},{robot // size_x}"]
+
+    for index, content in enumerate(cells):
+        if content != So.EMPTY:
+            buffer.append(f"{chr(content)}({index % size_x},{index // size_x})")
+
+    return buffer
+
+
+def parse_layout(buffer: [str]) -> (int, int, int, bytearray):
+    """
+    The reverse of format_layout(), for any game file, without building a Game.
+
+    :param buffer: Game file lines
+    :return: Horizontal size, vertical size, robot tile index, cells
+    """
+    size_x, size_y, robot_x, robot_y = (int(value) for value in buffer[0].split(","))
+    cells = bytearray(So.EMPTY for _ in range(size_x * size_y))
+
+    for line in buffer[1:]:
+        line = line.split("#", 1)[0]  # strip out comments
+        x, y = line[1:].replace("(", "").replace(")", "").split(",")
+        cells[int(y) * size_x + int(x)] = ord(line[0])
+
+    return size_x, size_y, robot_y * size_x + robot_x, cells
+
+
+def generate_level(rng: random.Random, size_x: int, size_y: int, blocked: float = 0.2, items: int = 3,
+                   bins: int = 3, messes: int = 0, verify: str = VERIFY_REACHABLE,
+                   max_attempts: int = DEFAULT_MAX_ATTEMPTS, max_nodes: int = DEFAULT_SOLVER_NODES,
+                   use_cache: bool = True) -> [str]:
+    """
+    Draw layouts until one can be cleared.
+
+    :param rng: Random generator
+    :param size_x: Horizontal size of Grid
+    :param size_y: Vertical size of Grid
+    :param blocked: Chance of each tile being blocked
+    :param items: Number of items
+    :param bins: Number of bins
+    :param messes: Number of messes
+    :param verify: VERIFY_REACHABLE, or VERIFY_SOLVER to keep only levels the Solver clears within max_nodes
+    :param max_attempts: Layouts to draw before giving up
+    :param max_nodes: Node limit for VERIFY_SOLVER
+    :param use_cache: False to solve for VERIFY_SOLVER without the SolverCache
+    :return: Game file lines; None if no layout passed
+    """
+    for _ in range(max_attempts):
+        if (layout := draw_layout(rng, size_x, size_y, blocked, items, bins, messes)) is None:
+            continue
+
+        robot, cells = layout
+        level = So.Level(size_x, size_y, bytes(cells), robot)
+
+        if not level.check_reachable():
+            continue
+
+        buffer = format_layout(size_x, size_y, robot, cells)
+
+        if verify == VERIFY_SOLVER:
+            result = Sc.solve_cached(buffer, max_nodes) if use_cache else So.Solver(level).solve(max_nodes)
+            if result["status"] != So.STATUS_SOLVED:
+                continue
+
+        return buffer
+
+    return None
+
+
+def generate_chunk(seed: int, start: int, stop: int, settings: dict) -> [(str, [str])]:
+    """
+    Make levels start to stop - 1; runs in a worker process.
+
+    :param seed: Base seed
+    :param settings: Keyword arguments of generate_level()
+    :return: List of (tag, game file lines); levels that failed are left out
+    """
+    chunk = []
+    for index in range(start, stop):
+        buffer = generate_level(random.Random(f"{seed}:{index}"), **settings)
+        if buffer is not None:
+            chunk.append((get_tag(seed, index), buffer))
+
+    return chunk
+
+
+def _generate_chunk(args: tuple) -> [(str, [str])]:
+    # Pool.imap passes a single argument
+    return generate_chunk(*args)
+
+
+def write_level(output: str, tag: str, buffer: [str], pack_file=None) -> None:
+    """
+    :param output: Pack file or folder path
+    :param tag: Game tag
+    :param buffer: Game file lines
+    :param pack_file: Open pack file, when writing a pack
+    """
+    if pack_file is not None:
+        pack_file.write(Bd.format_pack_entry(tag, buffer))
+        return
+
+    folder_path = os.path.join(output, tag)
+    os.makedirs(folder_path, exist_ok=True)
+
+    with open(os.path.join(folder_path, Bd.FILE_NAME), "w") as file:
+        file.write("\n".join(buffer) + "\n")
+
+
+def generate_corpus(output: str, count: int, seed: int = 0, workers: (int | None) = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE, **settings) -> (int, int):
+    """
+    Make levels in a process pool, writing them in order as they come.
+
+    :param output: Pack file path (ending in Bd.PACK_SUFFIX), or folder for set piece folders
+    :param count: Number of levels to try
+    :param seed: Base seed
+    :param workers: Number of processes; None for one per CPU
+    :param chunk_size: Levels per task
+    :param settings: Keyword arguments of generate_level()
+    :return: Levels written, levels that failed
+    """
+    tasks = [(seed, start, min(count, start + chunk_size), settings) for start in range(0, count, chunk_size)]
+    written = 0
+
+    is_pack = output.endswith(Bd.PACK_SUFFIX)
+    if is_pack:
+        os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+
+    with open(output, "w") if is_pack else open(os.devnull, "w") as file, Pool(workers) as pool:
+        for chunk in pool.imap(_generate_chunk, tasks):
+            for tag, buffer in chunk:
+                write_level(output, tag, buffer, file if is_pack else None)
+            written += len(chunk)
+
+    return written, count - written
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate clearable RobotCleanerGame levels")
+    parser.add_argument("--count", type=int, default=100, help="levels to generate")
+    parser.add_argument("--size", type=int, nargs=2, default=[8, 8], metavar=("X", "Y"), help="grid size")
+    parser.add_argument("--blocked", type=float, default=0.2, help="chance of each tile being blocked")
+    parser.add_argument("--items", type=int, default=3, help="items per level")
+    parser.add_argument("--bins", type=int, default=3, help="bins per level")
+    parser.add_argument("--mess", type=int, default=0, help="messes per level")
+    parser.add_argument("--seed", type=int, default=0, help="base seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes; default one per CPU")
+    parser.add_argument("--verify", choices=[VERIFY_REACHABLE, VERIFY_SOLVER], default=VERIFY_REACHABLE,
+                        help="check levels by reachability, or by solving them")
+    parser.add_argument("--max-nodes", type=int, default=DEFAULT_SOLVER_NODES, help="node limit with --verify solver")
+    parser.add_argument("--no-cache", action="store_true", help="don't use the SolverCache with --verify solver")
+    parser.add_argument("--output", default=GENERATED_FOLDER_PATH + "generated" + Bd.PACK_SUFFIX,
+                        help=f"pack file ending in {Bd.PACK_SUFFIX}, or a folder for set piece folders")
+    args = parser.parse_args()
+
+    start_time = time.perf_counter()
+
+    made, failed = generate_corpus(args.output, args.count, args.seed, args.workers, size_x=args.size[0],
+                                   size_y=args.size[1], blocked=args.blocked, items=args.items, bins=args.bins,
+                                   messes=args.mess, verify=args.verify, max_nodes=args.max_nodes,
+                                   use_cache=not args.no_cache)
+
+    wall = time.perf_counter() - start_time
+    print(f"{made} level(s) written to {args.output} in {wall:.2f} s ({made / wall:,.0f} levels/s); "
+          f"{failed} failed", file=sys.stderr)
+
+    if failed:
+        sys.exit(1)
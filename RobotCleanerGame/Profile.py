@@ -1,22 +1,156 @@
 """
     The Profile class stores variables associated to a particular player's play through.
+
+    Saving can be handed to a ProfileWriter, which writes in the background so that the game loop never waits on
+    the disk. Pending saves are coalesced: only the latest state is written. A write that fails is raised in the
+    game's thread by the next save, or by close().
 """
 import os
+import threading
 
 PROFILE_FOLDER_PATH = "../GameFiles/Profiles/"
 PROFILE_FILE_SUFFIX = ".rcgp"
 SEPARATOR = ","
+TEMP_FILE_SUFFIX = ".tmp"
+
+
+def read_completed(file_path: str) -> {str: int}:
+    """
+    Read a profile file.
+
+    :param file_path: Profile file path
+    :return: {game label: score}
+    """
+    completed = {}
+    with open(file_path, "r") as file:
+        for line in file:
+            key, data = line.split(SEPARATOR)
+            completed[key] = int(data)
+
+    return completed
+
+
+def write_completed(file_path: str, completed: {str: int}) -> None:
+    """
+    Write a completed dict to a profile file atomically: write a temp file, then rename it over the old one.
+
+    :param file_path: Profile file path
+    :param completed: {game label: score}
+    """
+    temp_path = file_path + TEMP_FILE_SUFFIX
+
+    with open(temp_path, "w") as file:
+        file.write("".join([k + SEPARATOR + str(v) + "\n" for k, v in sorted(completed.items())]))
+
+    os.replace(temp_path, file_path)
+
+
+class ProfileWriter(threading.Thread):
+    """
+        Background writer for a single profile file. Subclasses may write elsewhere by overriding write(), which is
+        only ever called on the writer thread.
+    """
+
+    def __init__(self, file_path: str) -> None:
+        super().__init__(name="ProfileWriter", daemon=True)
+        self.file_path = file_path
+        self.error: (Exception | None) = None
+
+        self.__condition = threading.Condition()
+        self.__pending: ({str: int} | None) = None
+        self.__busy = False
+        self.__closed = False
+
+        self.start()
+
+    def submit(self, completed: {str: int}) -> None:
+        """
+        Queue a snapshot to be written; replaces any snapshot not yet written.
+
+        :param completed: {game label: score}; must not be mutated afterwards
+        :raises Exception: The error of an earlier write which failed; the snapshot is queued regardless, as it
+                           holds the failed one
+        """
+        with self.__condition:
+            self.__pending = completed
+            self.__condition.notify_all()
+
+        self.raise_error()
+
+    def raise_error(self) -> None:
+        """
+        Raise the error of a write which failed since the last call, if any.
+        """
+        with self.__condition:
+            error, self.error = self.error, None
+
+        if error is not None:
+            raise error
+
+    def run(self) -> None:
+        while True:
+            with self.__condition:
+                while self.__pending is None and not self.__closed:
+                    self.__condition.wait()
+
+                if self.__pending is None:
+                    # Closed and nothing left to write
+                    return
+
+                completed, self.__pending = self.__pending, None
+                self.__busy = True
+
+            try:
+                self.write(completed)
+            except Exception as e:
+                # Kept for the game's thread to raise; the next snapshot is still written
+                self.error = e
+            finally:
+                with self.__condition:
+                    self.__busy = False
+                    self.__condition.notify_all()
+
+    def write(self, completed: {str: int}) -> None:
+        write_completed(self.file_path, completed)
+
+    def flush(self) -> None:
+        """
+        Block until everything submitted so far is on disk.
+        """
+        with self.__condition:
+            while self.__pending is not None or self.__busy:
+                self.__condition.wait()
+
+    def close(self) -> None:
+        """
+        Flush, then stop the writer thread.
+
+        :raises Exception: The error of a write which failed since the last save
+        """
+        with self.__condition:
+            self.__closed = True
+            self.__condition.notify_all()
+
+        self.join()
+        self.raise_error()
 
 
 class Profile:
-    def __init__(self, name: str = "Player"):
+    def __init__(self, name: str = "Player", write_behind: bool = False):
+        """
+        :param name: Player name
+        :param write_behind: Save in a background thread rather than in the caller
+        """
         self.name = name
         self.completed: {str: int} = {}
+        self.writer: (ProfileWriter | None) = ProfileWriter(self.get_file_path()) if write_behind else None
+
+    def get_file_path(self) -> str:
+        return PROFILE_FOLDER_PATH + self.name + PROFILE_FILE_SUFFIX
 
     def add_completed(self, game_label: str, score: int):
+        # Sorting is left to save(), off the game loop
         self.completed[game_label] = score
-        # Sort after insertion
-        self.completed = dict(sorted(self.completed.items()))
 
     def reset_completed(self):
         self.completed = {}
@@ -24,19 +158,36 @@ class Profile:
     def load(self):
         try:
             # Check that a profile file exists; if so, load it
-            with open(PROFILE_FOLDER_PATH + self.name + PROFILE_FILE_SUFFIX, "r") as file:
-                for line in file:
-                    key, data = line.split(SEPARATOR)
-                    self.completed[key] = int(data)
+            self.completed.update(read_completed(self.get_file_path()))
 
         except FileNotFoundError:
             pass
 
     def save(self):
         # Save should be called only when something is added to the completed list; we can assume it will be non-empty
-        with open(PROFILE_FOLDER_PATH + self.name + PROFILE_FILE_SUFFIX, "w") as file:
-            for k in self.completed:
-                file.write(k + SEPARATOR + str(self.completed[k]) + "\n")
+        if self.writer is None:
+            write_completed(self.get_file_path(), self.completed)
+        else:
+            # Hand over a copy, so the game can carry on changing its own dict
+            self.writer.submit(dict(self.completed))
+
+    def get_level_scores(self) -> {str: (int | None, int | None)}:
+        """
+        Scores to show per level: this player's best, and the best of any player where the backend knows it.
+
+        :return: {game label: (own best score, top score)}
+        """
+        return {k: (v, None) for k, v in self.completed.items()}
+
+    def flush(self):
+        if self.writer is not None:
+            self.writer.flush()
+
+    def close(self):
+        # Call on quit; makes sure all saves are written
+        if self.writer is not None:
+            writer, self.writer = self.writer, None
+            writer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,252 @@
+"""
+    SQLite backend for profiles & high scores.
+
+    All players share one database, so cross-player queries (e.g. a leaderboard per level) are a single indexed
+    query rather than opening and parsing every .rcgp file.
+
+    players: one row per player name
+    scores: one row per (player, level) with the best score and the time it was set
+
+    DatabaseProfile is a drop-in replacement for Profile.Profile; existing .rcgp files can be brought over with
+    migrate_profile_files(). With write_behind, saves go through a DatabaseWriter: the same coalescing writer thread
+    as for profile files, holding its own connection, opened on that thread (sqlite3 connections are tied to the
+    thread which opened them).
+"""
+import os
+import Profile as Pr
+import sqlite3
+import time
+
+PROFILE_DATABASE_PATH = Pr.PROFILE_FOLDER_PATH + "profiles.rcgdb"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE
+);
+
+CREATE TABLE IF NOT EXISTS scores (
+    player_id INTEGER NOT NULL REFERENCES players(id),
+    level TEXT NOT NULL,
+    best_score INTEGER NOT NULL,
+    timestamp REAL NOT NULL,
+    PRIMARY KEY (player_id, level)
+);
+
+CREATE INDEX IF NOT EXISTS scores_by_level ON scores(level, best_score DESC);
+"""
+
+# Write-ahead logging keeps a save from stalling on a full sync of the database file
+PRAGMAS = """
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+"""
+
+# Only overwrite a stored score with a better one
+UPSERT_SCORE = """
+INSERT INTO scores (player_id, level, best_score, timestamp)
+VALUES ((SELECT id FROM players WHERE name = ?), ?, ?, ?)
+ON CONFLICT (player_id, level) DO UPDATE SET best_score = excluded.best_score, timestamp = excluded.timestamp
+WHERE excluded.best_score > scores.best_score
+"""
+
+
+class ProfileDatabase:
+    def __init__(self, path: str = PROFILE_DATABASE_PATH) -> None:
+        """
+        :param path: Database file path; ":memory:" for a throwaway database
+        """
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(PRAGMAS + SCHEMA)
+
+    def upsert_scores(self, rows: [(str, str, int, float)]) -> None:
+        """
+        Record a batch of scores in one transaction; a stored score is only replaced by a better one.
+
+        :param rows: List of (player name, level, score, timestamp)
+        """
+        with self.connection:
+            self.connection.executemany("INSERT OR IGNORE INTO players (name) VALUES (?)",
+                                        [(name,) for name in {row[0] for row in rows}])
+            self.connection.executemany(UPSERT_SCORE, rows)
+
+    def get_player_scores(self, name: str) -> {str: int}:
+        """
+        :param name: Player name
+        :return: {level: best score} for one player
+        """
+        cursor = self.connection.execute("SELECT level, best_score FROM scores "
+                                         "JOIN players ON players.id = scores.player_id "
+                                         "WHERE players.name = ? ORDER BY level", (name,))
+        return dict(cursor.fetchall())
+
+    def get_level_scores(self, name: (str | None) = None) -> {str: (int | None, int)}:
+        """
+        Per level: the given player's best score and the best score of any player.
+
+        :param name: Player name
+        :return: {level: (player's best score or None, top score)}
+        """
+        cursor = self.connection.execute("SELECT level, MAX(CASE WHEN players.name = ? THEN best_score END), "
+                                         "MAX(best_score) FROM scores "
+                                         "JOIN players ON players.id = scores.player_id "
+                                         "GROUP BY level", (name,))
+        return {level: (own, top) for level, own, top in cursor}
+
+    def get_leaderboard(self, level: str, limit: int = 10) -> [(str, int, float)]:
+        """
+        :param level: Level tag, e.g. Tutorial_1
+        :param limit: Maximum number of rows
+        :return: List of (player name, best score, timestamp), best first
+        """
+        cursor = self.connection.execute("SELECT players.name, best_score, timestamp FROM scores "
+                                         "JOIN players ON players.id = scores.player_id "
+                                         "WHERE level = ? ORDER BY best_score DESC LIMIT ?", (level, limit))
+        return cursor.fetchall()
+
+    def close(self) -> None:
+        self.connection.close()
+
+
+class DatabaseWriter(Pr.ProfileWriter):
+    """
+        Background writer of one player's scores to a database file.
+    """
+
+    def __init__(self, name: str, path: str = PROFILE_DATABASE_PATH) -> None:
+        """
+        :param name: Player name
+        :param path: Database file path; not ":memory:", as the writer opens a connection of its own
+        """
+        self.player_name = name
+        self.database: (ProfileDatabase | None) = None
+        super().__init__(path)
+
+    def write(self, completed: {str: (int, float)}) -> None:
+        # Opened here, on the writer thread, the first time there is something to write
+        if self.database is None:
+            self.database = ProfileDatabase(self.file_path)
+
+        self.database.upsert_scores([(self.player_name, k, v[0], v[1]) for k, v in completed.items()])
+
+    def run(self) -> None:
+        try:
+            super().run()
+        finally:
+            if self.database is not None:
+                self.database.close()
+
+
+class DatabaseProfile(Pr.Profile):
+    """
+        Profile stored in a ProfileDatabase rather than its own .rcgp file.
+    """
+
+    def __init__(self, name: str = "Player", database: (ProfileDatabase | None) = None,
+                 write_behind: bool = False) -> None:
+        """
+        :param name: Player name
+        :param database: Shared database; if None, one is opened at PROFILE_DATABASE_PATH and closed with the profile
+        :param write_behind: Save in a background thread rather than in the caller
+        """
+        super().__init__(name)
+        self.__owns_database = database is None
+        self.database = open_database() if database is None else database
+        self.writer = DatabaseWriter(name, self.database.path) if write_behind else None
+
+        # Scores added since the profile was loaded, with when they were set. Saves send all of them, so that a
+        # snapshot replaced in the writer's queue loses nothing; scores which aren't better are ignored by the upsert
+        self.__added: {str: (int, float)} = {}
+
+    def add_completed(self, game_label: str, score: int):
+        super().add_completed(game_label, score)
+        self.__added[game_label] = (score, time.time())
+
+    def reset_completed(self):
+        super().reset_completed()
+        self.__added = {}
+
+    def load(self):
+        self.completed.update(self.database.get_player_scores(self.name))
+
+    def save(self):
+        if not self.__added:
+            return
+
+        if self.writer is None:
+            self.database.upsert_scores([(self.name, k, v[0], v[1]) for k, v in self.__added.items()])
+        else:
+            self.writer.submit(dict(self.__added))
+
+    def get_level_scores(self) -> {str: (int | None, int)}:
+        # Merged with this player's own scores, which the database may not hold yet if a save is still queued
+        level_scores = self.database.get_level_scores(self.name)
+
+        for level, score in self.completed.items():
+            own, top = level_scores.get(level, (None, score))
+            level_scores[level] = (score if own is None else max(own, score), max(top, score))
+
+        return level_scores
+
+    def close(self):
+        self.save()
+        try:
+            super().close()
+        finally:
+            if self.__owns_database:
+                self.database.close()
+
+
+def open_database(path: str = PROFILE_DATABASE_PATH) -> ProfileDatabase:
+    """
+    Open the database; the first time it is created, existing .rcgp files in the same folder are migrated into it.
+
+    :param path: Database file path
+    :return: ProfileDatabase
+    """
+    is_new = not os.path.exists(path)
+
+    database = ProfileDatabase(path)
+    if is_new:
+        migrate_profile_files(database, os.path.dirname(path) or ".")
+
+    return database
+
+
+def migrate_profile_files(database: ProfileDatabase, folder: str = Pr.PROFILE_FOLDER_PATH) -> int:
+    """
+    Copy every .rcgp profile file in a folder into the database, using each file's modified time as the timestamp.
+
+    Files are left in place; running this twice is harmless as only better scores are kept.
+
+    :param database: Target database
+    :param folder: Folder holding .rcgp files
+    :return: Number of profiles migrated
+    """
+    rows = []
+    count = 0
+
+    for file_name in sorted(os.listdir(folder)):
+        if not file_name.endswith(Pr.PROFILE_FILE_SUFFIX):
+            continue
+
+        file_path = os.path.join(folder, file_name)
+        name = file_name[:-len(Pr.PROFILE_FILE_SUFFIX)]
+        timestamp = os.path.getmtime(file_path)
+
+        for level, score in Pr.read_completed(file_path).items():
+            rows.append((name, level, score, timestamp))
+        count += 1
+
+    if rows:
+        database.upsert_scores(rows)
+
+    return count
+
+
+if __name__ == "__main__":
+    # Migrate existing profile files into the database
+    db = ProfileDatabase()
+    print(f"Migrated {migrate_profile_files(db)} profile(s) to {db.path}")
+    db.close()
@@ -0,0 +1,271 @@
+"""
+    Asset manager for the PyGame interface.
+
+    Images are loaded on first use rather than at import, and converted to the display's pixel format once, so
+    blits don't pay for a conversion every time.
+
+    The images in Tokens_Play are packed into a single atlas surface the first time any of them is needed; callers
+    get subsurfaces of the atlas. Other images (e.g. Tokens_Original) are loaded & cached one by one.
+
+    Scaled copies, for the zoomed main screen, are made once per image and size.
+
+    Conversion needs a display mode; images loaded before one is set are converted by on_display_created().
+
+    A Preloader can do the disk reads & decoding on a worker thread, e.g. while the title screen is shown; whatever
+    has to touch the display is done on the main thread when the Preloader finishes.
+"""
+from functools import lru_cache, partial
+import os
+import pygame
+import PyGameConstants as PCo
+import threading
+
+ATLAS_WIDTH = 1024
+ATLAS_FOLDER = PCo.PATH_TOKENS_64
+IMAGE_SUFFIX = ".png"
+
+# Full path : Surface, for images outside the atlas
+_images: {str: pygame.Surface} = {}
+
+# File name : Rect in the atlas, and File name : subsurface
+_atlas: (pygame.Surface | None) = None
+_atlas_rects: {str: pygame.Rect} = {}
+_atlas_images: {str: pygame.Surface} = {}
+
+# (id of source Surface, size) : scaled copy, for zoomed views
+_scaled: {(int, int): pygame.Surface} = {}
+
+
+def is_display_ready() -> bool:
+    return pygame.display.get_init() and pygame.display.get_surface() is not None
+
+
+def convert(surface: pygame.Surface) -> pygame.Surface:
+    # Keep per-pixel alpha; only possible once there is a display
+    return surface.convert_alpha() if is_display_ready() else surface
+
+
+def list_images(folder: str) -> [str]:
+    return [file_name for file_name in sorted(os.listdir(folder)) if file_name.lower().endswith(IMAGE_SUFFIX)]
+
+
+def build_atlas(folder: str = ATLAS_FOLDER, width: int = ATLAS_WIDTH) -> (pygame.Surface, {str: pygame.Rect}):
+    """
+    Pack every image in a folder into one surface, in shelves (rows) ordered by height.
+
+    :param folder: Folder of images
+    :param width: Atlas width in pixels
+    :return: Atlas surface, {file name: Rect within the atlas}
+    """
+    loaded = {file_name: pygame.image.load(os.path.join(folder, file_name)) for file_name in list_images(folder)}
+
+    atlas, rects = pack_atlas(loaded, width)
+    return convert(atlas), rects
+
+
+def pack_atlas(loaded: {str: pygame.Surface}, width: int = ATLAS_WIDTH) -> (pygame.Surface, {str: pygame.Rect}):
+    """
+    :param loaded: {file name: Surface}
+    :param width: Atlas width in pixels
+    :return: Atlas surface, not converted; {file name: Rect within the atlas}
+    """
+    rects = {}
+    x = y = shelf_height = 0
+
+    for file_name, image in sorted(loaded.items(), key=lambda item: -item[1].get_height()):
+        w, h = image.get_size()
+        if x + w > width:
+            # Start a new shelf
+            x = 0
+            y += shelf_height
+            shelf_height = 0
+
+        rects[file_name] = pygame.Rect(x, y, w, h)
+        x += w
+        shelf_height = max(shelf_height, h)
+
+    atlas = pygame.Surface((width, y + shelf_height), pygame.SRCALPHA)
+    for file_name, rect in rects.items():
+        # Adding onto the atlas's transparent black copies pixels exactly, rather than alpha blending them
+        atlas.blit(loaded[file_name], rect, special_flags=pygame.BLEND_RGBA_ADD)
+
+    return atlas, rects
+
+
+def install_atlas(atlas_and_rects: (pygame.Surface, {str: pygame.Rect})) -> None:
+    # Main thread only; replaces any atlas built so far
+    global _atlas, _atlas_rects
+
+    _atlas, _atlas_rects = convert(atlas_and_rects[0]), atlas_and_rects[1]
+    _atlas_images.clear()
+
+    # Keyed by id() of the old subsurfaces, which may be reused by new objects once those are freed
+    _scaled.clear()
+
+
+def get_token_image(file_name: str) -> pygame.Surface:
+    """
+    Get an image from Tokens_Play.
+
+    :param file_name: File name within Tokens_Play
+    :return: Subsurface of the atlas
+    """
+    global _atlas, _atlas_rects
+
+    try:
+        return _atlas_images[file_name]
+    except KeyError:
+        pass
+
+    if _atlas is None:
+        _atlas, _atlas_rects = build_atlas()
+
+    image = _atlas.subsurface(_atlas_rects[file_name])
+    _atlas_images[file_name] = image
+
+    return image
+
+
+def get_image(path: str) -> pygame.Surface:
+    """
+    Load an image on first use; images from Tokens_Play come from the atlas.
+
+    Returned surfaces are shared: blit them, but don't draw on them.
+
+    :param path: Image file path
+    :return: Surface
+    """
+    folder, file_name = os.path.split(path)
+    if os.path.normpath(folder) == os.path.normpath(ATLAS_FOLDER):
+        return get_token_image(file_name)
+
+    try:
+        return _images[path]
+    except KeyError:
+        image = convert(pygame.image.load(path))
+        _images[path] = image
+        return image
+
+
+def get_scaled(image: pygame.Surface, size: int) -> pygame.Surface:
+    """
+    A square copy of a cached image at another size; the image itself at its own size.
+
+    :param image: Surface from get_image() or get_token_image(), so that it lives as long as the cache
+    :param size: Width & height in pixels
+    :return: Surface
+    """
+    if image.get_size() == (size, size):
+        return image
+
+    try:
+        return _scaled[(id(image), size)]
+    except KeyError:
+        scaled = pygame.transform.smoothscale(image, (size, size))
+        _scaled[(id(image), size)] = scaled
+        return scaled
+
+
+@lru_cache(maxsize=None)
+def get_set_pieces(folder: str = PCo.SET_PIECES_PATH) -> frozenset:
+    """
+    :param folder: Set pieces folder
+    :return: Names of the set piece folders, e.g. Tutorial_1
+    """
+    return frozenset(name for name in os.listdir(folder) if os.path.isdir(os.path.join(folder, name)))
+
+
+def load_into(loaded: {str: pygame.Surface}, folder: str, file_name: str) -> None:
+    loaded[file_name] = pygame.image.load(os.path.join(folder, file_name))
+
+
+def get_atlas_preload_steps(folder: str = ATLAS_FOLDER, width: int = ATLAS_WIDTH) -> list:
+    """
+    Steps for a Preloader that build the atlas: one per image, then packing.
+
+    :return: List of (load, install) pairs; see Preloader
+    """
+    loaded = {}
+    steps = [(partial(load_into, loaded, folder, file_name), None) for file_name in list_images(folder)]
+    steps.append((partial(pack_atlas, loaded, width), install_atlas))
+
+    return steps
+
+
+class Preloader(threading.Thread):
+    """
+        Runs loading steps on a worker thread.
+
+        Each step is a pair (load, install): load() runs on the worker; install(result), if not None, runs on the
+        main thread in finish(), for anything that needs the display (e.g. converting surfaces). The main thread
+        polls progress() meanwhile.
+    """
+
+    def __init__(self, steps: list) -> None:
+        super().__init__(name="Preloader", daemon=True)
+        self.steps = steps
+        self.completed = 0
+        self.results = []
+        self.error: (Exception | None) = None
+
+    def run(self) -> None:
+        try:
+            for load, install in self.steps:
+                self.results.append((install, load()))
+                self.completed += 1
+        except Exception as e:
+            # Raised again on the main thread by finish()
+            self.error = e
+
+    def progress(self) -> float:
+        return self.completed / len(self.steps) if self.steps else 1.0
+
+    def is_done(self) -> bool:
+        return not self.is_alive()
+
+    def finish(self) -> None:
+        """
+        Wait for the worker, then install the results on this (the main) thread.
+
+        :raises Exception: whatever a load step raised
+        """
+        self.join()
+
+        if self.error is not None:
+            raise self.error
+
+        for install, result in self.results:
+            if install is not None:
+                install(result)
+
+
+def on_display_created() -> None:
+    """
+    Convert anything loaded before the display mode was set. Surfaces handed out earlier are replaced, so callers
+    should fetch images again rather than keep them.
+    """
+    global _atlas
+
+    for path, image in _images.items():
+        _images[path] = convert(image)
+
+    if _atlas is not None:
+        _atlas = convert(_atlas)
+        _atlas_images.clear()
+
+    _scaled.clear()
+
+
+def clear() -> None:
+    # Surfaces are invalid once PyGame quits
+    global _atlas, _atlas_rects
+
+    _images.clear()
+    _atlas_images.clear()
+    _scaled.clear()
+    _atlas = None
+    _atlas_rects = {}
+
+
+if __name__ == "__main__":
+    pass
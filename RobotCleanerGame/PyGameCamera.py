@@ -0,0 +1,142 @@
+"""
+    Camera over the game grid for the PyGame interface.
+
+    The camera shows a window-sized viewport onto the grid, at one of PCo.ZOOM_LEVELS. It moves in whole tiles, so
+    tiles are never cut off at the edges of the viewport and nothing has to be clipped. Only tiles inside the
+    viewport are built & blitted, so the cost of a frame depends on the size of the window, not of the grid.
+
+    Positions come in three kinds:
+     - grid coords: (x, y) of a tile in the Grid
+     - pixel coords: (x, y) of a pixel in the window
+     - origin: grid coords of the tile shown at the top left of the viewport
+"""
+import PyGameConstants as PCo
+
+
+class Camera:
+    def __init__(self, view_width: int, view_height: int, zoom: float = PCo.ZOOM_DEFAULT) -> None:
+        """
+        :param view_width: Viewport width in pixels; the viewport starts at the top left of the window
+        :param view_height: Viewport height in pixels
+        :param zoom: Initial zoom, one of PCo.ZOOM_LEVELS
+        """
+        self.view_width = view_width
+        self.view_height = view_height
+
+        self.zoom_idx = PCo.ZOOM_LEVELS.index(zoom)
+        self.origin = (0, 0)
+
+        # Grid size, as of the last call of clamp(); None until then, so moves before it are kept & clamped by it
+        self.grid_size = None
+
+    @property
+    def zoom(self) -> float:
+        return PCo.ZOOM_LEVELS[self.zoom_idx]
+
+    @property
+    def tile_size(self) -> int:
+        return int(PCo.TILE_SIZE * self.zoom)
+
+    def get_view_tiles(self) -> (int, int):
+        # Whole tiles that fit in the viewport
+        return max(1, self.view_width // self.tile_size), max(1, self.view_height // self.tile_size)
+
+    def reset(self) -> None:
+        # E.g. when another game is loaded
+        self.zoom_idx = PCo.ZOOM_LEVELS.index(PCo.ZOOM_DEFAULT)
+        self.origin = (0, 0)
+        self.grid_size = None
+
+    def clamp(self, size_x: int, size_y: int) -> None:
+        """
+        Keep the viewport over the grid; a grid smaller than the viewport is shown from its top left.
+
+        :param size_x: Horizontal size of Grid
+        :param size_y: Vertical size of Grid
+        """
+        self.grid_size = (size_x, size_y)
+        cols, rows = self.get_view_tiles()
+
+        self.origin = (max(0, min(self.origin[0], size_x - cols)),
+                       max(0, min(self.origin[1], size_y - rows)))
+
+    def get_visible_range(self) -> (range, range):
+        """
+        :return: Ranges of grid x & y coords inside the viewport
+        """
+        if self.grid_size is None:
+            return range(0), range(0)
+
+        cols, rows = self.get_view_tiles()
+        x0, y0 = self.origin
+
+        return range(x0, min(self.grid_size[0], x0 + cols)), range(y0, min(self.grid_size[1], y0 + rows))
+
+    def grid_to_pixel(self, coords: (int, int)) -> (int, int):
+        return (coords[0] - self.origin[0]) * self.tile_size, (coords[1] - self.origin[1]) * self.tile_size
+
+    def pixel_to_grid(self, pixel_coords: (int, int)) -> (int, int):
+        """
+        :param pixel_coords: Pixel in the window, e.g. a mouse click
+        :return: Grid coords of the tile under the pixel; None if the pixel is not on a visible tile
+        """
+        xs, ys = self.get_visible_range()
+        x = self.origin[0] + pixel_coords[0] // self.tile_size
+        y = self.origin[1] + pixel_coords[1] // self.tile_size
+
+        if pixel_coords[0] < 0 or pixel_coords[1] < 0 or x not in xs or y not in ys:
+            return None
+
+        return x, y
+
+    def contains_pixel(self, pixel_coords: (int, int)) -> bool:
+        return 0 <= pixel_coords[0] < self.view_width and 0 <= pixel_coords[1] < self.view_height
+
+    def reclamp(self) -> None:
+        # After a move; with no grid size yet, the next clamp() does it
+        if self.grid_size is not None:
+            self.clamp(*self.grid_size)
+
+    def scroll(self, dx: int, dy: int) -> None:
+        # In tiles
+        self.origin = (self.origin[0] + dx, self.origin[1] + dy)
+        self.reclamp()
+
+    def scroll_page(self, dx: int, dy: int) -> None:
+        # In viewports
+        cols, rows = self.get_view_tiles()
+        self.scroll(dx * cols, dy * rows)
+
+    def center_on(self, coords: (int, int)) -> None:
+        cols, rows = self.get_view_tiles()
+        self.origin = (coords[0] - cols // 2, coords[1] - rows // 2)
+        self.reclamp()
+
+    def set_zoom(self, zoom_idx: int, anchor: (int, int) = None) -> None:
+        """
+        Change zoom, keeping the tile under the anchor pixel where it is on screen.
+
+        :param zoom_idx: Index into PCo.ZOOM_LEVELS; clamped to the valid range
+        :param anchor: Pixel coords, e.g. the mouse; the centre of the viewport if None
+        """
+        if anchor is None or not self.contains_pixel(anchor):
+            anchor = (self.view_width // 2, self.view_height // 2)
+
+        ax, ay = anchor[0] // self.tile_size, anchor[1] // self.tile_size
+        tile_x, tile_y = self.origin[0] + ax, self.origin[1] + ay
+
+        self.zoom_idx = max(0, min(len(PCo.ZOOM_LEVELS) - 1, zoom_idx))
+
+        ax, ay = anchor[0] // self.tile_size, anchor[1] // self.tile_size
+        self.origin = (tile_x - ax, tile_y - ay)
+        self.reclamp()
+
+    def zoom_in(self, anchor: (int, int) = None) -> None:
+        self.set_zoom(self.zoom_idx + 1, anchor)
+
+    def zoom_out(self, anchor: (int, int) = None) -> None:
+        self.set_zoom(self.zoom_idx - 1, anchor)
+
+
+if __name__ == "__main__":
+    pass
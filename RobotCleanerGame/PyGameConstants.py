@@ -3,7 +3,6 @@
 """
 import Constants as Co
 from Version import VERSION_STRING
-import pygame
 
 BUTTON_WIDTH = 128
 
@@ -13,7 +12,20 @@ COLOR_WHITE = (255, 255, 255)
 DELAY_ONE_SEC = 1000
 DELAY_REGULAR = 50
 
+# Frame pacing: frames are capped at TARGET_FPS; animation advances in fixed steps of UPDATE_STEP_MS, with a beat
+# (next animation frame) every UPDATES_PER_BEAT steps. With nothing to animate, the loop sleeps up to IDLE_WAIT_MS.
+TARGET_FPS = 60
+UPDATE_STEP_MS = DELAY_REGULAR
+UPDATES_PER_BEAT = 10
+MAX_UPDATES_PER_FRAME = 2 * UPDATES_PER_BEAT  # The loop sleeps until the next beat, so allow at least one beat's worth
+IDLE_WAIT_MS = 1000
+
+# Frames per second of the title screen while assets are preloaded
+TITLE_FPS = 30
+
 FILE_TILE = "TILE_64x64.png"
+FILE_CARRIED_ITEMS_MARKER = "CARRIED_ITEMS_MARKER_64x64.png"
+FILE_TITLE_ROBOT = "ROBOT_256x256.png"
 
 FILES_ROBOT = ["ROBOT_64x64L.png", "ROBOT_64x64R.png"]
 
@@ -33,7 +45,6 @@ FONT_COURIER_NEW = "couriernew"
 PATH_TOKENS_BIG = "../GameFiles/Assets/Images/Tokens_Original/"
 PATH_TOKENS_64 = "../GameFiles/Assets/Images/Tokens_Play/"
 
-TILE_IMG = pygame.image.load(PATH_TOKENS_64 + FILE_TILE)
 TILE_SIZE = 64
 
 FEEDBACK_TEXT_BOX_HEIGHT = 20
@@ -42,26 +53,32 @@ WIN_HEIGHT = TILE_SIZE * 11 + FEEDBACK_TEXT_BOX_HEIGHT  # 20 extra pixels for fe
 
 WIN_CAPTION = "RobotCleanerGame"
 
-MENU_BUTTON_HELP = pygame.image.load(PATH_TOKENS_64 + "MENU_BUTTON_HELP.png")
-MENU_BUTTON_LOAD = pygame.image.load(PATH_TOKENS_64 + "MENU_BUTTON_LOAD.png")
-MENU_BUTTON_MENU = pygame.image.load(PATH_TOKENS_64 + "MENU_BUTTON_MENU.png")
-MENU_BUTTON_PLAY = pygame.image.load(PATH_TOKENS_64 + "MENU_BUTTON_PLAY.png")
-MENU_BUTTON_QUIT = pygame.image.load(PATH_TOKENS_64 + "MENU_BUTTON_QUIT.png")
+# Camera over the game grid; see PyGameCamera. Arrow keys scroll (a page with Shift), +/- or the mouse wheel zoom,
+# C centres on the robot
+ZOOM_LEVELS = [0.25, 0.5, 0.75, 1.0, 1.5, 2.0]
+ZOOM_DEFAULT = 1.0
+
+# Images are file names in PATH_TOKENS_64; they are loaded on first use through PyGameAssets
+MENU_BUTTON_HELP = "MENU_BUTTON_HELP.png"
+MENU_BUTTON_LOAD = "MENU_BUTTON_LOAD.png"
+MENU_BUTTON_MENU = "MENU_BUTTON_MENU.png"
+MENU_BUTTON_PLAY = "MENU_BUTTON_PLAY.png"
+MENU_BUTTON_QUIT = "MENU_BUTTON_QUIT.png"
 
 MENU_RESPONSE_HELP = "help"
 MENU_RESPONSE_LOAD = "load"
 MENU_RESPONSE_PLAY = "play"
 MENU_RESPONSE_QUIT = "quit"
 
-BUT_DROP_PRESSED = pygame.image.load(PATH_TOKENS_64 + "B_DROP_PRESSED.png")
-BUT_DROP_UNPRESS = pygame.image.load(PATH_TOKENS_64 + "B_DROP_UNPRESSED.png")
-BUT_MOVE_PRESSED = pygame.image.load(PATH_TOKENS_64 + "B_MOVE_PRESSED.png")
-BUT_MOVE_UNPRESS = pygame.image.load(PATH_TOKENS_64 + "B_MOVE_UNPRESSED.png")
-BUT_PICK_PRESSED = pygame.image.load(PATH_TOKENS_64 + "B_PICKUP_PRESSED.png")
-BUT_PICK_UNPRESS = pygame.image.load(PATH_TOKENS_64 + "B_PICKUP_UNPRESSED.png")
-BUT_SWEEP_PRESSED = pygame.image.load(PATH_TOKENS_64 + "B_SWEEP_PRESSED.png")
-BUT_SWEEP_UNPRESS = pygame.image.load(PATH_TOKENS_64 + "B_SWEEP_UNPRESSED.png")
-BUT_UNAVAILABLE = pygame.image.load(PATH_TOKENS_64 + "BUTTON_UNAVAILABLE.png")
+BUT_DROP_PRESSED = "B_DROP_PRESSED.png"
+BUT_DROP_UNPRESS = "B_DROP_UNPRESSED.png"
+BUT_MOVE_PRESSED = "B_MOVE_PRESSED.png"
+BUT_MOVE_UNPRESS = "B_MOVE_UNPRESSED.png"
+BUT_PICK_PRESSED = "B_PICKUP_PRESSED.png"
+BUT_PICK_UNPRESS = "B_PICKUP_UNPRESSED.png"
+BUT_SWEEP_PRESSED = "B_SWEEP_PRESSED.png"
+BUT_SWEEP_UNPRESS = "B_SWEEP_UNPRESSED.png"
+BUT_UNAVAILABLE = "BUTTON_UNAVAILABLE.png"
 
 PRESSED_BUTTON = "pres_but"
 
@@ -81,14 +98,15 @@ FEEDBACK_MSG_GRID_CLEARED = "All cleared!"
 FEEDBACK_MSG_PRESS_H_FOR_HELP = "Press H for Help."
 FEEDBACK_MSG_PRESS_B_TO_GO_BACK = "Press B to go back."
 FEEDBACK_MSG_SELECT_GAME_TO_LOAD = "Select a game to load."
+TITLE_LOADING_TEXT = "Loading "
 
 SET_PIECES_PATH = "../GameFiles/SetPieces/"
 
 TUTORIAL_PREFIX = "Tutorial_"
 GAME_PREFIX = "Game_"
 
-GAME_BUTTON_COMPLETE = pygame.image.load(PATH_TOKENS_64 + "GAME_BUTTON_COMPLETE.png")
-GAME_BUTTON_INCOMPLETE = pygame.image.load(PATH_TOKENS_64 + "GAME_BUTTON_INCOMPLETE.png")
+GAME_BUTTON_COMPLETE = "GAME_BUTTON_COMPLETE.png"
+GAME_BUTTON_INCOMPLETE = "GAME_BUTTON_INCOMPLETE.png"
 
 HELP_TOKEN_ADDITIONAL_TEXT: dict[str, str] = {
     Co.ROBOT_TOKEN: "The robot can carry up to three items of garbage and sweep messes.",
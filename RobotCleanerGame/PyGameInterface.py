@@ -5,8 +5,11 @@ import Actions as Ac
 import Game as Gm
 import Interface as In
 import pygame
+import PyGameAssets as PAs
+import PyGameCamera as PCa
 import PyGameConstants as PCo
 import PyGameScreens as PSc
+import PyGameTelemetry as PTe
 
 
 def map_pixel_to_tile_coord(pixel_coords: (int, int)) -> (int, int):
@@ -16,13 +19,15 @@ def map_pixel_to_tile_coord(pixel_coords: (int, int)) -> (int, int):
 class PyGameInterface(In.Interface):
 
     def __init__(self, game: (Gm.Game | None) = None, profile_name: (str | None) = None,
-                 width: int = PCo.WIN_WIDTH, height: int = PCo.WIN_HEIGHT) -> None:
-        super().__init__(game, profile_name)
+                 width: int = PCo.WIN_WIDTH, height: int = PCo.WIN_HEIGHT, use_database: bool = False) -> None:
+        super().__init__(game, profile_name, use_database)
         self.state = {PCo.CURRENT_SCREEN: PCo.MENU_SCREEN,
                       PCo.PRESSED_BUTTON: None}
 
-        # Initial holder
+        # Initial holder; the screen is kept between frames and rebuilt on a change of state, see display_state()
         self.screen = None
+        self.screen_name = None
+        self.screen_stale = True
 
         self.win_width = width
         self.win_height = height
@@ -31,49 +36,194 @@ class PyGameInterface(In.Interface):
         pygame.display.set_caption(PCo.WIN_CAPTION)
 
         self.window = pygame.display.set_mode((width, height))
+        PAs.on_display_created()
 
-        # Store animation beat at interface level
+        # Retained scene, so that screens only redraw what changed between frames
+        self.scene = PSc.RetainedScene(self.window)
+
+        # Camera over the game grid; the bottom row is left for buttons and the right-hand column for the stack
+        self.camera = PCa.Camera(width - PCo.TILE_SIZE, height - PCo.TILE_SIZE - PCo.FEEDBACK_TEXT_BOX_HEIGHT)
+
+        # Store animation beat at interface level; see update()
         self.animation_beat = 0
 
+        # Fixed-timestep clock: real time is banked in the accumulator and spent in UPDATE_STEP_MS steps
+        self.clock = pygame.time.Clock()
+        self.last_ticks = pygame.time.get_ticks()
+        self.time_accumulator = 0
+        self.update_count = 0
+
         # Store feedback message
         self.feedback_msg = PCo.FEEDBACK_MSG_PRESS_H_FOR_HELP
 
+        # Frame telemetry; created on first toggle of the overlay (F3) if not given
+        self.telemetry: (PTe.FrameTelemetry | None) = None
+
+        # Headless runs may skip the delay between frames
+        self.pace_frames = True
+
     def give_user_feedback(self, feedback: str) -> None:
         self.feedback_msg = feedback
+        self.screen_stale = True
+
+    def process_action(self, action) -> bool:
+        go = super().process_action(action)
+        self.screen_stale = True
+        return go
 
     def beat(self) -> bool:
         # Are we on an animation beat?
         return self.animation_beat == 0
 
     def event_start(self) -> None:
-        # One-off screen for Title
-        PSc.TitleScreen.factory(self).draw()
+        # One-off screen for Title, shown until the assets have been preloaded
+        preloader = PAs.Preloader(PSc.get_preload_steps())
+        preloader.start()
+
+        while not preloader.is_done():
+            PSc.TitleScreen.factory(self, preloader.progress()).render()
+            pygame.event.pump()  # Keep the window responsive
+            self.clock.tick(PCo.TITLE_FPS)
+
+        preloader.finish()
 
     def event_begin_of_loop(self) -> None:
-        pass
+        # Advance the simulation by however many fixed steps of real time have passed
+        now = pygame.time.get_ticks()
+        self.time_accumulator += now - self.last_ticks
+        self.last_ticks = now
+
+        # Not on a beat unless one of this pass's updates lands on it
+        self.animation_beat = 1
+
+        steps = 0
+        while self.time_accumulator >= PCo.UPDATE_STEP_MS:
+            self.time_accumulator -= PCo.UPDATE_STEP_MS
+            steps += 1
+            if steps <= PCo.MAX_UPDATES_PER_FRAME:
+                self.update()
+
+    def update(self) -> None:
+        """
+        One fixed step of the simulation; animation is driven by time rather than by the number of frames drawn.
+        """
+        self.update_count += 1
+        if self.update_count % PCo.UPDATES_PER_BEAT == 0:
+            self.animation_beat = 0
+
+    def is_animating(self) -> bool:
+        # Only the main screen has animated tokens
+        return self.state[PCo.CURRENT_SCREEN] == PCo.MAIN_SCREEN and self.game is not None
+
+    def time_to_next_beat(self) -> int:
+        steps = PCo.UPDATES_PER_BEAT - self.update_count % PCo.UPDATES_PER_BEAT
+        return max(0, steps * PCo.UPDATE_STEP_MS - self.time_accumulator - (pygame.time.get_ticks() - self.last_ticks))
 
     def event_grid_cleared(self) -> None:
         self.give_user_feedback(PCo.FEEDBACK_MSG_GRID_CLEARED)
 
     def event_quit(self) -> None:
+        if self.telemetry:
+            self.telemetry.close()
+        PSc.clear_text_caches()
+        PAs.clear()
         pygame.quit()
 
+    def toggle_telemetry_overlay(self) -> None:
+        if self.telemetry is None:
+            self.telemetry = PTe.FrameTelemetry()
+        self.telemetry.toggle_overlay()
+
     def display_state(self) -> None:
+        """
+        Draw the current screen. The screen is only rebuilt when the state it shows may have changed: on a switch of
+        screen, after an action was processed or feedback given, after the camera moved, and on an animation beat;
+        otherwise the screen built before is drawn again.
+        """
         current = self.state[PCo.CURRENT_SCREEN]
-
+        rebuild = self.screen_stale or current != self.screen_name or (self.beat() and self.is_animating())
+
+        if self.telemetry is None:
+            if rebuild:
+                self.build_screen(current)
+            self.screen.render()
+        else:
+            t0 = PTe.Im.now_ns()
+            if rebuild:
+                self.build_screen(current)
+            t1 = PTe.Im.now_ns()
+            blits = self.screen.render()
+            t2 = PTe.Im.now_ns()
+
+            self.telemetry.record_frame(current, t0, t1 - t0, t2 - t1, blits)
+
+        if self.pace_frames:
+            # Caps the frame rate when events arrive faster than frames are needed
+            self.clock.tick(PCo.TARGET_FPS)
+
+    def build_screen(self, current: str) -> None:
         self.screen = PSc.SCREEN_CLASS[current].factory(self)
-
-        self.screen.draw()
+        self.screen_name = current
+        self.screen_stale = False
+
+    def get_events(self) -> [pygame.event.Event]:
+        """
+        Sleep until there is an event, or until the next animation beat is due; static screens wait longer.
+        """
+        if not self.pace_frames:
+            return pygame.event.get()
+
+        timeout = self.time_to_next_beat() if self.is_animating() else PCo.IDLE_WAIT_MS
+
+        first = pygame.event.wait(max(1, timeout))
+        if first.type == pygame.NOEVENT:
+            return pygame.event.get()
+
+        return [first] + pygame.event.get()
+
+    def move_camera(self, event: pygame.event.Event) -> None:
+        # Arrow keys scroll by a tile, or by a page with Shift; +/- zoom; C centres on the robot
+        self.screen_stale = True
+        step = self.camera.scroll_page if event.mod & pygame.KMOD_SHIFT else self.camera.scroll
+
+        match event.key:
+            case pygame.K_LEFT:
+                step(-1, 0)
+            case pygame.K_RIGHT:
+                step(1, 0)
+            case pygame.K_UP:
+                step(0, -1)
+            case pygame.K_DOWN:
+                step(0, 1)
+            case pygame.K_PLUS | pygame.K_EQUALS | pygame.K_KP_PLUS:
+                self.camera.zoom_in()
+            case pygame.K_MINUS | pygame.K_KP_MINUS:
+                self.camera.zoom_out()
+            case pygame.K_c if self.game is not None:
+                self.camera.center_on(self.game.robot.coords)
+            case _:
+                pass
 
     def listen_for_action(self) -> (Ac.Action | None):
-        for event in pygame.event.get():
+        for event in self.get_events():
             match event.type:
                 case pygame.QUIT:
                     return Ac.Quit(self)
-                case pygame.MOUSEBUTTONUP:
+                case pygame.KEYDOWN if event.key == pygame.K_F3:
+                    self.toggle_telemetry_overlay()
+                case pygame.KEYDOWN if self.state[PCo.CURRENT_SCREEN] == PCo.MAIN_SCREEN:
+                    self.move_camera(event)
+                case pygame.MOUSEWHEEL if self.state[PCo.CURRENT_SCREEN] == PCo.MAIN_SCREEN:
+                    self.screen_stale = True
+                    if event.y > 0:
+                        self.camera.zoom_in(pygame.mouse.get_pos())
+                    elif event.y < 0:
+                        self.camera.zoom_out(pygame.mouse.get_pos())
+                case pygame.WINDOWEXPOSED:
+                    self.scene.invalidate()
+                case pygame.MOUSEBUTTONUP if event.button not in {pygame.BUTTON_WHEELUP, pygame.BUTTON_WHEELDOWN}:
                     if self.screen:
-                        coords = map_pixel_to_tile_coord(pygame.mouse.get_pos())
-                        return self.screen.on_mouse_click(coords)
+                        return self.screen.on_click(pygame.mouse.get_pos())
                     else:
                         return None
                 case _:
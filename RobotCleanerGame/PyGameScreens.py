@@ -4,9 +4,10 @@
 import Actions as Ac
 import BuildGameFromFile as Bd
 import Constants as Co
+import PyGameAssets as PAs
 import PyGameConstants as PCo
 import Game as Gm
-import os
+from functools import lru_cache, partial
 import pygame
 import PyGameInterface as PIn
 
@@ -15,6 +16,84 @@ STATE_FLAG_DROP_PRESSED = Ac.Drop.__name__
 STATE_FLAG_PICK_PRESSED = Ac.PickUp.__name__
 STATE_FLAG_SWEEP_PRESSED = Ac.Sweep.__name__
 
+# Most recently used rendered text surfaces to keep; a screen of help text needs around thirty
+TEXT_CACHE_SIZE = 256
+
+# Past this fraction of elements changed, redrawing the whole frame is cheaper than redrawing each dirty area
+FULL_REDRAW_FRACTION = 0.5
+
+
+"""
+    Font & text caches: SysFont lookups and text rendering are too slow to repeat on every frame
+"""
+
+
+def get_font_location(font_path: (str | None), size: int, bold: bool, italic: bool) -> (str | None, bool):
+    # A SysFont constructor which creates nothing: the file SysFont picked, and whether bold has to be faked
+    return font_path, bold
+
+
+@lru_cache(maxsize=None)
+def get_font_file(font: str, bold: bool = False) -> (str | None, bool):
+    """
+    Find a system font's file without opening it, so it is safe off the main thread (SDL_ttf is not thread safe).
+
+    :return: Font file, None for PyGame's default font; True if bold has to be faked as no bold file was found
+    """
+    return pygame.font.SysFont(font, 0, bold, constructor=get_font_location)
+
+
+@lru_cache(maxsize=None)
+def get_font(font: str, size: int, bold: bool = False) -> pygame.font.Font:
+    # As pygame.font.SysFont(), with the file lookup cached; main thread only
+    font_path, fake_bold = get_font_file(font, bold)
+
+    created = pygame.font.Font(font_path, size)
+    if fake_bold:
+        created.set_bold(True)
+
+    return created
+
+
+@lru_cache(maxsize=TEXT_CACHE_SIZE)
+def render_text(text: str, font: str, size: int, bold: bool, color: (int, int, int),
+                antialias: bool) -> pygame.Surface:
+    """
+    Rendered text, shared between callers; blit it but don't draw on it.
+    """
+    return get_font(font, size, bold).render(text=text, antialias=antialias, color=color)
+
+
+# (font, size, bold) used by the screens; the preloader finds their files on its worker, then creates them
+SCREEN_FONTS = [(PCo.FONT_COURIER_NEW, 14, False), (PCo.FONT_COURIER_NEW, 16, False),
+                (PCo.FONT_COURIER_NEW, 24, False), (PCo.FONT_COURIER_NEW, 24, True),
+                (PCo.FONT_COURIER_NEW, 30, True), (PCo.FONT_COURIER_NEW, 32, True)]
+
+
+def get_preload_steps() -> list:
+    """
+    Everything the screens load from disk: the token atlas, fonts & the list of set pieces.
+
+    :return: Steps for a PyGameAssets.Preloader
+    """
+    steps = PAs.get_atlas_preload_steps()
+    steps += [(partial(get_font_file, font, bold), partial(install_font, (font, size, bold)))
+              for font, size, bold in SCREEN_FONTS]
+    steps.append((PAs.get_set_pieces, None))
+
+    return steps
+
+
+def install_font(spec: (str, int, bool), _font_file: (str | None, bool)) -> None:
+    # Preloader install step, on the main thread; the file was found by get_font_file() on the worker
+    get_font(*spec)
+
+
+def clear_text_caches() -> None:
+    # Fonts & surfaces are invalid once PyGame quits
+    render_text.cache_clear()
+    get_font.cache_clear()
+
 
 class PyGameScreenElement:
     def __init__(self, window, x: int, y: int):
@@ -26,6 +105,18 @@ class PyGameScreenElement:
         # self.window.blit(foo, (self.x, self.y))
         pass
 
+    def retained_key(self):
+        """
+        Identify what the element draws this frame, for RetainedScene; equal keys mean identical pixels.
+
+        :return: Hashable key, or None if the element draws nothing
+        """
+        return None
+
+    def get_surface(self) -> (pygame.Surface | None):
+        # Surface drawn at (x, y); only called for elements with a key not seen in the previous frame
+        return None
+
 
 class PyGameTextElement(PyGameScreenElement):
     def __init__(self, window, x: int, y: int, text: str, size, font=PCo.FONT_COURIER_NEW,
@@ -39,9 +130,13 @@ class PyGameTextElement(PyGameScreenElement):
         self.antialias: bool = antialias
 
     def draw(self):
-        font = pygame.font.SysFont(self.font, self.size, self.bold)
-        text = font.render(text=self.text, antialias=self.antialias, color=self.color)
-        self.window.blit(text, (self.x, self.y))
+        self.window.blit(self.get_surface(), (self.x, self.y))
+
+    def retained_key(self):
+        return "text", self.text, self.font, self.size, self.color, self.bold, self.antialias, self.x, self.y
+
+    def get_surface(self) -> pygame.Surface:
+        return render_text(self.text, self.font, self.size, self.bold, self.color, self.antialias)
 
 
 class PyGameImageElement(PyGameScreenElement):
@@ -49,27 +144,130 @@ class PyGameImageElement(PyGameScreenElement):
         if img_path is None and image is None:
             raise AttributeError("img_path and image cannot both be None")
         super().__init__(window, x, y)
+        self.img_path = img_path
         if image is None:
-            self.image = pygame.image.load(img_path)
+            self.image = PAs.get_image(img_path)
         else:
             self.image = image
 
     def draw(self):
         self.window.blit(self.image, (self.x, self.y))
 
+    def retained_key(self):
+        # Assets are cached, so the same image is the same object
+        return "image", id(self.image), self.x, self.y
+
+    def get_surface(self) -> pygame.Surface:
+        return self.image
+
 
 class PyGameTokenElement(PyGameScreenElement):
-    def __init__(self, window, x: int, y: int, token, incr=True, static=False):
+    def __init__(self, window, x: int, y: int, token, incr=True, static=False, size: (int | None) = None):
         super().__init__(window, x, y)
         self.token: PyGameToken = token
         self.increment = incr
         self.static = static
+        self.size = size  # Scaled to this size if given, e.g. when the camera is zoomed
+        self.image: (pygame.Surface | None) = None
+
+    def next_image(self) -> pygame.Surface:
+        image = self.token.next_image(self.increment, self.static)
+        if self.size is not None:
+            image = PAs.get_scaled(image, self.size)
+        return image
 
     def draw(self):
-        self.token.draw(self.window, self.x, self.y, self.increment, self.static)
+        self.window.blit(self.get_surface(), (self.x, self.y))
+
+    def retained_key(self):
+        return "image", id(self.get_surface()), self.x, self.y
+
+    def get_surface(self) -> pygame.Surface:
+        # Resolved once, so that the token's animation advances once per build of the screen, however often it's drawn
+        if self.image is None:
+            self.image = self.next_image()
+        return self.image
+
+
+class RetainedScene:
+    """
+        Keeps what was drawn in the previous frame, so that a new frame only redraws the areas that changed.
+
+        The interface keeps a screen between frames and only rebuilds it when its state changes (see
+        PyGameInterface.display_state()); each element's retained_key() is compared with the previous frame. Areas of
+        elements that appeared or disappeared are cleared, everything overlapping them is redrawn (clipped to those
+        areas), and only those rects are passed to pygame.display.update(). A screen drawn again unchanged has nothing
+        to redraw.
+    """
+
+    def __init__(self, window) -> None:
+        self.window = window
+        self.screen_class = None
+        self.retained: {object: (pygame.Surface, pygame.Rect)} = {}
+
+    def invalidate(self) -> None:
+        # Force a full redraw on the next frame, e.g. after the window was exposed
+        self.screen_class = None
+
+    def render(self, screen) -> (int, [pygame.Rect]):
+        """
+        Draw a screen's elements onto the window, without updating the display.
+
+        :param screen: PyGameScreen
+        :return: Number of blits, dirty rects (None if the whole window was redrawn)
+        """
+        frame = []
+        for el in screen.elements:
+            if (key := el.retained_key()) is None:
+                continue
+
+            try:
+                surface, rect = self.retained[key]
+            except KeyError:
+                surface = el.get_surface()
+                rect = surface.get_rect(topleft=(el.x, el.y))
+
+            frame.append((key, surface, rect))
+
+        current = {key: (surface, rect) for key, surface, rect in frame}
+
+        if screen.__class__ is self.screen_class:
+            dirty = [rect for key, (_, rect) in self.retained.items() if key not in current]
+            dirty += [rect for key, (_, rect) in current.items() if key not in self.retained]
+        else:
+            dirty = None
+
+        if dirty is None or len(dirty) > FULL_REDRAW_FRACTION * len(frame):
+            # New screen, or most of it changed: draw everything
+            self.screen_class = screen.__class__
+            self.retained = current
+
+            self.window.fill(screen.bg_color)
+            for _, surface, rect in frame:
+                self.window.blit(surface, rect)
+
+            return len(frame), None
+
+        self.retained = current
+
+        rects = [rect for _, _, rect in frame]
+
+        blits = 0
+        for area in dirty:
+            self.window.set_clip(area)
+            self.window.fill(screen.bg_color, area)
+            for i in area.collidelistall(rects):
+                self.window.blit(frame[i][1], rects[i])
+                blits += 1
+        self.window.set_clip(None)
+
+        return blits, dirty
 
 
 class PyGameScreen:
+    # Screens which are drawn through the interface's RetainedScene
+    retained = False
+
     @staticmethod
     def factory(interface):
         """
@@ -89,13 +287,45 @@ class PyGameScreen:
         self.elements.append(element)
 
     def draw(self):
-        self.window.fill(self.bg_color)
+        self.render()
+        pygame.time.delay(self.delay)
 
-        for el in self.elements:
-            el.draw()
+    def render(self) -> int:
+        """
+        Draw the frame and update the display, without the pacing delay.
 
-        pygame.display.update()
-        pygame.time.delay(self.delay)
+        :return: Number of blits
+        """
+        scene = getattr(self.interface, "scene", None)
+        telemetry = getattr(self.interface, "telemetry", None)
+
+        if scene is not None and self.retained:
+            if telemetry is not None and telemetry.overlay:
+                # The overlay is drawn over the scene, so the scene is redrawn in full under it
+                scene.invalidate()
+            blits, dirty = scene.render(self)
+        else:
+            if scene is not None:
+                scene.invalidate()
+
+            self.window.fill(self.bg_color)
+            for el in self.elements:
+                el.draw()
+            blits, dirty = len(self.elements), None
+
+        if telemetry is not None and telemetry.overlay:
+            telemetry.draw_overlay(self.window)
+
+        if dirty is None:
+            pygame.display.update()
+        elif dirty:
+            pygame.display.update(dirty)
+
+        return blits
+
+    def on_click(self, pixel_coords) -> (Ac.Action | None):
+        # Screens other than the main screen are laid out in tiles
+        return self.on_mouse_click(PIn.map_pixel_to_tile_coord(pixel_coords))
 
     def on_mouse_click(self, coords) -> (Ac.Action | None):
         try:
@@ -145,6 +375,8 @@ class HelpScreen(PyGameScreen):
 
 
 class LoadScreen(PyGameScreen):
+    retained = True
+
     @staticmethod
     def factory(interface) -> PyGameScreen:
         x_limit = 5
@@ -156,6 +388,9 @@ class LoadScreen(PyGameScreen):
 
         load_scn = LoadScreen(interface)
 
+        # {game: (own best score, top score)}, fetched once for the whole screen
+        level_scores = interface.profile.get_level_scores() if interface.profile else {}
+
         for game_type in [PCo.TUTORIAL_PREFIX, PCo.GAME_PREFIX]:
             i = 0
 
@@ -168,23 +403,21 @@ class LoadScreen(PyGameScreen):
 
                 current_game = game_type + str(i)
 
-                folder_path = PCo.SET_PIECES_PATH + current_game + "/"
-
-                if not os.path.exists(folder_path):
+                if current_game not in PAs.get_set_pieces():
                     break
 
-                if interface.profile and current_game in interface.profile.completed:
+                score, top_score = level_scores.get(current_game, (None, None))
+
+                if score is not None:
                     image = PCo.GAME_BUTTON_COMPLETE
                     color = PCo.COLOR_WHITE
-                    score = interface.profile.completed[current_game]
                 else:
                     image = PCo.GAME_BUTTON_INCOMPLETE
                     color = PCo.COLOR_BLACK
-                    score = None
 
                 text = game_type[0] + str(i)
                 padding = 16 - 8 * (len(text) - 2)
-                load_scn.add_element(PyGameImageElement(win, x, y, image=image))
+                load_scn.add_element(PyGameImageElement(win, x, y, image=PAs.get_token_image(image)))
                 load_scn.add_element(PyGameTextElement(win, x+padding, y+16, text=text, color=color,
                                                        size=30, bold=True, antialias=True))
 
@@ -194,6 +427,11 @@ class LoadScreen(PyGameScreen):
                     load_scn.add_element(PyGameTextElement(win, x+padding, y + 80, text=text, color=PCo.COLOR_WHITE,
                                                            size=30, bold=True, antialias=True))
 
+                if top_score is not None:
+                    text = "Top " + str(top_score)
+                    load_scn.add_element(PyGameTextElement(win, x, y + 110, text=text, color=PCo.COLOR_WHITE,
+                                                           size=14, bold=False, antialias=True))
+
                 tile_x, tile_y = PIn.map_pixel_to_tile_coord((x, y))
                 load_scn.inventory[(tile_x, tile_y)] = current_game
 
@@ -224,6 +462,7 @@ class LoadScreen(PyGameScreen):
             self.interface.game = Bd.build_game_from_file(Co.SET_PIECES_FOLDER + screen_item + "/",
                                                           game_tag=screen_item, interface=self.interface)
             self.interface.state[PCo.CURRENT_SCREEN] = PCo.MAIN_SCREEN
+            self.interface.camera.reset()
             self.interface.give_user_feedback("Loading " + screen_item.replace("_", " "))
             return
         else:
@@ -232,15 +471,22 @@ class LoadScreen(PyGameScreen):
 
 
 class MainScreen(PyGameScreen):
+    retained = True
+
     @staticmethod
     def factory(interface) -> PyGameScreen:
-        # Default animation beats are hit once every ten loops
-        interface.animation_beat = (interface.animation_beat + 1) % 10
-
+        # Animation beats are set by the interface's clock; see PyGameInterface.update()
         main = MainScreen(interface)
 
         window = interface.window
 
+        # Only the part of the grid inside the camera's viewport is built
+        camera = interface.camera
+        camera.clamp(interface.game.grid.size_x, interface.game.grid.size_y)
+        visible_x, visible_y = camera.get_visible_range()
+        tile_size = camera.tile_size
+        scaled = tile_size != PCo.TILE_SIZE
+
         # Get possible actions
         actions = interface.game.get_possible_actions()
 
@@ -278,15 +524,15 @@ class MainScreen(PyGameScreen):
         main.add_element(menu_button_factory(interface, main, x, y))
 
         # Now draw the robot's stack
-        # Draw it one tile to the right of the game grid
-        x = interface.game.grid.size_x * PCo.TILE_SIZE
+        # Draw it one tile to the right of the visible game grid
+        x = len(visible_x) * tile_size
 
-        # Draw it from the bottom, but leave space for a stack as well as icon underneath
-        y = max(interface.game.grid.size_y, Co.MAX_CARRY) * PCo.TILE_SIZE
+        # Draw it from the bottom, but leave space for a stack as well as icon underneath; keep it above the buttons
+        y = min(max(len(visible_y) * tile_size, Co.MAX_CARRY * PCo.TILE_SIZE), camera.view_height - PCo.TILE_SIZE)
 
         # Add marker base
         main.add_element(PyGameImageElement(interface.window, x, y,
-                                            img_path=PCo.PATH_TOKENS_64 + "CARRIED_ITEMS_MARKER_64x64.png"))
+                                            image=PAs.get_token_image(PCo.FILE_CARRIED_ITEMS_MARKER)))
 
         # Add stack properly
         for item in interface.game.robot.stack:
@@ -296,37 +542,57 @@ class MainScreen(PyGameScreen):
 
         ordered_actions = Gm.Game.order_actions_by_coords(actions)
 
+        tile_image = PAs.get_scaled(PAs.get_token_image(PCo.FILE_TILE), tile_size)
+        token_size = tile_size if scaled else None
+
         # Add game tiles + tokens
-        for y in range(0, interface.game.grid.size_y):
-            for x in range(0, interface.game.grid.size_x):
+        for y in visible_y:
+            for x in visible_x:
 
                 tile = interface.game.grid.get_tile((x, y))
 
                 # Nothing can happen on blocked tiles
                 if not tile.is_blocked():
+                    pixel_x, pixel_y = camera.grid_to_pixel((x, y))
+
                     # Add the base background tile
-                    main.add_element(PyGameImageElement(interface.window,x * PCo.TILE_SIZE, y * PCo.TILE_SIZE,
-                                                        image=PCo.TILE_IMG))
+                    main.add_element(PyGameImageElement(interface.window, pixel_x, pixel_y, image=tile_image))
 
-                    # If this tile can be clicked for an action, add them to the screen inventory
+                    # If this tile can be clicked for an action, add them to the screen's grid inventory
                     if (x, y) in ordered_actions:
-                        main.inventory[(x, y)] = ordered_actions[(x, y)]
+                        main.grid_inventory[(x, y)] = ordered_actions[(x, y)]
 
                     if tile.is_empty():
                         # Go to next
                         continue
 
-                    main.add_element(PyGameTokenElement(interface.window, x * PCo.TILE_SIZE, y * PCo.TILE_SIZE,
-                                                        token=TOKEN_MAP[tile.get_content()], incr=interface.beat()))
+                    main.add_element(PyGameTokenElement(interface.window, pixel_x, pixel_y,
+                                                        token=TOKEN_MAP[tile.get_content()], incr=interface.beat(),
+                                                        size=token_size))
 
         if len(interface.feedback_msg) > 0:
             main.add_element(feedback_box_factory(interface.window, interface.feedback_msg))
 
         return main
 
-    def on_mouse_click(self, coords) -> (Ac.Action | None):
+    def __init__(self, interface, bg_color=PCo.COLOR_BLACK, delay=PCo.DELAY_REGULAR):
+        super().__init__(interface, bg_color, delay)
+        self.grid_inventory = {}  # Actions on the grid, by grid coords
+
+    def on_click(self, pixel_coords) -> (Ac.Action | None):
+        # Clicks inside the camera's viewport are on the grid; translate them through the camera
+        camera = self.interface.camera
+        if camera.contains_pixel(pixel_coords):
+            return self.on_mouse_click(camera.pixel_to_grid(pixel_coords), self.grid_inventory)
+
+        return self.on_mouse_click(PIn.map_pixel_to_tile_coord(pixel_coords))
+
+    def on_mouse_click(self, coords, inventory: (dict | None) = None) -> (Ac.Action | None):
+        if inventory is None:
+            inventory = self.inventory
+
         try:
-            screen_item = self.inventory[coords]
+            screen_item = inventory[coords]
 
         except KeyError:
             # Nothing in inventory, reset
@@ -371,6 +637,8 @@ class MainScreen(PyGameScreen):
 
 
 class MenuScreen(PyGameScreen):
+    retained = True
+
     @staticmethod
     def factory(interface) -> PyGameScreen:
         response_list = [PCo.MENU_RESPONSE_PLAY, PCo.MENU_RESPONSE_HELP, PCo.MENU_RESPONSE_LOAD, PCo.MENU_RESPONSE_QUIT]
@@ -383,7 +651,7 @@ class MenuScreen(PyGameScreen):
         menu_screen = MenuScreen(interface)
 
         for res, image in zip(response_list, image_list):
-            menu_screen.add_element(PyGameImageElement(interface.window, x, y, image=image))
+            menu_screen.add_element(PyGameImageElement(interface.window, x, y, image=PAs.get_token_image(image)))
 
             # Add the button to the screen inventory with Tile coords; other it is inactive
             tile_x, tile_y = PIn.map_pixel_to_tile_coord((x, y))
@@ -425,19 +693,26 @@ class MenuScreen(PyGameScreen):
 
 class TitleScreen(PyGameScreen):
     @staticmethod
-    def factory(interface) -> PyGameScreen:
+    def factory(interface, progress: (float | None) = None) -> PyGameScreen:
+        """
+        :param progress: Fraction of preloading done, shown under the title; None to show none
+        """
         x = 200
         y = 100
 
         window = interface.window
         width = interface.win_width
 
-        title_screen = TitleScreen(interface, delay=(2 * PCo.DELAY_ONE_SEC))
+        title_screen = TitleScreen(interface)
 
         title_screen.add_element(PyGameTextElement(window, x, y, PCo.VERSION_STRING, 32,
                                                    bold=True, antialias=True))
         title_screen.add_element(PyGameImageElement(window, int((width / 2) - 128), y + 20,
-                                                    img_path=PCo.PATH_TOKENS_BIG + "ROBOT_256x256.png"))
+                                                    img_path=PCo.PATH_TOKENS_BIG + PCo.FILE_TITLE_ROBOT))
+
+        if progress is not None:
+            text = PCo.TITLE_LOADING_TEXT + f"{progress:4.0%}"
+            title_screen.add_element(PyGameTextElement(window, x, y + 300, text, 16, bold=False, antialias=True))
 
         return title_screen
 
@@ -451,7 +726,7 @@ def menu_button_factory(interface, screen, x, y):
     tile_x, tile_y = PIn.map_pixel_to_tile_coord((x, y))
     screen.inventory[tile_x, tile_y] = Ac.GoToMenu(interface)
     screen.inventory[tile_x + 1, tile_y] = Ac.GoToMenu(interface)
-    return PyGameImageElement(interface.window, x, y, image=PCo.MENU_BUTTON_MENU)
+    return PyGameImageElement(interface.window, x, y, image=PAs.get_token_image(PCo.MENU_BUTTON_MENU))
 
 
 def main_button_factory(interface, screen, action, available, state_flag,
@@ -470,7 +745,7 @@ def main_button_factory(interface, screen, action, available, state_flag,
     screen.inventory[(tile_x, tile_y)] = action
     screen.inventory[(tile_x + 1, tile_y)] = action
 
-    return PyGameImageElement(interface.window, x, y, image=image)
+    return PyGameImageElement(interface.window, x, y, image=PAs.get_token_image(image))
 
 
 def feedback_box_factory(window, message) -> PyGameTextElement:
@@ -493,16 +768,14 @@ class PyGameToken:
         if self.anim_max < 0:
             raise FileNotFoundError("PyGameToken.__init__: empty files list")
 
-        self.images = []
-
-        for file in files:
-            self.images.append(pygame.image.load(folder + file))
+        # Images are loaded on first use, through PyGameAssets
+        self.paths = [folder + file for file in files]
 
     def get_image(self, static_img: bool = False) -> pygame.Surface:
         if static_img:
-            return self.images[0]
+            return PAs.get_image(self.paths[0])
         else:
-            return self.images[self.anim_idx]
+            return PAs.get_image(self.paths[self.anim_idx])
 
     def increment_idx(self) -> None:
         if self.anim_max == 0:
@@ -515,10 +788,17 @@ class PyGameToken:
         else:
             self.anim_idx += 1
 
-    def draw(self, window, x: int, y: int, increment: bool = True, static_img: bool = False) -> None:
-        window.blit(self.get_image(static_img), (x, y))
+    def next_image(self, increment: bool = True, static_img: bool = False) -> pygame.Surface:
+        """
+        The image to draw now; advances the animation if asked to.
+        """
+        image = self.get_image(static_img)
         if increment and not static_img:
             self.increment_idx()
+        return image
+
+    def draw(self, window, x: int, y: int, increment: bool = True, static_img: bool = False) -> None:
+        window.blit(self.next_image(increment, static_img), (x, y))
 
 
 SCREEN_CLASS = {
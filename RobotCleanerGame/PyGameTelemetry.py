@@ -0,0 +1,180 @@
+"""
+    Frame-time telemetry for the PyGame interface.
+
+    Per frame: build time (the screen's factory), frame time (fill, blits & display update, without the pacing
+    delay), blit count and FPS. Shown as an overlay toggled with F3, optionally logged to CSV, and summarised with
+    rolling percentiles through Instrumentation.
+
+    Run this file to render every screen headless with the SDL dummy video driver and print the stats, optionally
+    dumping them as JSON, so rendering regressions can be caught in automated runs:
+        python PyGameTelemetry.py --output frame_stats.json
+"""
+import os
+
+if __name__ == "__main__":
+    # Headless run; must be set before PyGame is initialised
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+import Instrumentation as Im
+import json
+import pygame
+import PyGameConstants as PCo
+import PyGameScreens as PSc
+
+KEY_BUILD = "build"
+KEY_FRAME = "frame"
+KEY_INTERVAL = "interval"
+COUNTER_FRAMES = "frames"
+COUNTER_BLITS = "blits"
+
+OVERLAY_FONT_SIZE = 14
+OVERLAY_LINE_HEIGHT = 16
+OVERLAY_PADDING = 4
+OVERLAY_WIDTH = 200
+OVERLAY_ALPHA = 160
+
+LOG_HEADER = "frame,screen,build_ms,frame_ms,blits,fps\n"
+
+HEADLESS_FRAMES = 100
+HEADLESS_GAME_TAG = "Game_1"
+
+
+class FrameTelemetry:
+    def __init__(self, log_path: (str | None) = None, window: int = Im.DEFAULT_WINDOW) -> None:
+        """
+        :param log_path: If given, one CSV line per frame is written here
+        :param window: Number of recent frames kept for percentiles & FPS
+        """
+        self.stats = Im.Instrumentation(window)
+        self.overlay = False
+
+        self.frame = 0
+        self.last_blits = 0
+        self.last_frame_start: (int | None) = None
+
+        self.__log = open(log_path, "w") if log_path else None
+        if self.__log:
+            self.__log.write(LOG_HEADER)
+
+    def toggle_overlay(self) -> None:
+        self.overlay = not self.overlay
+
+    def record_frame(self, screen: str, frame_start: int, build_ns: int, frame_ns: int, blits: int) -> None:
+        """
+        :param screen: Screen name, e.g. main
+        :param frame_start: perf_counter_ns() at the start of the frame
+        :param build_ns: Time spent in the screen factory
+        :param frame_ns: Time spent filling, blitting & updating the display
+        :param blits: Number of blits
+        """
+        self.frame += 1
+        self.last_blits = blits
+
+        self.stats.record(KEY_BUILD, build_ns)
+        self.stats.record(KEY_FRAME, frame_ns)
+        self.stats.count(COUNTER_FRAMES)
+        self.stats.count(COUNTER_BLITS, blits)
+
+        if self.last_frame_start is not None:
+            self.stats.record(KEY_INTERVAL, frame_start - self.last_frame_start)
+        self.last_frame_start = frame_start
+
+        if self.__log:
+            self.__log.write(f"{self.frame},{screen},{build_ns / Im.NS_PER_MS:.3f},{frame_ns / Im.NS_PER_MS:.3f},"
+                             f"{blits},{self.fps():.1f}\n")
+
+    def fps(self) -> float:
+        # Averaged over the window of frame-to-frame intervals, which includes any pacing delay
+        try:
+            intervals = self.stats.samples[KEY_INTERVAL]
+        except KeyError:
+            return 0.0
+
+        return len(intervals) * 1_000_000_000 / sum(intervals) if sum(intervals) else 0.0
+
+    def overlay_lines(self) -> [str]:
+        lines = [f"FPS   {self.fps():6.1f}"]
+        for key in [KEY_FRAME, KEY_BUILD]:
+            if key in self.stats.samples:
+                last = self.stats.samples[key][-1] / Im.NS_PER_MS
+                p99 = self.stats.percentile(key, 99) / Im.NS_PER_MS
+                lines.append(f"{key:<6}{last:6.2f} ms p99 {p99:.2f}")
+        lines.append(f"blits {self.last_blits:6d}")
+
+        return lines
+
+    def draw_overlay(self, window) -> None:
+        lines = self.overlay_lines()
+        x = window.get_width() - OVERLAY_WIDTH
+
+        background = pygame.Surface((OVERLAY_WIDTH, len(lines) * OVERLAY_LINE_HEIGHT + 2 * OVERLAY_PADDING))
+        background.set_alpha(OVERLAY_ALPHA)
+        window.blit(background, (x, 0))
+
+        y = OVERLAY_PADDING
+        for line in lines:
+            window.blit(PSc.get_font(PCo.FONT_COURIER_NEW, OVERLAY_FONT_SIZE).render(line, True, PCo.COLOR_WHITE),
+                        (x + OVERLAY_PADDING, y))
+            y += OVERLAY_LINE_HEIGHT
+
+    def summary(self) -> dict:
+        return {"fps": self.fps(), "timings": self.stats.summary(), "counters": self.stats.counters}
+
+    def close(self) -> None:
+        if self.__log:
+            self.__log.close()
+            self.__log = None
+
+
+def run_headless(interface, frames: int = HEADLESS_FRAMES, game_tag: str = HEADLESS_GAME_TAG) -> dict:
+    """
+    Render each screen for a number of frames without pacing delays, and collect telemetry per screen.
+
+    :param interface: PyGameInterface, which is quit at the end
+    :param frames: Frames per screen
+    :param game_tag: Set piece to show on the main screen
+    :return: {screen: telemetry summary}
+    """
+    interface.game = Bd.build_game_from_file(Co.SET_PIECES_FOLDER + game_tag, game_tag=game_tag, interface=interface)
+
+    results = {}
+    for screen in [PCo.MENU_SCREEN, PCo.LOAD_SCREEN, PCo.HELP_SCREEN, PCo.MAIN_SCREEN]:
+        interface.state[PCo.CURRENT_SCREEN] = screen
+        interface.telemetry = FrameTelemetry()
+        interface.pace_frames = False
+
+        for _ in range(frames):
+            interface.display_state()
+
+        results[screen] = interface.telemetry.summary()
+
+    interface.event_quit()
+    return results
+
+
+if __name__ == "__main__":
+    # Only needed here; PyGameInterface imports this module
+    import PyGameInterface as PIn
+
+    parser = argparse.ArgumentParser(description="Render every screen headless and report frame telemetry")
+    parser.add_argument("--frames", type=int, default=HEADLESS_FRAMES, help="frames per screen")
+    parser.add_argument("--output", default=None, help="JSON file to write the stats to")
+    args = parser.parse_args()
+
+    stats = run_headless(PIn.PyGameInterface(), args.frames)
+
+    for name, summary in stats.items():
+        frame = summary["timings"][KEY_FRAME]
+        build = summary["timings"][KEY_BUILD]
+        blits = summary["counters"][COUNTER_BLITS] / summary["counters"][COUNTER_FRAMES]
+        print(f"{name:<6} frame {frame['mean_ms']:7.2f} ms (p99 {frame['p99_ms']:7.2f})  "
+              f"build {build['mean_ms']:7.2f} ms  blits/frame {blits:.0f}")
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(stats, file, indent=2)
+
+        print(f"Stats written to {args.output}")
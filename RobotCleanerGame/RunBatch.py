@@ -0,0 +1,225 @@
+"""
+
+    Batch runner: plays many levels with a policy, in a process pool, and streams one JSON line per game.
+
+    Levels are set piece folders (holding game.rcgg) in a pack folder, SetPieces by default, or the entries of a
+    pack file (.rcgk, e.g. from LevelGenerator), picked with glob patterns. Policies:
+     - solve              replay the level's solve.rcgs; set piece folders only, as packs hold no solve files
+     - random             random legal actions, seeded per game
+     - <module>:<name>    a named agent: a function (game, rng) -> Action, or None to stop
+
+    Each line holds the level, policy, seed, score, steps, cleared flag and wall time; a game which raises gets an
+    "error" instead. Games are run headless (see Interface.start_headless).
+
+    Usage, from the RobotCleanerGame folder:
+        python RunBatch.py --levels "Tutorial_*" --policy solve
+        python RunBatch.py --policy random --runs 100 --workers 8 --output nightly.jsonl
+        python RunBatch.py --pack generated.rcgk --policy random
+
+"""
+import Actions as Ac
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import fnmatch
+import importlib
+import Interface as In
+from InterfaceFromFile import InterfaceFromFile
+from io import StringIO
+import json
+import os
+import random
+import sys
+import time
+
+POLICY_SOLVE = "solve"
+POLICY_RANDOM = "random"
+
+DEFAULT_MAX_STEPS = 1000
+
+
+def random_policy(game, rng: random.Random) -> (Ac.Action | None):
+    actions = game.get_possible_actions()
+    return rng.choice(actions) if actions else None
+
+
+POLICIES = {
+    POLICY_RANDOM: random_policy,
+}
+
+
+def get_policy(name: str):
+    """
+    :param name: A name in POLICIES, or "<module>:<function>"
+    :return: Callable (game, rng) -> Action or None
+    """
+    try:
+        return POLICIES[name]
+    except KeyError:
+        pass
+
+    module_name, _, function_name = name.partition(":")
+    if not function_name:
+        raise ValueError(f"Unknown policy {name}; expected one of {sorted(POLICIES)}, {POLICY_SOLVE} or module:name")
+
+    return getattr(importlib.import_module(module_name), function_name)
+
+
+class PolicyInterface(In.Interface):
+    """
+        An Interface whose actions come from a policy rather than a person.
+    """
+
+    def __init__(self, game, policy, rng: random.Random, max_steps: int = DEFAULT_MAX_STEPS, output=None) -> None:
+        super().__init__(game, output=output)
+        self.policy = policy
+        self.rng = rng
+        self.max_steps = max_steps
+        self.steps = 0
+
+    def listen_for_action(self) -> Ac.Action:
+        # Stop once the grid is cleared, the step limit is reached, or the policy has nothing to do
+        if self.game.ended or self.steps >= self.max_steps:
+            return Ac.Quit(self)
+
+        if (action := self.policy(self.game, self.rng)) is None:
+            return Ac.Quit(self)
+
+        self.steps += 1
+        return action
+
+
+def is_pack_file(pack: str) -> bool:
+    # A pack file rather than a folder of set pieces
+    return os.path.isfile(pack)
+
+
+def find_levels(patterns: [str], pack: str = Co.SET_PIECES_FOLDER) -> [str]:
+    """
+    :param patterns: Glob patterns matched against level names, e.g. Tutorial_*
+    :param pack: Folder of set pieces, or pack file
+    :return: Sorted level names
+    """
+    if is_pack_file(pack):
+        levels = {tag for tag, _ in Bd.read_pack(pack)}
+    else:
+        levels = {tag for tag in os.listdir(pack) if os.path.isfile(os.path.join(pack, tag, Bd.FILE_NAME))}
+
+    return sorted(tag for tag in levels if any(fnmatch.fnmatch(tag, p) for p in patterns))
+
+
+def run_game(pack: str, tag: str, policy: str, seed: str, max_steps: int = DEFAULT_MAX_STEPS,
+             buffer: [str] = None) -> dict:
+    """
+    Play one level; runs in a worker process.
+
+    :param buffer: Game file lines of a level from a pack file; None to read the level's folder in the pack folder
+    :return: One result line, as a dict
+    """
+    result = {"level": tag, "policy": policy, "seed": seed}
+    folder_path = os.path.join(pack, tag)
+
+    start = time.perf_counter()
+
+    try:
+        if buffer is None:
+            game = Bd.build_game_from_file(folder_path, game_tag=tag)
+        elif policy == POLICY_SOLVE:
+            raise ValueError(f"the {POLICY_SOLVE} policy needs set piece folders; packs hold no solve files")
+        else:
+            game = Bd.build_game_from_buffer(buffer)
+            game.tag = tag
+
+        if policy == POLICY_SOLVE:
+            game.interface = InterfaceFromFile(game, folder_path, output=StringIO())
+        else:
+            game.interface = PolicyInterface(game, get_policy(policy), random.Random(seed), max_steps,
+                                             output=StringIO())
+
+        summary = game.interface.start_headless()
+        result |= {"score": summary["score"], "steps": summary["steps"], "cleared": summary["cleared"]}
+
+    except Exception as e:
+        result["error"] = f"{e.__class__.__name__}: {e}"
+
+    result["wall_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+    return result
+
+
+def run_batch(levels: [str], policy: str, pack: str = Co.SET_PIECES_FOLDER, runs: int = 1, seed: int = 0,
+              workers: (int | None) = None, max_steps: int = DEFAULT_MAX_STEPS, output=None) -> [dict]:
+    """
+    Play every level `runs` times, writing each result as a JSON line as soon as it's done.
+
+    :param levels: Level names
+    :param policy: Policy name; see get_policy()
+    :param pack: Folder of set pieces, or pack file
+    :param runs: Games per level
+    :param seed: Base seed; each game's seed is "<seed>:<level>:<run>"
+    :param workers: Number of processes; None for one per CPU
+    :param max_steps: Step limit for policies other than solve
+    :param output: Writer for the JSON lines; None for sys.stdout
+    :return: Results, in completion order
+    """
+    output = output if output is not None else sys.stdout
+    results = []
+
+    # A pack file is read once, here; each game is sent the lines of its own level
+    wanted = set(levels)
+    buffers = {tag: buffer for tag, buffer in Bd.read_pack(pack) if tag in wanted} if is_pack_file(pack) else {}
+
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(run_game, pack, tag, policy, f"{seed}:{tag}:{run}", max_steps, buffers.get(tag))
+                   for tag in levels for run in range(runs)]
+
+        for future in as_completed(futures):
+            results.append(result := future.result())
+            output.write(json.dumps(result) + "\n")
+            output.flush()
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Play RobotCleanerGame levels in batch, one JSON line per game")
+    parser.add_argument("--levels", nargs="+", default=["*"], help="glob patterns of level names")
+    parser.add_argument("--pack", default=Co.SET_PIECES_FOLDER,
+                        help=f"folder of set pieces, or pack file ({Bd.PACK_SUFFIX})")
+    parser.add_argument("--policy", default=POLICY_SOLVE, help="solve, random, or module:function")
+    parser.add_argument("--runs", type=int, default=1, help="games per level")
+    parser.add_argument("--seed", type=int, default=0, help="base seed")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes; default one per CPU")
+    parser.add_argument("--max-steps", type=int, default=DEFAULT_MAX_STEPS, help="step limit per game")
+    parser.add_argument("--output", default=None, help="JSON lines file; default stdout")
+    args = parser.parse_args()
+
+    found = find_levels(args.levels, args.pack)
+    if not found:
+        print(f"No levels match {args.levels} in {args.pack}", file=sys.stderr)
+        sys.exit(1)
+
+    if args.policy != POLICY_SOLVE:
+        get_policy(args.policy)  # Fail early on an unknown policy
+    elif is_pack_file(args.pack):
+        print(f"The {POLICY_SOLVE} policy needs a folder of set pieces; {args.pack} is a pack file", file=sys.stderr)
+        sys.exit(1)
+
+    start_time = time.perf_counter()
+
+    if args.output:
+        with open(args.output, "w") as file:
+            all_results = run_batch(found, args.policy, args.pack, args.runs, args.seed, args.workers,
+                                    args.max_steps, file)
+    else:
+        all_results = run_batch(found, args.policy, args.pack, args.runs, args.seed, args.workers, args.max_steps)
+
+    wall = time.perf_counter() - start_time
+    errors = sum("error" in r for r in all_results)
+
+    print(f"{len(all_results)} game(s) in {wall:.2f} s ({len(all_results) / wall:,.1f} games/s); {errors} error(s)",
+          file=sys.stderr)
+
+    if errors:
+        sys.exit(1)
@@ -0,0 +1,309 @@
+"""
+
+    Micro & macro benchmarks for the game engine and the headless PyGame screens, plus the start-up time of a
+    headless replay in a fresh interpreter (which also checks that it doesn't import PyGame).
+
+    Each benchmark reports throughput in operations per second, over several board sizes where that applies.
+    Results can be stored as a JSON baseline; later runs are compared against it and fail when any benchmark's
+    throughput drops by more than the threshold.
+
+    Usage, from the RobotCleanerGame folder:
+        python RunBenchmarks.py --save        (store a new baseline)
+        python RunBenchmarks.py               (compare against the stored baseline)
+
+"""
+import os
+
+# No window is needed to benchmark screens; must be set before PyGame is initialised
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+
+import Actions as Ac
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+import Game as Gm
+import Grid as Gr
+from InterfaceFromFile import InterfaceFromFile
+import Interface as In
+from io import StringIO
+import json
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import timeit
+
+BENCHMARK_FOLDER = "../UnitTesting/Benchmarks/"
+BASELINE_FILE = "baseline.json"
+
+DEFAULT_SIZES = [8, 32, 128]
+DEFAULT_THRESHOLD = 0.25  # Fail when throughput drops by more than 25%
+DEFAULT_REPEAT = 5
+
+REPLAY_GAME_TAG = "Game_1"
+
+# A fresh interpreter replaying a set piece headless; exits with 1 if anything imported PyGame
+HEADLESS_STARTUP_CODE = f"""
+import sys
+import BuildGameFromFile as Bd
+import Constants as Co
+from InterfaceFromFile import InterfaceFromFile
+from io import StringIO
+
+game = Bd.build_game_from_file(Co.SET_PIECES_FOLDER + "{REPLAY_GAME_TAG}", game_tag="{REPLAY_GAME_TAG}")
+game.interface = InterfaceFromFile(game, Co.SET_PIECES_FOLDER + "{REPLAY_GAME_TAG}", output=StringIO())
+game.interface.start()
+
+sys.exit(any(name == "pygame" or name.startswith("PyGame") for name in sys.modules))
+"""
+
+BENCHMARK_DENSITY = 0.3
+BENCHMARK_TOKENS = [Co.BLOCKED_TILE] + sorted(Co.SET_OF_ITEMS | Co.SET_OF_BINS | Co.SET_OF_MESS)
+
+
+def build_benchmark_game(size: int, seed: int = 0) -> Gm.Game:
+    """
+    Build a square game with the robot in the middle and randomly placed tokens elsewhere.
+
+    The robot's neighbours are fixed so that every action type can be benchmarked:
+    item to the right, mess to the left, bin above and an empty tile below.
+
+    :param size: Grid width & height; at least 3
+    :param seed: Random seed
+    :return: Game object, with a console Interface that writes nowhere
+    """
+    rng = random.Random(seed)
+    c = size // 2
+
+    game = Gm.Game(tag=f"Benchmark_{size}", size_x=size, size_y=size, robot_start=(c, c))
+    game.interface = In.Interface(game, output=StringIO())
+
+    fixed = {(c + 1, c): "r", (c - 1, c): "m", (c, c - 1): "R", (c, c + 1): Co.EMPTY_TILE, (c, c): Co.ROBOT_TOKEN}
+
+    for y in range(size):
+        for x in range(size):
+            if (x, y) in fixed:
+                if fixed[(x, y)] not in {Co.EMPTY_TILE, Co.ROBOT_TOKEN}:
+                    game.add_grid_token((x, y), fixed[(x, y)])
+            elif rng.random() < BENCHMARK_DENSITY:
+                game.add_grid_token((x, y), rng.choice(BENCHMARK_TOKENS))
+
+    return game
+
+
+def build_nearly_cleared_game(size: int) -> Gm.Game:
+    # Only the last tile is left to clear, so is_grid_cleared() has to scan the whole grid
+    game = Gm.Game(size_x=size, size_y=size, robot_start=(0, 0))
+    game.add_grid_token((size - 1, size - 1), "m")
+    return game
+
+
+"""
+    Benchmarks: each returns {name: callable}; every call of the callable is one operation
+"""
+
+
+def engine_benchmarks(size: int) -> dict:
+    game = build_benchmark_game(size)
+    interface = game.interface
+    c = size // 2
+
+    item_tile = game.grid.get_tile((c + 1, c))
+    mess_tile = game.grid.get_tile((c - 1, c))
+
+    move_there = Ac.Move(interface, (c, c + 1))
+    move_back = Ac.Move(interface, (c, c))
+    pickup = Ac.PickUp(interface, (c + 1, c))
+    drop = Ac.Drop(interface, (c, c - 1))
+    sweep = Ac.Sweep(interface, (c - 1, c))
+
+    def move():
+        move_there.execute()
+        move_back.execute()
+
+    def pick_up():
+        pickup.execute()
+        # Reset: put the item back
+        game.robot.stack.pop()
+        item_tile.set_content("r")
+
+    def drop_into_bin():
+        # Reset: give the robot something to drop
+        game.robot.stack.append("r")
+        drop.execute()
+
+    def sweep_mess():
+        sweep.execute()
+        # Reset: make another mess
+        mess_tile.set_content("m")
+
+    cleared_game = build_nearly_cleared_game(size)
+
+    return {
+        f"grid_construction[{size}]": lambda: Gr.Grid(size, size),
+        f"get_adjacent_coordinates[{size}]":
+            lambda: [game.grid.get_adjacent_coordinates((x, y)) for y in range(size) for x in range(size)],
+        f"get_possible_actions[{size}]": game.get_possible_actions,
+        f"execute_Move_x2[{size}]": move,
+        f"execute_PickUp[{size}]": pick_up,
+        f"execute_Drop[{size}]": drop_into_bin,
+        f"execute_Sweep[{size}]": sweep_mess,
+        f"is_grid_cleared[{size}]": cleared_game.is_grid_cleared,
+    }
+
+
+def file_benchmarks(size: int, folder: str) -> dict:
+    folder_path = os.path.join(folder, f"Benchmark_{size}")
+    Bd.export_game_file(folder_path, build_benchmark_game(size))
+
+    return {
+        f"build_game_from_file[{size}]": lambda: Bd.build_game_from_file(folder_path),
+    }
+
+
+def replay_benchmarks() -> dict:
+    folder_path = Co.SET_PIECES_FOLDER + REPLAY_GAME_TAG
+
+    def replay():
+        g = Bd.build_game_from_file(folder_path, game_tag=REPLAY_GAME_TAG)
+        g.interface = InterfaceFromFile(g, folder_path, output=StringIO())
+        g.interface.start()
+
+    def replay_headless():
+        g = Bd.build_game_from_file(folder_path, game_tag=REPLAY_GAME_TAG)
+        g.interface = InterfaceFromFile(g, folder_path, output=StringIO())
+        g.interface.start_headless()
+
+    return {
+        f"interface_from_file_replay[{REPLAY_GAME_TAG}]": replay,
+        f"interface_from_file_replay_headless[{REPLAY_GAME_TAG}]": replay_headless,
+    }
+
+
+def startup_benchmarks() -> dict:
+    def headless_startup():
+        if subprocess.run([sys.executable, "-c", HEADLESS_STARTUP_CODE]).returncode != 0:
+            raise RuntimeError("headless startup failed or imported PyGame")
+
+    return {
+        f"headless_startup_replay[{REPLAY_GAME_TAG}]": headless_startup,
+    }
+
+
+def screen_benchmarks(size: int) -> dict:
+    import PyGameConstants as PCo
+    import PyGameInterface as PIn
+    import PyGameScreens as PSc
+
+    game = build_benchmark_game(size)
+    interface = PIn.PyGameInterface(game=game)
+    game.interface = interface
+    interface.state[PCo.CURRENT_SCREEN] = PCo.MAIN_SCREEN
+
+    def factory_and_draw():
+        screen = PSc.MainScreen.factory(interface)
+        # Measure the frame, not the pacing delay
+        screen.delay = 0
+        screen.draw()
+
+    return {
+        f"main_screen_factory_draw[{size}]": factory_and_draw,
+    }
+
+
+def measure(function, repeat: int = DEFAULT_REPEAT) -> float:
+    """
+    Time a callable with timeit, taking the best of several rounds.
+
+    :param function: Callable; one call is one operation
+    :param repeat: Number of rounds
+    :return: Operations per second
+    """
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return number / min(timer.repeat(repeat=repeat, number=number))
+
+
+def run_benchmarks(sizes: [int], repeat: int = DEFAULT_REPEAT, screens: bool = True) -> {str: float}:
+    """
+    :param sizes: Board sizes
+    :param repeat: Number of timing rounds per benchmark
+    :param screens: Include the PyGame screen benchmarks
+    :return: {benchmark name: operations per second}
+    """
+    results = {}
+
+    with tempfile.TemporaryDirectory() as folder:
+        benchmarks = {}
+        for size in sizes:
+            benchmarks |= engine_benchmarks(size)
+            benchmarks |= file_benchmarks(size, folder)
+            if screens:
+                benchmarks |= screen_benchmarks(size)
+        benchmarks |= replay_benchmarks()
+        benchmarks |= startup_benchmarks()
+
+        for name, function in benchmarks.items():
+            results[name] = measure(function, repeat)
+            print(f"{name:<48}{results[name]:>16,.1f} ops/s")
+
+    return results
+
+
+def save_baseline(results: {str: float}, path: str) -> None:
+    folder = os.path.dirname(path)
+    if folder and not os.path.exists(folder):
+        os.makedirs(folder)
+
+    with open(path, "w") as file:
+        json.dump({"python": platform.python_version(), "machine": platform.machine(), "results": results},
+                  file, indent=2, sort_keys=True)
+
+
+def compare_to_baseline(results: {str: float}, path: str, threshold: float = DEFAULT_THRESHOLD) -> [str]:
+    """
+    :param results: {benchmark name: operations per second}
+    :param path: Baseline file path
+    :param threshold: Largest acceptable drop in throughput, as a fraction of the baseline
+    :return: List of regression messages; empty if none
+    """
+    with open(path, "r") as file:
+        baseline = json.load(file)["results"]
+
+    regressions = []
+    for name, ops in results.items():
+        if name not in baseline:
+            continue
+
+        change = ops / baseline[name] - 1
+        if change < -threshold:
+            regressions.append(f"{name}: {ops:,.1f} ops/s vs baseline {baseline[name]:,.1f} ({change:+.0%})")
+
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run RobotCleanerGame benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="board sizes")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT, help="timing rounds per benchmark")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="allowed drop, e.g. 0.25")
+    parser.add_argument("--baseline", default=BENCHMARK_FOLDER + BASELINE_FILE, help="baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="store results as the new baseline")
+    parser.add_argument("--no-screens", action="store_true", help="skip the PyGame screen benchmarks")
+    args = parser.parse_args()
+
+    bench_results = run_benchmarks(args.sizes, args.repeat, not args.no_screens)
+
+    if args.save:
+        save_baseline(bench_results, args.baseline)
+        print(f"Baseline saved to {args.baseline}")
+    elif os.path.exists(args.baseline):
+        found = compare_to_baseline(bench_results, args.baseline, args.threshold)
+        for message in found:
+            print(f"REGRESSION {message}")
+        if found:
+            sys.exit(1)
+        print("No regressions against baseline.")
+    else:
+        print(f"No baseline at {args.baseline}; run with --save to create one.")
@@ -0,0 +1,157 @@
+"""
+
+    Equivalence checks for the ways of running the Solver that must not change its results, run over every set piece
+    with a solve file (as RunUnitTests); they bypass the SolverCache, so that every run is searched:
+     - checkpoint: a run stopped part way, with a checkpoint cut off halfway (as by a crash), then resumed from its
+       journal, finds the same solution, after expanding the same number of states, as a run that never stopped
+     - distributed: the multi-process solver finds a solution of the same score as the single-process one, and
+       replaying it scores that
+     - encoder: an observation updated action by action (ObservationEncoder.update(), and through a BatchEncoder)
+       equals one encoded in full, after every step of a seeded random playout; needs NumPy
+
+    Usage, from the RobotCleanerGame folder:
+        python RunEquivalenceChecks.py
+
+"""
+import BuildGameFromFile as Bd
+from BuildLogFilesForUnitTests import find_solved_set_pieces
+import Constants as Co
+import Interface as In
+from io import StringIO
+import os
+import random
+import Solver as So
+import SolverCheckpoint as Sc
+import SolverDistributed as Sd
+import sys
+import tempfile
+import time
+
+RESULT_OK = "OK"
+
+# States expanded between checkpoints; small, so that even the tutorials write a few
+CHECKPOINT_INTERVAL = 50
+
+# Worker processes for the distributed solver; more than one, so that states are sent between workers
+DISTRIBUTED_WORKERS = 2
+
+# The observation encoder lives with the agent; a random playout of this many steps at most, per set piece
+AGENT_FOLDER = "../RobotCleanerAgent"
+ENCODER_STEPS = 200
+ENCODER_SEED = 0
+
+# Bytes of a checkpoint cut off by the crash: an entry record, without the commit after it
+CUT_OFF_CHECKPOINT = Sc.ENTRY_TAG + bytes(Sc.ENTRY.size // 2)
+
+
+def compare(result: dict, expected: dict, keys: [str]) -> str:
+    """
+    :return: RESULT_OK, or which keys differ
+    """
+    differ = [f"{key} {result[key]} != {expected[key]}" for key in keys if result[key] != expected[key]]
+    return "; ".join(differ) if differ else RESULT_OK
+
+
+def check_checkpoint(buffer: [str]) -> str:
+    """
+    Stop a run with checkpoints half way, cut its journal off part way through a checkpoint, and resume it.
+    """
+    expected = So.solve_buffer(buffer)
+
+    with tempfile.TemporaryDirectory() as folder:
+        path = os.path.join(folder, "check" + Sc.JOURNAL_SUFFIX)
+
+        # The first run stops at the node limit, as if killed
+        checkpointer = Sc.Checkpointer(So.Solver(So.Level.from_buffer(buffer)), path)
+        checkpointer.solve(max(1, expected["stats"]["expanded"] // 2), CHECKPOINT_INTERVAL)
+
+        with open(path, "ab") as file:
+            file.write(CUT_OFF_CHECKPOINT)
+
+        result = Sc.solve_with_checkpoints(buffer, path, interval=CHECKPOINT_INTERVAL, use_cache=False)
+
+    result["expanded"], expected["expanded"] = result["stats"]["expanded"], expected["stats"]["expanded"]
+
+    return compare(result, expected, ["status", "score", "actions", "expanded"])
+
+
+def check_distributed(buffer: [str]) -> str:
+    """
+    Solve with DISTRIBUTED_WORKERS processes and with one; states may be expanded in another order, so only the
+    score of the solutions has to match.
+    """
+    expected = So.solve_buffer(buffer)
+    result = Sd.solve_distributed(buffer, DISTRIBUTED_WORKERS, use_cache=False)
+
+    if (outcome := compare(result, expected, ["status", "score"])) != RESULT_OK:
+        return outcome
+
+    if result["status"] == So.STATUS_SOLVED:
+        if (replayed := So.replay(buffer, result["actions"])[0]) != result["score"]:
+            return f"replayed score {replayed} != {result['score']}"
+
+    return RESULT_OK
+
+
+def check_encoder(buffer: [str]) -> str:
+    """
+    Play random actions, comparing the incremental encodings with a full one after each.
+    """
+    # Only this check needs NumPy & the agent's folder
+    if AGENT_FOLDER not in sys.path:
+        sys.path.append(AGENT_FOLDER)
+    import numpy as np
+    import Observation as Ob
+
+    game = Bd.build_game_from_buffer(buffer)
+    game.interface = In.Interface(game, output=StringIO())
+    rng = random.Random(ENCODER_SEED)
+
+    encoder = Ob.ObservationEncoder(game.grid.size_x, game.grid.size_y)
+    encoder.reset(game)
+    batch = Ob.BatchEncoder([game])
+
+    for step in range(1, ENCODER_STEPS + 1):
+        if game.is_grid_cleared() or not (actions := game.get_possible_actions()):
+            break
+
+        action = rng.choice(actions)
+        game.interface.process_action(action)
+
+        full = Ob.encode(game)
+        if not np.array_equal(encoder.update(game, action), full):
+            return f"update() differs after step {step}, {action.__class__.__name__}{action.coords}"
+        if not np.array_equal(batch.update([game], [action])[0], full):
+            return f"BatchEncoder differs after step {step}, {action.__class__.__name__}{action.coords}"
+
+    return RESULT_OK
+
+
+CHECKS = {
+    "checkpoint": check_checkpoint,
+    "distributed": check_distributed,
+    "encoder": check_encoder,
+}
+
+
+if __name__ == "__main__":
+    total_start = time.perf_counter()
+    failed = 0
+
+    for game_tag in find_solved_set_pieces():
+        game_buffer = Bd.read_file_to_buffer(Co.SET_PIECES_FOLDER + game_tag)
+
+        for name, check in CHECKS.items():
+            start = time.perf_counter()
+            try:
+                outcome = check(game_buffer)
+            except Exception as e:
+                outcome = f"{e.__class__.__name__}: {e}"
+
+            print(f"{game_tag} {name}: {outcome} ({(time.perf_counter() - start) * 1000:.1f} ms)")
+            failed += outcome != RESULT_OK
+
+    print(f"{failed} check(s) not OK; {time.perf_counter() - total_start:.2f} s in total")
+
+    if failed:
+        sys.exit(1)
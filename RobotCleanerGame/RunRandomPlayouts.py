@@ -0,0 +1,271 @@
+"""
+
+    Random-playout fuzz harness.
+
+    Plays random legal actions, as offered by Game.get_possible_actions(), across set pieces and randomly generated
+    levels, and checks the game's invariants after every step:
+     - there is exactly one ROBOT_TOKEN on the grid, where the robot thinks it is
+     - the robot's stack holds at most MAX_CARRY items
+     - the score matches the score predicted independently from the history
+
+    Work is sharded across processes. Every episode has its own seed, "<seed>:<shard>:<episode>", so a failure can
+    be reproduced on its own with --episode.
+
+    Usage, from the RobotCleanerGame folder:
+        python RunRandomPlayouts.py --steps 1000000 --seed 1
+        python RunRandomPlayouts.py --episode 1:3:1207
+
+"""
+import Actions as Ac
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+import Game as Gm
+import Interface as In
+from io import StringIO
+from multiprocessing import Pool
+import os
+import random
+import sys
+import time
+
+DEFAULT_STEPS = 1_000_000
+DEFAULT_SEED = 0
+MAX_EPISODE_STEPS = 500
+MAX_FAILURES_PER_SHARD = 10
+
+GENERATED_SIZE_RANGE = (3, 12)
+GENERATED_DENSITY = 0.35
+SET_PIECE_CHANCE = 0.25
+
+LEVEL_TOKENS = [Co.BLOCKED_TILE] + sorted(Co.SET_OF_ITEMS | Co.SET_OF_BINS | Co.SET_OF_MESS)
+
+
+class InvariantError(Exception):
+    pass
+
+
+def build_random_game(rng: random.Random, size_x: int, size_y: int, density: float = GENERATED_DENSITY) -> Gm.Game:
+    """
+    A random level; it may well not be solvable, which doesn't matter for fuzzing.
+
+    :param rng: Random number generator
+    :param size_x: Horizontal size of Grid
+    :param size_y: Vertical size of Grid
+    :param density: Chance of each tile holding a token
+    :return: Game object
+    """
+    robot_start = (rng.randrange(size_x), rng.randrange(size_y))
+    game = Gm.Game(size_x=size_x, size_y=size_y, robot_start=robot_start)
+
+    for y in range(size_y):
+        for x in range(size_x):
+            if (x, y) != robot_start and rng.random() < density:
+                game.add_grid_token((x, y), rng.choice(LEVEL_TOKENS))
+
+    return game
+
+
+def predict_score_change(game: Gm.Game, action: Ac.ActionWithCoords) -> int:
+    """
+    Work out what an action should do to the score, from the rules rather than from the Action classes.
+
+    :param game: Game before the action is executed
+    :param action: Action about to be executed
+    :return: Expected change of score
+    """
+    if game.ended:
+        return 0
+
+    change = -1
+    tile = game.grid.get_tile(action.coords)
+
+    match action.__class__.__name__:
+        case Ac.Sweep.__name__:
+            if tile.is_mess():
+                change += Co.SCORING["sweep"]
+        case Ac.Drop.__name__:
+            if game.robot.stack and tile.get_content() in Co.ITEMS_TO_BIN_MAP[game.robot.stack[-1]]:
+                if tile.get_content() == Co.UNIVERSAL_BIN:
+                    change += Co.SCORING["half"]
+                else:
+                    change += Co.SCORING["full"]
+        case _:
+            pass
+
+    return change
+
+
+def check_invariants(game: Gm.Game, expected_score: int, steps: int) -> None:
+    """
+    :param game: Game after an action
+    :param expected_score: Score predicted from the history
+    :param steps: Actions played so far
+    :raises InvariantError: if an invariant does not hold
+    """
+    robots = [(x, y) for y, row in enumerate(game.grid.grid) for x, tile in enumerate(row)
+              if tile.get_content() == Co.ROBOT_TOKEN]
+
+    if len(robots) != 1:
+        raise InvariantError(f"{len(robots)} robot tokens on the grid")
+
+    if robots[0] != tuple(game.robot.coords):
+        raise InvariantError(f"robot token at {robots[0]}, robot coords {game.robot.coords}")
+
+    if len(game.robot.stack) > Co.MAX_CARRY:
+        raise InvariantError(f"stack holds {len(game.robot.stack)} items")
+
+    if len(game.history) != steps:
+        raise InvariantError(f"history holds {len(game.history)} actions after {steps} steps")
+
+    if game.score != expected_score:
+        raise InvariantError(f"score {game.score}, expected {expected_score} from history")
+
+
+def load_set_piece_buffers(folder: str = Co.SET_PIECES_FOLDER) -> {str: [str]}:
+    # Read once per process; games are rebuilt from the buffers
+    buffers = {}
+    for tag in sorted(os.listdir(folder)):
+        if os.path.isfile(folder + tag + "/" + Bd.FILE_NAME):
+            buffers[tag] = Bd.read_file_to_buffer(folder + tag)
+
+    return buffers
+
+
+def build_episode_game(rng: random.Random, buffers: {str: [str]}) -> Gm.Game:
+    if buffers and rng.random() < SET_PIECE_CHANCE:
+        tag = rng.choice(sorted(buffers))
+        game = Bd.build_game_from_buffer(buffers[tag])
+        game.tag = tag
+    else:
+        game = build_random_game(rng, rng.randint(*GENERATED_SIZE_RANGE), rng.randint(*GENERATED_SIZE_RANGE))
+        game.tag = "Generated"
+
+    game.interface = In.Interface(game, output=StringIO())
+    return game
+
+
+def play_episode(episode_seed: str, buffers: {str: [str]}, max_steps: int = MAX_EPISODE_STEPS) -> (int, bool):
+    """
+    Play random actions until the grid is cleared, the robot is stuck, or max_steps is reached.
+
+    :param episode_seed: Seed string, "<seed>:<shard>:<episode>"
+    :param buffers: Set piece buffers
+    :param max_steps: Step limit
+    :return: Steps played, cleared flag
+    :raises InvariantError: with the episode seed and step in its message
+    """
+    rng = random.Random(episode_seed)
+    game = build_episode_game(rng, buffers)
+    interface = game.interface
+
+    expected_score = 0
+    steps = 0
+
+    while steps < max_steps:
+        actions = game.get_possible_actions()
+        if not actions:
+            break
+
+        action = rng.choice(actions)
+        expected_score += predict_score_change(game, action)
+
+        interface.process_action(action)
+        steps += 1
+
+        try:
+            check_invariants(game, expected_score, steps)
+        except InvariantError as e:
+            raise InvariantError(f"episode {episode_seed} ({game.tag}), step {steps}, "
+                                 f"{action.__class__.__name__}{action.coords}: {e}")
+
+        if game.is_grid_cleared():
+            return steps, True
+
+    return steps, False
+
+
+def run_shard(seed: int, shard: int, steps: int) -> dict:
+    """
+    Play episodes until at least the given number of steps have been played.
+
+    :return: Dict of steps, episodes, cleared, seconds & failures
+    """
+    buffers = load_set_piece_buffers()
+    result = {"steps": 0, "episodes": 0, "cleared": 0, "seconds": 0.0, "failures": []}
+
+    start = time.perf_counter()
+
+    while result["steps"] < steps:
+        episode_seed = f"{seed}:{shard}:{result['episodes']}"
+        result["episodes"] += 1
+
+        try:
+            played, cleared = play_episode(episode_seed, buffers)
+        except InvariantError as e:
+            result["failures"].append(str(e))
+            if len(result["failures"]) >= MAX_FAILURES_PER_SHARD:
+                break
+            continue
+
+        result["steps"] += played
+        result["cleared"] += cleared
+
+    result["seconds"] = time.perf_counter() - start
+
+    return result
+
+
+def run_playouts(steps: int, seed: int = DEFAULT_SEED, shards: (int | None) = None) -> dict:
+    """
+    :param steps: Total number of steps, split evenly over the shards
+    :param seed: Base seed
+    :param shards: Number of processes; None for one per CPU
+    :return: Combined shard results, plus wall time
+    """
+    shards = shards or os.cpu_count() or 1
+    per_shard = -(-steps // shards)  # Round up
+
+    start = time.perf_counter()
+    with Pool(shards) as pool:
+        results = pool.starmap(run_shard, [(seed, s, per_shard) for s in range(shards)])
+
+    total = {"steps": 0, "episodes": 0, "cleared": 0, "seconds": 0.0, "failures": [],
+             "wall_seconds": time.perf_counter() - start, "shards": shards}
+    for r in results:
+        for key in ["steps", "episodes", "cleared", "seconds", "failures"]:
+            total[key] += r[key]
+
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Random-playout fuzzing of RobotCleanerGame")
+    parser.add_argument("--steps", type=int, default=DEFAULT_STEPS, help="total random actions to play")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="base seed")
+    parser.add_argument("--shards", type=int, default=None, help="worker processes; default one per CPU")
+    parser.add_argument("--episode", default=None, help="replay a single episode seed, e.g. 0:3:1207")
+    args = parser.parse_args()
+
+    if args.episode:
+        try:
+            n, clr = play_episode(args.episode, load_set_piece_buffers())
+            print(f"Episode {args.episode}: {n} steps, cleared: {clr}, no invariants broken")
+        except InvariantError as err:
+            print(err)
+            sys.exit(1)
+        sys.exit(0)
+
+    summary = run_playouts(args.steps, args.seed, args.shards)
+
+    print(f"{summary['steps']:,} steps, {summary['episodes']:,} episodes ({summary['cleared']:,} cleared) "
+          f"over {summary['shards']} shard(s)")
+    if summary["steps"] and summary["seconds"] > 0:
+        print(f"{summary['steps'] / summary['wall_seconds']:,.0f} steps/s overall; "
+              f"{summary['steps'] / summary['seconds']:,.0f} steps/s per process")
+
+    for failure in summary["failures"]:
+        print(f"INVARIANT BROKEN {failure}")
+
+    if summary["failures"]:
+        sys.exit(1)
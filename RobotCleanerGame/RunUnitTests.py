@@ -1,29 +1,32 @@
 from BuildGameFromFile import build_game_from_file
-from BuildLogFilesForUnitTests import TESTCASE_LOG_FOLDER, LOG_FILE_SUFFIX, TESTCASES
+from BuildLogFilesForUnitTests import find_solved_set_pieces, TESTCASE_LOG_FOLDER, LOG_FILE_SUFFIX
 from Constants import SET_PIECES_FOLDER
 from InterfaceFromFile import InterfaceFromFile
 
+from concurrent.futures import ProcessPoolExecutor
 import datetime
+import difflib
+import hashlib
 from io import StringIO
 import os
-import sys
+import time
 
 CONFLICTS_FOLDER = "../UnitTesting/Conflicts/"
 
+RESULT_OK = "OK"
+RESULT_NOT_OK = "Not OK; see Conflicts folder"
+RESULT_NO_BASE_LOG = "No base log; see Conflicts folder"
 
-def get_unit_testcase(game_tag):
-    buffer = []
-    stdout_origin = sys.stdout
 
-    sys.stdout = buffer = StringIO()
+def get_unit_testcase(game_tag):
+    # Output is captured through the interface's writer, so cases can run side by side
+    buffer = StringIO()
 
     g = build_game_from_file(SET_PIECES_FOLDER + game_tag)
-    g.interface = InterfaceFromFile(g, SET_PIECES_FOLDER + game_tag)
+    g.interface = InterfaceFromFile(g, SET_PIECES_FOLDER + game_tag, output=buffer)
 
     g.interface.start()
 
-    sys.stdout = stdout_origin
-
     return buffer.getvalue()
 
 
@@ -33,38 +36,90 @@ def strip_date(s):
     return s
 
 
-if __name__ == "__main__":
-    if not os.path.exists(CONFLICTS_FOLDER):
-        os.makedirs(CONFLICTS_FOLDER)
+def hash_log(log: str) -> str:
+    return hashlib.sha256(log.encode()).hexdigest()
+
+
+def get_base_hash(game_tag) -> (str | None):
+    try:
+        with open(TESTCASE_LOG_FOLDER + game_tag + LOG_FILE_SUFFIX, "r") as file:
+            return hash_log(file.read())
+    except FileNotFoundError:
+        return None
+
+
+def run_case(game_tag, base_hash) -> (str, str, (str | None), float):
+    """
+    Replay one set piece and compare its log to the base log by hash.
+
+    Runs in a worker process; the log is only sent back when it needs to be diffed or saved.
+
+    :param game_tag: Game tag
+    :param base_hash: Hash of the base log, or None if there isn't one
+    :return: Game tag, result, log if not OK, seconds taken
+    """
+    start = time.perf_counter()
+    log = get_unit_testcase(game_tag)
+    elapsed = time.perf_counter() - start
+
+    if base_hash is None:
+        return game_tag, RESULT_NO_BASE_LOG, log, elapsed
+
+    if hash_log(log) == base_hash:
+        return game_tag, RESULT_OK, None, elapsed
+
+    return game_tag, RESULT_NOT_OK, log, elapsed
+
 
+def run_cases(cases: [str], workers: (int | None) = None):
+    """
+    Replay set pieces across a process pool, yielding results as they complete, in case order.
+
+    :param cases: Game tags
+    :param workers: Number of worker processes; None for one per CPU
+    :return: Generator of run_case() results
+    """
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(run_case, cases, [get_base_hash(c) for c in cases])
+
+
+def write_conflict(conflicts, game_tag, log) -> None:
+    if not os.path.exists(conflicts):
+        os.makedirs(conflicts)
+
+    with open(conflicts + game_tag + ".txt", "w") as file:
+        file.write(log)
+
+    # Only diff on a mismatch, and only if there is something to diff against
+    try:
+        with open(TESTCASE_LOG_FOLDER + game_tag + LOG_FILE_SUFFIX, "r") as file:
+            base = file.read()
+    except FileNotFoundError:
+        return
+
+    with open(conflicts + game_tag + ".diff", "w") as file:
+        file.writelines(difflib.unified_diff(base.splitlines(keepends=True), log.splitlines(keepends=True),
+                                             fromfile=game_tag + LOG_FILE_SUFFIX, tofile=game_tag + ".txt"))
+
+
+if __name__ == "__main__":
     now = strip_date(datetime.datetime.now().__str__())
 
     conflicts = CONFLICTS_FOLDER + now + "/"
 
     print(f"Conflicts folder (if any found): {conflicts}")
 
-    for case in TESTCASES:
-
-        ok = True
+    total_start = time.perf_counter()
+    failed = 0
 
-        test_case = get_unit_testcase(case)
-        print(case + ": ", end="")
-
-        with open(TESTCASE_LOG_FOLDER + case + LOG_FILE_SUFFIX, "r") as file:
-            if file.read() == test_case:
-                print("OK")
-            else:
-                print("Not OK; see Conflicts folder")
-                ok = False
+    for case, result, test_case, seconds in run_cases(find_solved_set_pieces()):
+        print(f"{case}: {result} ({seconds * 1000:.1f} ms)")
 
         # Skip rest of pass if OK
-        if ok:
+        if result == RESULT_OK:
             continue
 
-        if not os.path.exists(conflicts):
-            os.makedirs(conflicts)
-
-        with open(conflicts + case + ".txt", "w") as file:
-            file.write(test_case)
-
+        failed += 1
+        write_conflict(conflicts, case, test_case)
 
+    print(f"{failed} case(s) not OK; {time.perf_counter() - total_start:.2f} s in total")
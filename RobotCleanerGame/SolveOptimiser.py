@@ -0,0 +1,188 @@
+"""
+
+    Solve optimiser: shortens an action trace (a solve file, or a binary trace) of a level without changing what
+    it does.
+
+    The trace is replayed through the game engine. Every PickUp, Drop & Sweep that changed the game is a
+    checkpoint; failed actions (e.g. a drop into the wrong bin), failed moves & anything after the grid was cleared
+    only cost points, so they are left out. Between two checkpoints the grid doesn't change, only the robot moves,
+    so each run of Moves can be replaced by a shortest path. The robot may carry out a checkpoint from any empty
+    tile next to its target, not only from the one it used, so the tiles next to each target are kept as
+    candidates, with the cheapest way of reaching each, and the best chain is picked at the end.
+
+    The checkpoints are kept in their order, so the result clears the grid exactly as the original did, with the
+    same points scored, and loses no more than one point per Move. It is replayed to verify it; if it doesn't score
+    higher, the original is kept.
+
+    Usage, from the RobotCleanerGame folder:
+        python SolveOptimiser.py Game_1                       (the level's solve.rcgs)
+        python SolveOptimiser.py Game_1 --trace run.rcgt --output improved.rcgs
+
+"""
+import Actions as Ac
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+import Interface as In
+from io import StringIO
+import os
+import Solver as So
+import Trace as Tr
+
+
+def read_actions(path: str) -> [str]:
+    """
+    :param path: Solve file (.rcgs), or binary trace (.rcgt)
+    :return: Solve lines of the actions with coords; others (e.g. Quit) don't change the game & are left out
+    """
+    if path.endswith(os.path.splitext(Tr.TRACE_FILE)[1]):
+        with Tr.TraceReader(path) as reader:
+            return [Tr.format_solve_line(Tr.OPCODE_NAMES[rec[0]], (rec[1], rec[2])) for rec in reader]
+
+    with open(path, "r") as file:
+        lines = [line.strip() for line in file if line.strip()]
+
+    return [line for line in lines if Tr.parse_solve_line(line)[1] is not None]
+
+
+def get_checkpoints(buffer: [str], lines: [str]) -> (So.Level, [(str, int, bytes)]):
+    """
+    Replay a trace, keeping the actions which changed the grid or the stack.
+
+    :param buffer: Game file lines
+    :param lines: Solve lines
+    :return: Level at the start; list of (action name, target tile index, cells just before the action)
+    """
+    game = Bd.build_game_from_buffer(buffer)
+    game.interface = In.Interface(game, output=StringIO())
+    game.interface.headless = True
+
+    level = So.Level.from_game(game)
+    cells = level.cells
+    checkpoints = []
+
+    for line in lines:
+        if game.is_grid_cleared():
+            break
+
+        name, coords = Tr.parse_solve_line(line)
+        stack = list(game.robot.stack)
+
+        game.interface.process_action(getattr(Ac, name)(game.interface, coords))
+
+        if name == So.MOVE:
+            continue
+
+        after = So.Level.from_game(game).cells
+        if after != cells or game.robot.stack != stack:
+            checkpoints.append((name, level.get_index(coords), cells))
+            cells = after
+
+    return level, checkpoints
+
+
+def get_paths(level: So.Level, cells: bytes, start: int) -> {int: int}:
+    """
+    Breadth-first search over the empty tiles.
+
+    :return: {tile index: previous tile index on a shortest path from start}; start maps to itself
+    """
+    parents = {start: start}
+    frontier = [start]
+
+    while frontier:
+        next_frontier = []
+        for index in frontier:
+            for nb in level.neighbours[index]:
+                if nb not in parents and cells[nb] == So.EMPTY:
+                    parents[nb] = index
+                    next_frontier.append(nb)
+        frontier = next_frontier
+
+    return parents
+
+
+def get_moves(level: So.Level, parents: {int: int}, end: int) -> [str]:
+    # Move lines along the path found by get_paths() to end
+    path = []
+    while parents[end] != end:
+        path.append(Tr.format_solve_line(So.MOVE, level.get_coords(end)))
+        end = parents[end]
+
+    path.reverse()
+    return path
+
+
+def shorten(level: So.Level, checkpoints: [(str, int, bytes)]) -> [str]:
+    """
+    The shortest trace carrying out the checkpoints in order.
+
+    :return: Solve lines; None if a checkpoint can't be reached
+    """
+    # Robot tile : (actions so far, solve lines so far), for each place the robot could be at the last checkpoint
+    layer = {level.robot: (0, [])}
+
+    for name, target, cells in checkpoints:
+        # The robot's own tile shows as empty in cells, like any other tile it could stand on
+        candidates = [nb for nb in level.neighbours[target] if cells[nb] == So.EMPTY]
+        action = Tr.format_solve_line(name, level.get_coords(target))
+        next_layer = {}
+
+        for start, (cost, lines) in layer.items():
+            parents = get_paths(level, cells, start)
+            for end in candidates:
+                if end not in parents:
+                    continue
+                moves = get_moves(level, parents, end)
+                if end not in next_layer or cost + len(moves) + 1 < next_layer[end][0]:
+                    next_layer[end] = (cost + len(moves) + 1, lines + moves + [action])
+
+        if not next_layer:
+            # Only if the original carried out an action from out of reach, which the engine allows; give up
+            return None
+
+        layer = next_layer
+
+    return min(layer.values(), key=lambda entry: entry[0])[1]
+
+
+def optimise(buffer: [str], lines: [str]) -> dict:
+    """
+    :param buffer: Game file lines
+    :param lines: Solve lines
+    :return: {actions (solve lines), score, cleared, original_score, original_actions}; actions are the original
+             lines if no shorter trace was found
+    """
+    original_score, original_cleared = So.replay(buffer, lines)
+    result = {"actions": lines, "score": original_score, "cleared": original_cleared,
+              "original_score": original_score, "original_actions": len(lines)}
+
+    shortened = shorten(*get_checkpoints(buffer, lines))
+    if shortened is None:
+        return result
+
+    score, cleared = So.replay(buffer, shortened)
+    if score > original_score and cleared >= original_cleared:
+        result |= {"actions": shortened, "score": score, "cleared": cleared}
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Shorten a RobotCleanerGame solve file or trace")
+    parser.add_argument("level", help="set piece name, e.g. Game_1")
+    parser.add_argument("--trace", default=None, help=f"solve file or {Tr.TRACE_FILE}; default the level's solve file")
+    parser.add_argument("--output", default=None, help="solve file to write the result to")
+    args = parser.parse_args()
+
+    folder_path = os.path.join(Co.SET_PIECES_FOLDER, args.level)
+    buf = Bd.read_file_to_buffer(folder_path)
+
+    found = optimise(buf, read_actions(args.trace or os.path.join(folder_path, Bd.SOLVE_FILE)))
+
+    print(f"{args.level}: score {found['original_score']} -> {found['score']}, "
+          f"{found['original_actions']} -> {len(found['actions'])} action(s)")
+
+    if args.output:
+        with open(args.output, "w") as out:
+            out.write("".join(line + "\n" for line in found["actions"]))
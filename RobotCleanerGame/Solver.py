@@ -0,0 +1,342 @@
+"""
+
+    Best-score search over game states.
+
+    A Level is a compact, engine-independent copy of a game: the grid as one byte per tile (the token characters,
+    with the robot's tile empty), the robot's tile index and its stack. A state is packed into a single bytes key,
+    cells + robot index (4 bytes, little-endian) + stack, so states hash & compare fast and can be written out as
+    they are.
+
+    Score = 10 per item in its own bin + 5 per item in the universal bin + 3 per mess swept - 1 per action. Every
+    item & mess has to be dealt with to clear the grid, so the best score is the one with the lowest cost, where
+    an action costs 1 and dropping into the universal bin costs another 5. Costs are never negative, so A* applies;
+    the heuristic counts the pick-ups, drops & sweeps still needed, which never overestimates.
+
+    Level.check_reachable() is a much faster check that a level can be cleared at all, for generating levels.
+
+"""
+import Actions as Ac
+import BuildGameFromFile as Bd
+import Constants as Co
+import heapq
+import Interface as In
+from io import StringIO
+import sys
+import time
+import Trace as Tr
+
+DEFAULT_MAX_NODES = 1_000_000
+
+STATUS_SOLVED = "solved"
+STATUS_UNSOLVABLE = "unsolvable"  # The whole state space was searched
+STATUS_LIMIT = "limit"            # Gave up at max_nodes
+
+ROBOT_BYTES = 4
+
+EMPTY = ord(Co.EMPTY_TILE)
+BLOCKED = ord(Co.BLOCKED_TILE)
+MESS = ord("m")
+UNIVERSAL_BIN = ord(Co.UNIVERSAL_BIN)
+ITEMS = frozenset(ord(t) for t in Co.SET_OF_ITEMS)
+BINS = frozenset(ord(t) for t in Co.SET_OF_BINS)
+ACCEPTS = {ord(item): frozenset(ord(b) for b in bins) for item, bins in Co.ITEMS_TO_BIN_MAP.items()}
+
+# Extra cost of the universal bin: the score it gives up against the item's own bin
+UNIVERSAL_PENALTY = Co.SCORING["full"] - Co.SCORING["half"]
+
+# Action names, as in solve files
+MOVE, PICKUP, DROP, SWEEP = Ac.Move.__name__, Ac.PickUp.__name__, Ac.Drop.__name__, Ac.Sweep.__name__
+
+
+class Level:
+    def __init__(self, size_x: int, size_y: int, cells: bytes, robot: int) -> None:
+        """
+        :param size_x: Horizontal size of Grid
+        :param size_y: Vertical size of Grid
+        :param cells: One token character per tile, row by row; the robot's tile is empty
+        :param robot: Index of the robot's tile
+        """
+        self.size_x = size_x
+        self.size_y = size_y
+        self.size = size_x * size_y
+        self.cells = cells
+        self.robot = robot
+
+        # Adjacent tile indices, in the order of Co.MOVE_LIST as Grid.get_adjacent_coordinates() gives them
+        self.neighbours = []
+        for index in range(self.size):
+            x, y = self.get_coords(index)
+            self.neighbours.append(tuple(self.get_index((x + dx, y + dy)) for dx, dy in Co.MOVE_LIST
+                                         if 0 <= x + dx < size_x and 0 <= y + dy < size_y))
+
+    @staticmethod
+    def from_buffer(buffer: [str]) -> "Level":
+        """
+        :param buffer: Game file lines; see BuildGameFromFile
+        :return: Level
+        """
+        game = Bd.build_game_from_buffer(buffer)
+        return Level.from_game(game)
+
+    @staticmethod
+    def from_game(game) -> "Level":
+        cells = bytearray()
+        for row in game.grid.grid:
+            for tile in row:
+                content = tile.get_content()
+                cells.append(EMPTY if content == Co.ROBOT_TOKEN else ord(content))
+
+        robot = game.robot.coords[1] * game.grid.size_x + game.robot.coords[0]
+
+        return Level(game.grid.size_x, game.grid.size_y, bytes(cells), robot)
+
+    def get_index(self, coords: (int, int)) -> int:
+        return coords[1] * self.size_x + coords[0]
+
+    def get_coords(self, index: int) -> (int, int):
+        return index % self.size_x, index // self.size_x
+
+    def get_start_key(self) -> bytes:
+        return encode_state(self.cells, self.robot, b"")
+
+    def get_best_possible_score(self) -> int:
+        # Score if every item went into its own bin & no action were needed; the real score is this minus the cost
+        items = sum(self.cells.count(item) for item in ITEMS)
+        return Co.SCORING["full"] * items + Co.SCORING["sweep"] * self.cells.count(MESS)
+
+    def check_reachable(self) -> bool:
+        """
+        Fast check that the level can be cleared: every item & mess can be reached from the robot's start, and every
+        item's colour has an accepting bin next to the reachable area. Items & messes can be cleared out of the way
+        (an item can be put down behind the robot), so only blocked tiles & bins stop the robot.
+
+        :return: True if the level can be cleared
+        """
+        seen = {self.robot}
+        frontier = [self.robot]
+        reachable_bins = set()
+
+        while frontier:
+            index = frontier.pop()
+            for nb in self.neighbours[index]:
+                if nb in seen:
+                    continue
+                content = self.cells[nb]
+                if content == BLOCKED:
+                    continue
+                if content in BINS:
+                    reachable_bins.add(content)
+                    continue
+                seen.add(nb)
+                frontier.append(nb)
+
+        for index, content in enumerate(self.cells):
+            if content in ITEMS or content == MESS:
+                if index not in seen:
+                    return False
+                if content in ITEMS and not (ACCEPTS[content] & reachable_bins):
+                    return False
+
+        return True
+
+
+def encode_state(cells: bytes, robot: int, stack: bytes) -> bytes:
+    return cells + robot.to_bytes(ROBOT_BYTES, "little") + stack
+
+
+def decode_state(level: Level, key: bytes) -> (bytes, int, bytes):
+    """
+    :return: Cells, robot index, stack
+    """
+    n = level.size
+    return key[:n], int.from_bytes(key[n:n + ROBOT_BYTES], "little"), key[n + ROBOT_BYTES:]
+
+
+def heuristic(level: Level, key: bytes) -> int:
+    """
+    Lower bound of the cost still to pay: a pick-up & a drop per item on the grid, a drop per item carried, a sweep
+    per mess. Zero only when the grid is cleared.
+    """
+    cells = key[:level.size]
+    items = sum(cells.count(item) for item in ITEMS)
+
+    return 2 * items + cells.count(MESS) + len(key) - level.size - ROBOT_BYTES
+
+
+def expand(level: Level, key: bytes):
+    """
+    The states one action away.
+
+    :return: Generator of (cost, action name, tile index, successor key)
+    """
+    cells, robot, stack = decode_state(level, key)
+    robot_bytes = key[level.size:level.size + ROBOT_BYTES]
+
+    for nb in level.neighbours[robot]:
+        content = cells[nb]
+
+        if content == EMPTY:
+            yield 1, MOVE, nb, cells + nb.to_bytes(ROBOT_BYTES, "little") + stack
+            if stack:
+                # Put the item down, e.g. to get past it later
+                yield 1, DROP, nb, cells[:nb] + stack[-1:] + cells[nb + 1:] + robot_bytes + stack[:-1]
+
+        elif content in BINS:
+            # Dropping into the wrong bin fails, so is never worth it
+            if stack and content in ACCEPTS[stack[-1]]:
+                cost = 1 + (UNIVERSAL_PENALTY if content == UNIVERSAL_BIN else 0)
+                yield cost, DROP, nb, cells + robot_bytes + stack[:-1]
+
+        elif content in ITEMS:
+            if len(stack) < Co.MAX_CARRY:
+                yield 1, PICKUP, nb, cells[:nb] + b"." + cells[nb + 1:] + robot_bytes + stack + bytes([content])
+
+        elif content == MESS:
+            yield 1, SWEEP, nb, cells[:nb] + b"." + cells[nb + 1:] + robot_bytes + stack
+
+
+class Solver:
+    """
+        A* from the level's start to a cleared grid.
+
+        The search state is kept on the object (frontier, table & stats), so it can be inspected, or run further with
+        a higher node limit.
+    """
+
+    def __init__(self, level: Level) -> None:
+        self.level = level
+
+        # Heap of (f, -g, tie-breaker, key)
+        start = level.get_start_key()
+        self.frontier = [(heuristic(level, start), 0, 0, start)]
+
+        # key: (g, parent key, action name, tile index); the start has no parent
+        self.table: {bytes: (int, (bytes | None), (str | None), int)} = {start: (0, None, None, -1)}
+
+        self.stats = {"expanded": 0, "generated": 1, "seconds": 0.0}
+        self.goal: (bytes | None) = None
+
+        # Changes since they were last taken, when tracked (see SolverCheckpoint): (key, tie-breaker) of each table
+        # entry set, and the keys expanded
+        self.opened: (list | None) = None
+        self.closed: (list | None) = None
+
+    def solve(self, max_nodes: int = DEFAULT_MAX_NODES) -> dict:
+        """
+        :param max_nodes: Give up after expanding this many states in total
+        :return: {status, score, cost, actions (solve file lines), stats}
+        """
+        level = self.level
+        frontier = self.frontier
+        table = self.table
+        stats = self.stats
+        opened = self.opened
+        closed = self.closed
+        counter = stats["generated"]
+
+        start_time = time.perf_counter()
+
+        while frontier and self.goal is None and stats["expanded"] < max_nodes:
+            f, neg_g, _, key = heapq.heappop(frontier)
+            g = -neg_g
+
+            if g > table[key][0]:
+                # Stale entry; the state was reached more cheaply since
+                continue
+
+            if f == g:
+                # The heuristic is zero only at a cleared grid
+                self.goal = key
+                break
+
+            stats["expanded"] += 1
+            if closed is not None:
+                closed.append(key)
+
+            for cost, name, index, child in expand(level, key):
+                child_g = g + cost
+                try:
+                    if child_g >= table[child][0]:
+                        continue
+                except KeyError:
+                    pass
+
+                table[child] = (child_g, key, name, index)
+                counter += 1
+                heapq.heappush(frontier, (child_g + heuristic(level, child), -child_g, counter, child))
+                if opened is not None:
+                    opened.append((child, counter))
+
+        stats["generated"] = counter
+        stats["seconds"] += time.perf_counter() - start_time
+
+        return self.get_result()
+
+    def get_result(self) -> dict:
+        if self.goal is not None:
+            status = STATUS_SOLVED
+        elif self.frontier:
+            status = STATUS_LIMIT
+        else:
+            status = STATUS_UNSOLVABLE
+
+        result = {"status": status, "score": None, "cost": None, "actions": [], "stats": dict(self.stats)}
+
+        if self.goal is not None:
+            cost = self.table[self.goal][0]
+            result["cost"] = cost
+            result["score"] = self.level.get_best_possible_score() - cost
+            result["actions"] = self.get_path(self.goal)
+
+        return result
+
+    def get_path(self, key: bytes) -> [str]:
+        # Solve file lines from the start to the given state
+        lines = []
+        while (entry := self.table[key])[1] is not None:
+            _, key, name, index = entry
+            lines.append(Tr.format_solve_line(name, self.level.get_coords(index)))
+
+        lines.reverse()
+        return lines
+
+
+def solve_buffer(buffer: [str], max_nodes: int = DEFAULT_MAX_NODES) -> dict:
+    """
+    :param buffer: Game file lines
+    :param max_nodes: Node limit
+    :return: Result; see Solver.solve()
+    """
+    return Solver(Level.from_buffer(buffer)).solve(max_nodes)
+
+
+def replay(buffer: [str], lines: [str]) -> (int, bool):
+    """
+    Play solve lines through the game engine, e.g. to verify a solution.
+
+    :param buffer: Game file lines
+    :param lines: Solve file lines
+    :return: Score, cleared flag
+    """
+    game = Bd.build_game_from_buffer(buffer)
+    game.interface = In.Interface(game, output=StringIO())
+    game.interface.headless = True
+
+    for line in lines:
+        name, coords = Tr.parse_solve_line(line)
+        game.interface.process_action(getattr(Ac, name)(game.interface, coords))
+
+    return game.score, game.is_grid_cleared()
+
+
+if __name__ == "__main__":
+    import SolverCache as Sc
+
+    tag = sys.argv[1] if len(sys.argv) > 1 else "Game_1"
+    buf = Bd.read_file_to_buffer(Co.SET_PIECES_FOLDER + tag)
+
+    found = Sc.solve_cached(buf)
+    print(f"{tag}: {found['status']}, score {found['score']}, {found['stats']['expanded']:,} states expanded in "
+          f"{found['stats']['seconds']:.2f} s" + (" (cached)" if found["cached"] else ""))
+    for solve_line in found["actions"]:
+        print(solve_line)
@@ -0,0 +1,155 @@
+"""
+
+    On-disk cache of Solver results, keyed by a hash of the game file's content, so that a level is only searched
+    once across test runs, benchmark runs & batch jobs, whatever its folder or tag.
+
+    Each level has its own JSON file in the cache folder, named by its content hash. An entry holds the best result
+    known: a solution (solve file lines), its score & the search statistics of the run that found it. An entry is
+    only replaced by a better one: a solved result beats one that hit the node limit, and a higher score beats a
+    lower one (e.g. a shortened trace put() by another tool).
+
+    Writes are atomic (a temp file renamed over the entry, as for profiles), so readers never see a partial entry.
+    Concurrent writers, e.g. a process pool, take a lock (where fcntl exists) around the compare-and-replace, so that
+    a worse result can't overwrite a better one written meanwhile. There is one lock file for the whole folder,
+    LOCK_FILE_NAME, left in place between writes; a write only takes a moment, so writers seldom wait on it.
+
+    The Solver's command line, SolverCheckpoint, SolverDistributed & LevelGenerator's --verify solver all go through
+    the cache; each can opt out, e.g. where the search itself is being checked.
+
+"""
+import BuildGameFromFile as Bd
+import hashlib
+import json
+import os
+import Solver as So
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None  # No locking: each write is still atomic, but concurrent writers of one level may lose the best
+
+CACHE_FOLDER_PATH = "../GameFiles/SolverCache/"
+CACHE_FILE_SUFFIX = ".json"
+LOCK_FILE_NAME = "cache.lock"
+
+# Bump when the Solver's results change meaning, so old entries are ignored
+CACHE_VERSION = 1
+
+
+def get_content_hash(buffer: [str]) -> str:
+    """
+    :param buffer: Game file lines, as from BuildGameFromFile.read_file_to_buffer()
+    :return: Hex digest; line endings don't matter
+    """
+    return hashlib.sha256("\n".join(buffer).encode()).hexdigest()
+
+
+def is_better(result: dict, stored: (dict | None)) -> bool:
+    """
+    :param result: Solver result
+    :param stored: Cached result, if any
+    :return: True if result should replace stored
+    """
+    if stored is None:
+        return True
+
+    if result["status"] == So.STATUS_SOLVED:
+        return stored["status"] != So.STATUS_SOLVED or result["score"] > stored["score"]
+
+    if stored["status"] == So.STATUS_SOLVED:
+        return False
+
+    # Neither solved: a finished search beats a cut-off one, and a larger cut-off beats a smaller one
+    if result["status"] == So.STATUS_UNSOLVABLE:
+        return stored["status"] != So.STATUS_UNSOLVABLE
+
+    return stored["status"] == So.STATUS_LIMIT and result.get("max_nodes", 0) > stored.get("max_nodes", 0)
+
+
+class SolverCache:
+    def __init__(self, folder: str = CACHE_FOLDER_PATH) -> None:
+        """
+        :param folder: Cache folder; created on the first write
+        """
+        self.folder = folder
+
+    def get_path(self, content_hash: str) -> str:
+        return os.path.join(self.folder, content_hash + CACHE_FILE_SUFFIX)
+
+    def get(self, content_hash: str) -> (dict | None):
+        """
+        :param content_hash: See get_content_hash()
+        :return: Cached result; None if there is none, or it is from another CACHE_VERSION
+        """
+        try:
+            with open(self.get_path(content_hash), "r") as file:
+                entry = json.load(file)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+        return entry["result"] if entry.get("version") == CACHE_VERSION else None
+
+    def put(self, content_hash: str, result: dict) -> dict:
+        """
+        Store a result, unless the cache already holds a better one.
+
+        :param content_hash: See get_content_hash()
+        :param result: Solver result; see Solver.Solver.solve()
+        :return: The result the cache holds afterwards
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        path = self.get_path(content_hash)
+
+        with open(os.path.join(self.folder, LOCK_FILE_NAME), "a") as lock:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_EX)  # Released when the lock file is closed
+
+            stored = self.get(content_hash)
+            if not is_better(result, stored):
+                return stored
+
+            # A temp file per process, so that writers never share one
+            temp_path = f"{path}.{os.getpid()}.tmp"
+            with open(temp_path, "w") as file:
+                json.dump({"version": CACHE_VERSION, "result": result}, file)
+
+            os.replace(temp_path, path)
+
+        return result
+
+
+def solve_cached(buffer: [str], max_nodes: int = So.DEFAULT_MAX_NODES, cache: (SolverCache | None) = None,
+                 solve=So.solve_buffer) -> dict:
+    """
+    Solve a level, or take its result from the cache. A cached result that hit a smaller node limit is searched
+    again.
+
+    :param buffer: Game file lines
+    :param max_nodes: Node limit
+    :param cache: Cache; None for one at CACHE_FOLDER_PATH
+    :param solve: Callable (buffer, max_nodes) -> result, run on a miss; e.g. a search with checkpoints
+    :return: Result as from Solver.Solver.solve(), plus "max_nodes" and "cached" (True if no search was run)
+    """
+    cache = cache if cache is not None else SolverCache()
+    content_hash = get_content_hash(buffer)
+
+    stored = cache.get(content_hash)
+    if stored is not None and (stored["status"] != So.STATUS_LIMIT or stored.get("max_nodes", 0) >= max_nodes):
+        return stored | {"cached": True}
+
+    result = solve(buffer, max_nodes) | {"max_nodes": max_nodes}
+
+    return cache.put(content_hash, result) | {"cached": False}
+
+
+def solve_folder_cached(folder_path: str, max_nodes: int = So.DEFAULT_MAX_NODES,
+                        cache: (SolverCache | None) = None) -> dict:
+    """
+    :param folder_path: Set piece folder, holding game.rcgg
+    :return: See solve_cached()
+    """
+    return solve_cached(Bd.read_file_to_buffer(folder_path), max_nodes, cache)
+
+
+if __name__ == "__main__":
+    pass
@@ -0,0 +1,308 @@
+"""
+
+    Checkpoints for long Solver runs: the search state (table, frontier & stats) is kept in a binary journal file,
+    so that a run that stops, for whatever reason, can be resumed from its last checkpoint.
+
+    The journal is append-only. A checkpoint only writes what changed since the one before, so its cost depends on
+    the work done in between, not on the size of the search:
+
+        header:  magic (4 bytes), version (1 byte), sizeX, sizeY (2 bytes each), robot (4 bytes), cells
+        entry:   "N", id (4), g (4), tie-breaker (8), parent id (4, -1 for none), opcode (1, 0 for none),
+                 tile index (4), key length (2), key; the key is only written the first time its id appears
+        closed:  "X", id (4)
+        commit:  "C", expanded (8), generated (8), seconds (8, float), goal id (4, -1 for none)
+
+    Keys get ids in the order they are first written, so parents are written as ids. Records only count once a
+    commit follows them; whatever follows the last commit (a checkpoint cut off halfway) is dropped on resume.
+
+    The frontier isn't written: on resume it is rebuilt from the entries not closed, each with its own tie-breaker,
+    so the search expands states in the same order as if it had never stopped. This holds as the heuristic is
+    consistent: a state, once expanded, never gets a cheaper entry.
+
+    A level already in the SolverCache is not searched again, unless with --no-cache.
+
+    Usage, from the RobotCleanerGame folder (resumes the journal, by default GameFiles/Journals/<level>.rcgj, if it
+    exists):
+        python SolverCheckpoint.py Game_1 --interval 10000
+
+"""
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+import heapq
+import mmap
+import os
+import Solver as So
+import SolverCache as Sc
+import struct
+import time
+import Trace as Tr
+
+JOURNAL_SUFFIX = ".rcgj"
+
+# Default home of journals; ignored by git, as a long run's journal can be large
+JOURNAL_FOLDER_PATH = "../GameFiles/Journals/"
+
+MAGIC = b"RCGJ"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBHHI")
+ENTRY = struct.Struct("<cIIqiBIH")
+CLOSED = struct.Struct("<cI")
+COMMIT = struct.Struct("<cqqdi")
+
+ENTRY_TAG, CLOSED_TAG, COMMIT_TAG = b"N", b"X", b"C"
+
+NO_ID = -1
+NO_OPCODE = 0
+
+DEFAULT_INTERVAL = 100_000
+
+
+class Checkpointer:
+    """
+        Writes a Solver's progress to a journal; the Solver tracks its changes for as long as this exists.
+    """
+
+    def __init__(self, solver: So.Solver, path: str, ids: {bytes: int} = None) -> None:
+        """
+        :param solver: Solver, fresh or part run
+        :param path: Journal file; a new one is started unless ids are given
+        :param ids: {key: id} of a journal being resumed, as from resume()
+        """
+        self.solver = solver
+        self.path = path
+
+        solver.opened = []
+        solver.closed = []
+
+        if ids is None:
+            self.ids = {}
+            self.start()
+        else:
+            self.ids = ids
+
+    def start(self) -> None:
+        # A new journal, holding everything the solver has so far
+        level = self.solver.level
+
+        with open(self.path, "wb") as file:
+            file.write(HEADER.pack(MAGIC, VERSION, level.size_x, level.size_y, level.robot) + level.cells)
+
+        # Tie-breakers live in the frontier; entries with none there were expanded
+        tie_breakers = {key: counter for _, neg_g, counter, key in self.solver.frontier
+                        if -neg_g == self.solver.table[key][0]}
+
+        # Parents cost less than their children, so this writes every parent before its children
+        self.solver.opened = [(key, tie_breakers.get(key, 0))
+                              for key in sorted(self.solver.table, key=lambda k: self.solver.table[k][0])]
+        self.solver.closed = [key for key in self.solver.table if key not in tie_breakers]
+
+        self.checkpoint()
+
+    def checkpoint(self) -> int:
+        """
+        Append the changes since the last checkpoint, and a commit.
+
+        :return: Bytes written
+        """
+        solver = self.solver
+        ids = self.ids
+        out = []
+
+        # Only the last entry set for a key is still in the table; it comes after its parent's
+        latest = {}
+        for key, counter in solver.opened:
+            latest.pop(key, None)
+            latest[key] = counter
+
+        for key, counter in latest.items():
+            g, parent, name, index = solver.table[key]
+
+            if key in ids:
+                key_id, key_bytes = ids[key], b""
+            else:
+                key_id = ids[key] = len(ids)
+                key_bytes = key
+
+            out.append(ENTRY.pack(ENTRY_TAG, key_id, g, counter, NO_ID if parent is None else ids[parent],
+                                  NO_OPCODE if name is None else Tr.OPCODES[name], index & 0xFFFFFFFF,
+                                  len(key_bytes)) + key_bytes)
+
+        out += [CLOSED.pack(CLOSED_TAG, ids[key]) for key in solver.closed]
+
+        stats = solver.stats
+        out.append(COMMIT.pack(COMMIT_TAG, stats["expanded"], stats["generated"], stats["seconds"],
+                               NO_ID if solver.goal is None else ids[solver.goal]))
+
+        data = b"".join(out)
+        with open(self.path, "ab") as file:
+            file.write(data)
+            file.flush()
+            os.fsync(file.fileno())
+
+        solver.opened.clear()
+        solver.closed.clear()
+
+        return len(data)
+
+    def solve(self, max_nodes: int = So.DEFAULT_MAX_NODES, interval: int = DEFAULT_INTERVAL) -> dict:
+        """
+        Run the solver, checkpointing every `interval` states expanded.
+
+        :return: See Solver.Solver.solve()
+        """
+        solver = self.solver
+
+        while True:
+            result = solver.solve(min(max_nodes, solver.stats["expanded"] + interval))
+            self.checkpoint()
+
+            if result["status"] != So.STATUS_LIMIT or solver.stats["expanded"] >= max_nodes:
+                return result
+
+
+def resume(path: str) -> (So.Solver, {bytes: int}):
+    """
+    Rebuild a Solver from a journal, as of its last commit; anything after it is cut off the file.
+
+    :param path: Journal file
+    :return: Solver, {key: id} to carry on the journal with; see Checkpointer
+    """
+    with open(path, "rb") as file:
+        size = os.fstat(file.fileno()).st_size
+        if size < HEADER.size:
+            raise IOError(f"resume: {path} is too short for a journal header")
+        # Mapped rather than read, as in Trace.TraceReader: a long run's journal need not be copied into memory
+        journal = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    data = memoryview(journal)
+    try:
+        magic, version, size_x, size_y, robot = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise IOError(f"resume: {path} is not a version {VERSION} journal")
+
+        offset = HEADER.size + size_x * size_y
+        level = So.Level(size_x, size_y, bytes(data[HEADER.size:offset]), robot)
+
+        keys = []
+        entries = {}  # id: (g, tie-breaker, parent id, opcode, index), as of the last commit
+        closed = set()
+        pending_entries, pending_closed = [], []
+        committed = None
+        committed_at = offset
+
+        while offset < size:
+            tag = data[offset:offset + 1].tobytes()  # A copy, so that no view outlives the map
+
+            if tag == ENTRY_TAG and offset + ENTRY.size <= size:
+                _, key_id, g, counter, parent, opcode, index, key_length = ENTRY.unpack_from(data, offset)
+                offset += ENTRY.size + key_length
+                if offset > size:
+                    break
+                pending_entries.append((key_id, bytes(data[offset - key_length:offset]),
+                                        (g, counter, parent, opcode, index)))
+
+            elif tag == CLOSED_TAG and offset + CLOSED.size <= size:
+                pending_closed.append(CLOSED.unpack_from(data, offset)[1])
+                offset += CLOSED.size
+
+            elif tag == COMMIT_TAG and offset + COMMIT.size <= size:
+                committed = COMMIT.unpack_from(data, offset)[1:]
+                offset += COMMIT.size
+
+                for key_id, key, entry in pending_entries:
+                    if key:
+                        keys.append(key)
+                    entries[key_id] = entry
+                closed.update(pending_closed)
+                pending_entries, pending_closed = [], []
+                committed_at = offset
+
+            else:
+                # Cut off part way through a record
+                break
+    finally:
+        # Released before the map is closed, & both before the file may be truncated below
+        data.release()
+        journal.close()
+
+    if committed is None:
+        raise IOError(f"resume: {path} holds no checkpoint")
+
+    if committed_at < size:
+        with open(path, "r+b") as file:
+            file.truncate(committed_at)
+
+    solver = So.Solver(level)
+    solver.table = {}
+    solver.frontier = []
+
+    for key_id, (g, counter, parent, opcode, index) in entries.items():
+        key = keys[key_id]
+        name = None if opcode == NO_OPCODE else Tr.OPCODE_NAMES[opcode]
+        index = -1 if index == 0xFFFFFFFF else index
+        solver.table[key] = (g, None if parent == NO_ID else keys[parent], name, index)
+
+        if key_id not in closed:
+            solver.frontier.append((g + So.heuristic(level, key), -g, counter, key))
+
+    heapq.heapify(solver.frontier)
+
+    expanded, generated, seconds, goal = committed
+    solver.stats = {"expanded": expanded, "generated": generated, "seconds": seconds}
+    solver.goal = None if goal == NO_ID else keys[goal]
+
+    return solver, {key: key_id for key_id, key in enumerate(keys)}
+
+
+def solve_with_checkpoints(buffer: [str], path: str, max_nodes: int = So.DEFAULT_MAX_NODES,
+                           interval: int = DEFAULT_INTERVAL, use_cache: bool = True) -> dict:
+    """
+    Solve a level, resuming from the journal if there is one.
+
+    :param buffer: Game file lines
+    :param path: Journal file
+    :param max_nodes: Node limit, over all runs
+    :param interval: States expanded between checkpoints
+    :param use_cache: False to search without the SolverCache, e.g. to check the search itself
+    :return: See Solver.Solver.solve(); through the cache, see SolverCache.solve_cached()
+    """
+    if use_cache:
+        return Sc.solve_cached(buffer, max_nodes,
+                               solve=lambda b, n: solve_with_checkpoints(b, path, n, interval, use_cache=False))
+
+    level = So.Level.from_buffer(buffer)
+
+    if os.path.exists(path):
+        solver, ids = resume(path)
+        if (solver.level.size_x, solver.level.size_y, solver.level.robot, solver.level.cells) != \
+                (level.size_x, level.size_y, level.robot, level.cells):
+            raise IOError(f"solve_with_checkpoints: {path} is a journal of another level")
+        checkpointer = Checkpointer(solver, path, ids)
+    else:
+        checkpointer = Checkpointer(So.Solver(level), path)
+
+    return checkpointer.solve(max_nodes, interval)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a RobotCleanerGame level with checkpoints")
+    parser.add_argument("level", help="set piece name, e.g. Game_1")
+    parser.add_argument("--journal", default=None,
+                        help=f"journal file; default <level>{JOURNAL_SUFFIX} in {JOURNAL_FOLDER_PATH}")
+    parser.add_argument("--max-nodes", type=int, default=So.DEFAULT_MAX_NODES, help="node limit over all runs")
+    parser.add_argument("--interval", type=int, default=DEFAULT_INTERVAL, help="states expanded between checkpoints")
+    parser.add_argument("--no-cache", action="store_true", help="search even if the level is in the SolverCache")
+    args = parser.parse_args()
+
+    journal_path = args.journal or os.path.join(JOURNAL_FOLDER_PATH, args.level + JOURNAL_SUFFIX)
+    os.makedirs(os.path.dirname(journal_path) or ".", exist_ok=True)
+
+    start_time = time.perf_counter()
+
+    found = solve_with_checkpoints(Bd.read_file_to_buffer(Co.SET_PIECES_FOLDER + args.level), journal_path,
+                                   args.max_nodes, args.interval, not args.no_cache)
+
+    print(f"{args.level}: {found['status']}, score {found['score']}, {found['stats']['expanded']:,} states expanded "
+          f"in {time.perf_counter() - start_time:.2f} s" + (" (cached)" if found.get("cached") else ""))
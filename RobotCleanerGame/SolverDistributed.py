@@ -0,0 +1,417 @@
+"""
+
+    Distributed best-score search: the Solver's A* spread over worker processes, for levels too big for one.
+
+    Every state has an owner, the worker numbered crc32(state key) % workers; only the owner keeps the state's table
+    entry and puts it on its frontier, so duplicates are caught without sharing memory. A worker expands its own
+    states and sends each successor, in batches, to that successor's owner.
+
+    Whoever finds a cleared grid reports its cost to the coordinator, which broadcasts the best cost found so far
+    as a bound; states that can't beat it (g + heuristic >= bound) are dropped. The search ends when every worker
+    has nothing left under the bound and no batch is still on its way (two probes in a row find all workers idle,
+    and as many nodes received as sent). The best solution is then optimal, as with the Solver, and its actions are
+    traced back by asking each parent's owner in turn.
+
+    All messages go over sockets (multiprocessing.connection, with an auth key), not shared memory or pipes, so
+    workers only need an address to reach each other: everything here runs on 127.0.0.1, but the same messages
+    could go between machines. Each connection is read by its own thread, so a send never waits on a busy peer.
+
+    A level already in the SolverCache is not searched again, unless with --no-cache.
+
+    Usage, from the RobotCleanerGame folder:
+        python SolverDistributed.py Game_1 --workers 4
+
+"""
+import argparse
+import BuildGameFromFile as Bd
+import Constants as Co
+import heapq
+from multiprocessing import Process
+from multiprocessing.connection import Client, Listener
+import os
+import queue
+import Solver as So
+import SolverCache as Sc
+import sys
+import threading
+import time
+import Trace as Tr
+import zlib
+
+HOST = "127.0.0.1"
+
+SEND_BATCH = 256             # Nodes per message between workers
+ROUND_NODES = 200            # States expanded between looks at the inbox
+PROBE_INTERVAL = 0.01        # Seconds between termination probes
+WORKER_CHECK_INTERVAL = 1.0  # Seconds of waiting on the inbox between checks that the workers are alive
+STOP_TIMEOUT = 5.0           # Seconds a worker has to stop in before it is terminated
+
+NO_OPCODE = 0
+
+# Messages: (kind, ...)
+HELLO = "hello"      # worker -> coordinator: worker id, listener address
+PEERS = "peers"      # coordinator -> worker: listener addresses of all workers
+NODES = "nodes"      # to a worker: [(key, g, parent key, opcode, tile index)]
+BOUND = "bound"      # coordinator -> worker: best cost found
+GOAL = "goal"        # worker -> coordinator: cost, key
+PROBE = "probe"      # coordinator -> worker: wave number
+STATUS = "status"    # worker -> coordinator: wave, worker id, idle, sent, received, expanded, generated, capped
+TRACE = "trace"      # coordinator -> worker: key
+ENTRY = "entry"      # worker -> coordinator: key, parent key, opcode, tile index
+STOP = "stop"        # coordinator -> worker
+
+
+def get_owner(key: bytes, workers: int) -> int:
+    return zlib.crc32(key) % workers
+
+
+def read_into(connection, inbox: queue.Queue) -> None:
+    # Reader thread: everything that arrives on a connection goes to the inbox, until the other end closes
+    try:
+        while True:
+            inbox.put(connection.recv())
+    except (EOFError, OSError):
+        pass
+
+
+def accept_into(listener: Listener, count: int, inbox: queue.Queue) -> None:
+    for _ in range(count):
+        connection = listener.accept()
+        threading.Thread(target=read_into, args=(connection, inbox), daemon=True).start()
+
+
+class Worker:
+    """
+        Searches the states it owns; runs in its own process.
+    """
+
+    def __init__(self, worker_id: int, workers: int, buffer: [str], max_nodes: int) -> None:
+        self.worker_id = worker_id
+        self.workers = workers
+        self.level = So.Level.from_buffer(buffer)
+        self.max_nodes = max_nodes
+
+        # As in Solver, but with opcodes rather than action names, to keep messages small
+        self.frontier = []
+        self.table: {bytes: (int, (bytes | None), int, int)} = {}
+        self.bound = sys.maxsize
+        self.counter = 0
+
+        self.outbox = [[] for _ in range(workers)]
+        self.peers = []
+        self.coordinator = None
+        self.inbox = queue.Queue()
+
+        self.stats = {"sent": 0, "received": 0, "expanded": 0, "generated": 0}
+
+    def offer(self, key: bytes, g: int, parent: (bytes | None), opcode: int, index: int) -> None:
+        # A state this worker owns, reached at cost g
+        entry = self.table.get(key)
+        if entry is not None and entry[0] <= g:
+            return
+
+        f = g + So.heuristic(self.level, key)
+        if f >= self.bound:
+            return
+
+        self.table[key] = (g, parent, opcode, index)
+        self.counter += 1
+        self.stats["generated"] += 1
+        heapq.heappush(self.frontier, (f, -g, self.counter, key))
+
+    def send_nodes(self, owner: int, force: bool = False) -> None:
+        nodes = self.outbox[owner]
+        if nodes and (force or len(nodes) >= SEND_BATCH):
+            self.peers[owner].send((NODES, nodes))
+            self.stats["sent"] += len(nodes)
+            self.outbox[owner] = []
+
+    def is_capped(self) -> bool:
+        return self.stats["expanded"] >= self.max_nodes
+
+    def is_idle(self) -> bool:
+        # Nothing worth expanding: the frontier is empty or can't beat the bound, or the node limit is reached
+        if self.frontier and self.frontier[0][0] >= self.bound:
+            self.frontier.clear()
+
+        return not self.frontier or self.is_capped()
+
+    def expand_round(self) -> None:
+        level = self.level
+        table = self.table
+        frontier = self.frontier
+
+        for _ in range(ROUND_NODES):
+            if not frontier or self.is_capped():
+                break
+
+            f, neg_g, _, key = heapq.heappop(frontier)
+            g = -neg_g
+
+            if g > table[key][0]:
+                continue
+            if f >= self.bound:
+                frontier.clear()
+                break
+
+            if f == g:
+                # Cleared; whether it's the best is up to the coordinator
+                self.bound = g
+                self.coordinator.send((GOAL, g, key))
+                continue
+
+            self.stats["expanded"] += 1
+
+            for cost, name, index, child in So.expand(level, key):
+                owner = get_owner(child, self.workers)
+                if owner == self.worker_id:
+                    self.offer(child, g + cost, key, Tr.OPCODES[name], index)
+                else:
+                    self.outbox[owner].append((child, g + cost, key, Tr.OPCODES[name], index))
+                    self.send_nodes(owner)
+
+        for owner in range(self.workers):
+            self.send_nodes(owner, force=True)
+
+    def handle(self, message: tuple) -> bool:
+        """
+        :return: False once told to stop
+        """
+        kind = message[0]
+
+        if kind == NODES:
+            self.stats["received"] += len(message[1])
+            for node in message[1]:
+                self.offer(*node)
+
+        elif kind == BOUND:
+            self.bound = min(self.bound, message[1])
+
+        elif kind == PROBE:
+            self.coordinator.send((STATUS, message[1], self.worker_id, self.is_idle(), self.stats["sent"],
+                                   self.stats["received"], self.stats["expanded"], self.stats["generated"],
+                                   self.is_capped() and bool(self.frontier)))
+
+        elif kind == TRACE:
+            g, parent, opcode, index = self.table[message[1]]
+            self.coordinator.send((ENTRY, message[1], parent, opcode, index))
+
+        elif kind == STOP:
+            return False
+
+        return True
+
+    def run(self, coordinator_address, authkey: bytes) -> None:
+        listener = Listener((HOST, 0), authkey=authkey)
+        threading.Thread(target=accept_into, args=(listener, self.workers - 1, self.inbox), daemon=True).start()
+
+        self.coordinator = Client(coordinator_address, authkey=authkey)
+        threading.Thread(target=read_into, args=(self.coordinator, self.inbox), daemon=True).start()
+        self.coordinator.send((HELLO, self.worker_id, listener.address))
+
+        running = True
+        while running:
+            busy = not self.is_idle()
+
+            try:
+                # Wait for work when there is none; otherwise only take what has arrived
+                message = self.inbox.get(block=not busy)
+            except queue.Empty:
+                message = None
+
+            while message is not None and running:
+                if message[0] == PEERS:
+                    self.peers = [None if i == self.worker_id else Client(address, authkey=authkey)
+                                  for i, address in enumerate(message[1])]
+                else:
+                    running = self.handle(message)
+
+                try:
+                    message = self.inbox.get_nowait()
+                except queue.Empty:
+                    message = None
+
+            if running and self.peers:
+                self.expand_round()
+
+        for connection in self.peers + [self.coordinator]:
+            if connection is not None:
+                connection.close()
+        listener.close()
+
+
+def run_worker(worker_id: int, workers: int, buffer: [str], max_nodes: int, coordinator_address,
+               authkey: bytes) -> None:
+    # Process target
+    Worker(worker_id, workers, buffer, max_nodes).run(coordinator_address, authkey)
+
+
+def receive(inbox: queue.Queue, processes: [Process]) -> tuple:
+    # The next message; a worker that has died raises, rather than leaving the coordinator waiting for its reply
+    while True:
+        try:
+            return inbox.get(timeout=WORKER_CHECK_INTERVAL)
+        except queue.Empty:
+            for process in processes:
+                if not process.is_alive():
+                    raise RuntimeError(f"solve_distributed: worker {process.name} exited, code {process.exitcode}")
+
+
+def accept_workers(listener: Listener, count: int, inbox: queue.Queue) -> None:
+    # Coordinator's accept thread: each worker's HELLO goes to the inbox with its connection, so that a worker dying
+    # before it connects is caught by receive() too
+    try:
+        for _ in range(count):
+            connection = listener.accept()
+            inbox.put(connection.recv() + (connection,))
+            threading.Thread(target=read_into, args=(connection, inbox), daemon=True).start()
+    except (EOFError, OSError):
+        pass
+
+
+def solve_distributed(buffer: [str], workers: (int | None) = None, max_nodes: int = So.DEFAULT_MAX_NODES,
+                      use_cache: bool = True) -> dict:
+    """
+    :param buffer: Game file lines
+    :param workers: Number of worker processes; None for one per CPU
+    :param max_nodes: Node limit over all workers, shared out evenly
+    :param use_cache: False to search without the SolverCache, e.g. to check the search itself
+    :return: As Solver.Solver.solve(); with STATUS_LIMIT, the best solution found, if any, which may not be the best
+             possible. Stats of a search also count the nodes sent between workers. Through the cache, see
+             SolverCache.solve_cached(); a cached result may come from another solver, without those stats.
+    :raise RuntimeError: If a worker process dies; the others are stopped
+    """
+    if use_cache:
+        return Sc.solve_cached(buffer, max_nodes,
+                               solve=lambda b, n: solve_distributed(b, workers, n, use_cache=False))
+
+    workers = workers or os.cpu_count() or 1
+    level = So.Level.from_buffer(buffer)
+    authkey = os.urandom(16)
+    start_time = time.perf_counter()
+
+    listener = Listener((HOST, 0), authkey=authkey)
+    processes = [Process(target=run_worker, args=(i, workers, buffer, -(-max_nodes // workers), listener.address,
+                                                  authkey), daemon=True) for i in range(workers)]
+    inbox = queue.Queue()
+    connections = [None] * workers
+    addresses = [None] * workers
+
+    try:
+        for process in processes:
+            process.start()
+
+        threading.Thread(target=accept_workers, args=(listener, workers, inbox), daemon=True).start()
+        for _ in range(workers):
+            _, worker_id, address, connection = receive(inbox, processes)
+            connections[worker_id], addresses[worker_id] = connection, address
+
+        for connection in connections:
+            connection.send((PEERS, addresses))
+
+        start = level.get_start_key()
+        connections[get_owner(start, workers)].send((NODES, [(start, 0, None, NO_OPCODE, -1)]))
+        sent_by_coordinator = 1
+
+        best: (int, bytes) = None
+        previous = None
+        wave = 0
+
+        while True:
+            wave += 1
+            for connection in connections:
+                connection.send((PROBE, wave))
+
+            replies = {}
+            bound_changed = False
+            while len(replies) < workers:
+                message = receive(inbox, processes)
+                if message[0] == GOAL and (best is None or message[1] < best[0]):
+                    best = (message[1], message[2])
+                    bound_changed = True
+                    for connection in connections:
+                        connection.send((BOUND, best[0]))
+                elif message[0] == STATUS and message[1] == wave:
+                    replies[message[2]] = message[3:]
+
+            idle = all(reply[0] for reply in replies.values())
+            sent = sent_by_coordinator + sum(reply[1] for reply in replies.values())
+            received = sum(reply[2] for reply in replies.values())
+
+            totals = (sent, received) if idle and sent == received and not bound_changed else None
+            if totals is not None and totals == previous:
+                break
+
+            previous = totals
+            time.sleep(PROBE_INTERVAL)
+
+        capped = any(reply[5] for reply in replies.values())
+        stats = {"expanded": sum(reply[3] for reply in replies.values()),
+                 "generated": sum(reply[4] for reply in replies.values()),
+                 "sent": sent - sent_by_coordinator, "workers": workers}
+
+        if best is not None:
+            status = So.STATUS_LIMIT if capped else So.STATUS_SOLVED
+        else:
+            status = So.STATUS_LIMIT if capped else So.STATUS_UNSOLVABLE
+
+        result = {"status": status, "score": None, "cost": None, "actions": [], "stats": stats}
+
+        if best is not None:
+            # Walk back from the goal, asking each state's owner for its entry
+            lines = []
+            key = best[1]
+            while key is not None:
+                connections[get_owner(key, workers)].send((TRACE, key))
+                while (message := receive(inbox, processes))[0] != ENTRY or message[1] != key:
+                    pass
+                _, _, key, opcode, index = message
+                if opcode != NO_OPCODE:
+                    lines.append(Tr.format_solve_line(Tr.OPCODE_NAMES[opcode], level.get_coords(index)))
+
+            lines.reverse()
+            result |= {"score": level.get_best_possible_score() - best[0], "cost": best[0], "actions": lines}
+
+    finally:
+        # Also when a worker died or the search failed: stop whoever is left
+        for connection in connections:
+            if connection is not None:
+                try:
+                    connection.send((STOP,))
+                except OSError:
+                    pass  # That worker is gone
+        for process in processes:
+            if process.pid is not None:
+                process.join(STOP_TIMEOUT)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+        for connection in connections:
+            if connection is not None:
+                connection.close()
+        listener.close()
+
+    stats["seconds"] = time.perf_counter() - start_time
+
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Solve a RobotCleanerGame level with several processes")
+    parser.add_argument("level", help="set piece name, e.g. Game_1")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes; default one per CPU")
+    parser.add_argument("--max-nodes", type=int, default=So.DEFAULT_MAX_NODES, help="node limit over all workers")
+    parser.add_argument("--no-cache", action="store_true", help="search even if the level is in the SolverCache")
+    args = parser.parse_args()
+
+    found = solve_distributed(Bd.read_file_to_buffer(Co.SET_PIECES_FOLDER + args.level), args.workers,
+                              args.max_nodes, not args.no_cache)
+
+    if found.get("cached"):
+        print(f"{args.level}: {found['status']}, score {found['score']} (cached)")
+    else:
+        print(f"{args.level}: {found['status']}, score {found['score']}, {found['stats']['expanded']:,} states "
+              f"expanded by {found['stats']['workers']} worker(s) in {found['stats']['seconds']:.2f} s, "
+              f"{found['stats']['sent']:,} sent between them")
+    for solve_line in found["actions"]:
+        print(solve_line)
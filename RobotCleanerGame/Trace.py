@@ -0,0 +1,269 @@
+"""
+
+    Compact binary trace format for replays.
+
+    A trace file is a short header followed by one fixed-size packed record per action:
+
+        header: magic (4 bytes), version (1 byte), flags (1 byte)
+        record: opcode (1 byte), x (2 bytes), y (2 bytes), [score delta (4 bytes)], [state hash (4 bytes)]
+
+    The flags in the header say which of the optional fields every record carries, so a trace which only needs
+    to be replayed costs five bytes an action.
+
+    Traces are written incrementally by TraceWriter as the game runs, and read back through a memoryview over a
+    memory-mapped file by TraceReader, so records are unpacked in place without copying the file.
+
+    They can be converted to and from the .rcgs solve text used by InterfaceFromFile.
+
+"""
+import Actions as Ac
+import mmap
+import os
+import struct
+import zlib
+
+TRACE_FILE = "trace.rcgt"
+
+MAGIC = b"RCGT"
+VERSION = 1
+
+FLAG_SCORE = 0x01
+FLAG_HASH = 0x02
+
+HEADER = struct.Struct("<4sBB")
+
+# Opcode : Action class name, and the reverse; only actions with coords are traced, like export_solve
+OPCODES: dict[str, int] = {
+    Ac.Move.__name__: 1,
+    Ac.PickUp.__name__: 2,
+    Ac.Drop.__name__: 3,
+    Ac.Sweep.__name__: 4,
+}
+
+OPCODE_NAMES: dict[int, str] = {v: k for k, v in OPCODES.items()}
+
+
+def record_struct(flags: int) -> struct.Struct:
+    """
+    Build the record layout for a set of header flags.
+
+    :param flags: Header flags
+    :return: Struct for one record
+    """
+    fmt = "<Bhh"
+    if flags & FLAG_SCORE:
+        fmt += "i"
+    if flags & FLAG_HASH:
+        fmt += "I"
+
+    return struct.Struct(fmt)
+
+
+def state_hash(game) -> int:
+    """
+    A stable 32-bit hash of the game state: grid contents plus the robot's stack.
+
+    Python's hash() is salted per process, so CRC32 is used to keep hashes comparable between runs.
+
+    :param game: Game object
+    :return: Unsigned 32-bit hash
+    """
+    crc = 0
+    for row in game.grid.grid:
+        crc = zlib.crc32("".join([tile.get_content() for tile in row]).encode(), crc)
+
+    return zlib.crc32("".join(game.robot.stack).encode(), crc)
+
+
+def format_solve_line(name: str, coords: (int, int)) -> str:
+    """
+    Format an action as a line of a .rcgs solve file, e.g. Move(1,2)
+
+    :param name: Action class name
+    :param coords: (x, y) coordinates
+    :return: Solve line without line break
+    """
+    return f"{name}({coords[0]},{coords[1]})"
+
+
+def parse_solve_line(line: str) -> (str, (int, int)):
+    """
+    Parse a line of a .rcgs solve file.
+
+    :param line: Solve line
+    :return: Action class name, (x, y) coordinates or None
+    """
+    split = line.replace("\r", "").replace("\n", "").split("(")
+
+    if len(split) < 2:
+        return split[0], None
+
+    cds = split[1].replace(")", "").split(",")
+    return split[0], (int(cds[0]), int(cds[1]))
+
+
+class TraceWriter:
+    """
+        Appends one record per action to a trace file; the file is kept open for the life of the game.
+    """
+
+    def __init__(self, path: str, with_score: bool = True, with_hash: bool = True) -> None:
+        """
+        :param path: Trace file path
+        :param with_score: Store each action's score delta
+        :param with_hash: Store the state hash after each action
+        """
+        self.flags = (FLAG_SCORE if with_score else 0) | (FLAG_HASH if with_hash else 0)
+        self.record = record_struct(self.flags)
+        self.count = 0
+
+        self.__file = open(path, "wb")
+        self.__file.write(HEADER.pack(MAGIC, VERSION, self.flags))
+
+    def write(self, opcode: int, coords: (int, int), score_delta: int = 0, hash_value: int = 0) -> None:
+        """
+        Write a single record.
+
+        :param opcode: Action opcode; see OPCODES
+        :param coords: (x, y) coordinates
+        :param score_delta: Change of score caused by the action
+        :param hash_value: State hash after the action
+        """
+        values = [opcode, coords[0], coords[1]]
+        if self.flags & FLAG_SCORE:
+            values.append(score_delta)
+        if self.flags & FLAG_HASH:
+            values.append(hash_value)
+
+        self.__file.write(self.record.pack(*values))
+        self.count += 1
+
+    def record_action(self, action, score_delta: int, game) -> None:
+        """
+        Write a record for an executed Action; actions without coords (Quit, Refresh, etc.) are skipped.
+
+        :param action: Executed Action
+        :param score_delta: Change of score caused by the action
+        :param game: Game object, used for the state hash
+        """
+        try:
+            opcode = OPCODES[action.__class__.__name__]
+        except KeyError:
+            return
+
+        hash_value = state_hash(game) if self.flags & FLAG_HASH else 0
+        self.write(opcode, action.coords, score_delta, hash_value)
+
+    def flush(self) -> None:
+        self.__file.flush()
+
+    def close(self) -> None:
+        if not self.__file.closed:
+            self.__file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+class TraceReader:
+    """
+        Reads a trace file through a memoryview of a memory-mapped file.
+
+        Iterating yields tuples of (opcode, x, y[, score delta][, state hash]) according to the header flags.
+    """
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as file:
+            # Also keeps an empty file away from mmap, which can't map one
+            if os.fstat(file.fileno()).st_size < HEADER.size:
+                raise IOError(f"TraceReader: {path} is too short for a trace file header")
+
+            self.__mmap = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        self.buffer = memoryview(self.__mmap)
+
+        magic, version, self.flags = HEADER.unpack_from(self.buffer)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise IOError(f"TraceReader: {path} is not a version {VERSION} trace file")
+
+        self.record = record_struct(self.flags)
+        self.body = self.buffer[HEADER.size:]
+
+        if len(self.body) % self.record.size:
+            self.close()
+            raise IOError(f"TraceReader: {path} ends with a partial record")
+
+    def __len__(self) -> int:
+        return len(self.body) // self.record.size
+
+    def __getitem__(self, index: int) -> tuple:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("TraceReader: record index out of range")
+
+        return self.record.unpack_from(self.body, index * self.record.size)
+
+    def __iter__(self):
+        return self.record.iter_unpack(self.body)
+
+    def has_score(self) -> bool:
+        return bool(self.flags & FLAG_SCORE)
+
+    def has_hash(self) -> bool:
+        return bool(self.flags & FLAG_HASH)
+
+    def close(self) -> None:
+        # Views must be released before the map can be closed
+        for view in ("body", "buffer"):
+            if hasattr(self, view):
+                getattr(self, view).release()
+        self.__mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+def trace_to_solve(trace_path: str, solve_path: str) -> None:
+    """
+    Convert a binary trace into .rcgs solve text; score deltas and hashes are dropped.
+
+    :param trace_path: Input trace file path
+    :param solve_path: Output solve file path
+    """
+    with TraceReader(trace_path) as reader:
+        lines = [format_solve_line(OPCODE_NAMES[rec[0]], (rec[1], rec[2])) + "\n" for rec in reader]
+
+    with open(solve_path, "w") as file:
+        file.write("".join(lines))
+
+
+def solve_to_trace(solve_path: str, trace_path: str) -> None:
+    """
+    Convert .rcgs solve text into a binary trace.
+
+    Solve files hold neither scores nor states, so the trace only has opcodes and coords; to get those, replay the
+    solve with Interface.start_trace() set.
+
+    :param solve_path: Input solve file path
+    :param trace_path: Output trace file path
+    """
+    with open(solve_path, "r") as file:
+        lines = [line for line in file if line.strip()]
+
+    with TraceWriter(trace_path, with_score=False, with_hash=False) as writer:
+        for line in lines:
+            name, coords = parse_solve_line(line)
+            if coords is not None:
+                writer.write(OPCODES[name], coords)
+
+
+if __name__ == "__main__":
+    pass
@@ -1,19 +1,58 @@
 """
-    import everything...
+    import everything... lazily.
+
+    Modules are imported when first accessed as attributes of the package (PEP 562), so a headless run (replays,
+    agents, unit tests) only pays for what it uses and never imports PyGame. The core modules don't import any
+    PyGame module.
 """
+import importlib
+
+CORE_MODULES = [
+    "Actions",
+    "BuildGameFromFile",
+    "ConsoleRenderer",
+    "Constants",
+    "Game",
+    "Grid",
+    "Instrumentation",
+    "Interface",
+    "InterfaceFromFile",
+    "LevelFingerprint",
+    "LevelGenerator",
+    "Profile",
+    "ProfileDatabase",
+    "Robot",
+    "SolveOptimiser",
+    "Solver",
+    "SolverCache",
+    "SolverCheckpoint",
+    "SolverDistributed",
+    "Trace",
+    "Version",
+]
+
+PYGAME_MODULES = [
+    "Main",
+    "PyGameAssets",
+    "PyGameCamera",
+    "PyGameConstants",
+    "PyGameInterface",
+    "PyGameScreens",
+    "PyGameTelemetry",
+]
+
+__all__ = CORE_MODULES + PYGAME_MODULES
+
+
+def __getattr__(name: str):
+    if name not in __all__:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    module = importlib.import_module(name)
+    globals()[name] = module  # Later lookups don't come through here
+
+    return module
 
-import Actions
-import BuildGameFromFile
-import Constants
-import Game
-import Grid
-import Interface
-import InterfaceFromFile
-import Main
-import Profile
-import PyGameConstants
-import PyGameInterface
-import PyGameScreens
-import Robot
-import Version
 
+def __dir__() -> [str]:
+    return sorted(set(globals()) | set(__all__))